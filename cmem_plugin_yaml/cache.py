@@ -0,0 +1,145 @@
+"""Persistent cache for conversion results"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import IO
+
+CACHE_VERSION = 1
+"""Increase this, if the conversion results change for the same input and options"""
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def cache_key(source: IO[bytes], options: dict) -> str:
+    """Hash the input bytes and the conversion options
+
+    The source is read in chunks and positioned at the start afterwards.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([CACHE_VERSION, options], sort_keys=True).encode("utf-8"))
+    _update_digest(digest, source)
+    return digest.hexdigest()
+
+
+def content_hash(source: IO) -> str:
+    """Hash the content of a text or binary source
+
+    The source is read in chunks and positioned at the start afterwards.
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, source)
+    return digest.hexdigest()
+
+
+def _update_digest(digest: "hashlib._Hash", source: IO) -> None:
+    source.seek(0)
+    for chunk in iter(lambda: source.read(1024 * 1024), source.read(0)):
+        digest.update(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    source.seek(0)
+
+
+class ResultCache:
+    """Directory of cached JSON results and source files with a size limit and LRU eviction
+
+    The modification time of a result is updated on each hit, so the least recently
+    used results are removed first.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _source_path(self, name: str, version: list) -> Path:
+        return self.directory / f"{_hash(name)}-{_hash(json.dumps(version))}.yaml"
+
+    def _record_path(self, name: str) -> Path:
+        return self.directory / f"{_hash(name)}.record"
+
+    @staticmethod
+    def _touch(path: Path) -> Path | None:
+        """Mark a cached file as used and return it (or None, if it is not cached)"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get(self, key: str) -> Path | None:
+        """Get the path of a cached result (or None)"""
+        return self._touch(self._path(key))
+
+    def put(self, key: str, source: IO[str]) -> None:
+        """Add a result to the cache and evict the least recently used results
+
+        The source is read from the current position. Results larger than the cache
+        are not added.
+        """
+        self._store(self._path(key), source, mode="w")
+
+    def get_source(self, name: str, version: list) -> Path | None:
+        """Get the path of a cached source file in the given version (or None)"""
+        return self._touch(self._source_path(name, version))
+
+    def put_source(self, name: str, version: list, source: IO[bytes]) -> None:
+        """Add a source file to the cache, replacing all other versions of it
+
+        The version is a list of values which change with the content of the source
+        (e.g. modification time and size).
+        """
+        for path in self.directory.glob(f"{_hash(name)}-*.yaml"):
+            path.unlink(missing_ok=True)
+        self._store(self._source_path(name, version), source, mode="wb")
+
+    def get_record(self, name: str) -> str | None:
+        """Get a recorded value (e.g. the hash of the last upload) or None"""
+        try:
+            return self._record_path(name).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put_record(self, name: str, value: str) -> None:
+        """Record a value, which is not subject to eviction"""
+        self._record_path(name).write_text(value, encoding="utf-8")
+
+    def _store(self, path: Path, source: IO, mode: str) -> None:
+        """Copy a source to a file of the cache and evict the least recently used files"""
+        with NamedTemporaryFile(
+            mode=mode,
+            encoding=None if "b" in mode else "utf-8",
+            dir=self.directory,
+            suffix=".tmp",
+            delete=False,
+        ) as writer:
+            shutil.copyfileobj(source, writer)
+        temporary = Path(writer.name)
+        if temporary.stat().st_size > self.max_size:
+            temporary.unlink()
+            return
+        temporary.replace(path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used files until the cache fits its size limit"""
+        results = []
+        for path in [*self.directory.glob("*.json"), *self.directory.glob("*.yaml")]:
+            try:
+                results.append((path.stat(), path))
+            except FileNotFoundError:
+                continue
+        results.sort(key=lambda _: _[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in results)
+        for stat, path in results:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
@@ -0,0 +1,360 @@
+"""YAML to JSON conversion"""
+
+import io
+import json
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date
+from functools import partial
+from types import SimpleNamespace
+from typing import IO, Any
+
+from cmem_plugin_yaml.expansion import (
+    DEFAULT_EXPANSION,
+    ExpansionPolicy,
+    load_data,
+    load_single_data,
+)
+from cmem_plugin_yaml.loader import LOADER, get_loader_class
+from cmem_plugin_yaml.mapped import YamlInput
+from cmem_plugin_yaml.parallel import map_texts
+from cmem_plugin_yaml.projection import Projection, projected_loader_class
+from cmem_plugin_yaml.scalars import json_key
+from cmem_plugin_yaml.serialize import DEFAULT_SERIALIZER, JsonSerializer
+from cmem_plugin_yaml.stream import (
+    stream_yaml2json,
+    stream_yaml2json_documents,
+    stream_yaml2json_records,
+)
+
+PARSE_MODE = SimpleNamespace()
+PARSE_MODE.document = "document"
+PARSE_MODE.stream = "stream"
+PARSE_MODE.options = OrderedDict(
+    {
+        PARSE_MODE.document: f"{PARSE_MODE.document}: "
+        "The complete YAML document is loaded into memory before it is converted.",
+        PARSE_MODE.stream: f"{PARSE_MODE.stream}: "
+        "The YAML document is converted event by event with bounded memory usage "
+        "(anchors, aliases and merge keys are not supported).",
+    }
+)
+
+OUTPUT_FORMAT = SimpleNamespace()
+OUTPUT_FORMAT.json = "json"
+OUTPUT_FORMAT.jsonl = "jsonl"
+OUTPUT_FORMAT.options = OrderedDict(
+    {
+        OUTPUT_FORMAT.json: f"{OUTPUT_FORMAT.json}: "
+        "A single JSON document (multiple YAML documents are wrapped in an array).",
+        OUTPUT_FORMAT.jsonl: f"{OUTPUT_FORMAT.jsonl}: "
+        "JSON Lines with one JSON document per line (or one item of a root sequence).",
+    }
+)
+
+
+def convert_document(  # noqa: PLR0913
+    yaml_reader: YamlInput,
+    json_writer: IO[str],
+    loader: str = LOADER.auto,
+    parse_mode: str = PARSE_MODE.document,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> None:
+    """Convert a single YAML document to JSON."""
+    if parse_mode == PARSE_MODE.stream:
+        stream_yaml2json(
+            yaml_reader,
+            json_writer,
+            loader=loader,
+            serializer=serializer,
+            expansion=expansion,
+            projection=projection,
+        )
+        return
+    document = load_document(yaml_reader, loader=loader, expansion=expansion, projection=projection)
+    json_writer.write(serializer.dumps(document))
+
+
+def _loader(loader: str, projection: Projection | None) -> Callable[[YamlInput], Any]:
+    """Get a function which creates a (projecting) safe loader for a YAML stream"""
+    if projection is None:
+        return get_loader_class(loader)
+    return partial(projected_loader_class(), get_loader_class(loader), projection)
+
+
+def load_document(
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> dict | list:
+    """Load a single YAML document."""
+    yaml_content = load_single_data(yaml_reader, _loader(loader, projection), expansion)
+    if not isinstance(yaml_content, dict | list):
+        raise TypeError("YAML content could not be parsed to a dict or list.")
+    return yaml_content
+
+
+def load_documents(
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[dict | list]:
+    """Lazily load each document of a YAML stream (empty documents are skipped)."""
+    for document in load_data(yaml_reader, _loader(loader, projection), expansion):
+        if document is None:
+            continue
+        if not isinstance(document, dict | list):
+            raise TypeError("YAML content could not be parsed to a dict or list.")
+        yield document
+
+
+def convert_records(  # noqa: PLR0913
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    parse_mode: str = PARSE_MODE.document,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[str]:
+    """Lazily convert a single YAML document to JSON Lines records.
+
+    Each item of a root sequence is a record, a root mapping is a single record.
+    """
+    if parse_mode == PARSE_MODE.stream:
+        yield from stream_yaml2json_records(
+            yaml_reader,
+            loader=loader,
+            serializer=serializer,
+            expansion=expansion,
+            projection=projection,
+        )
+        return
+    document = load_document(yaml_reader, loader=loader, expansion=expansion, projection=projection)
+    for record in document if isinstance(document, list) else [document]:
+        yield serializer.dumps(record)
+
+
+def normalize(
+    value: Any,  # noqa: ANN401
+    timestamps: bool = False,
+    _parents: set[int] | None = None,
+) -> Any:  # noqa: ANN401
+    """Convert loaded YAML to the same objects as a JSON round trip would do.
+
+    Keys are converted to strings and tuples to lists. Like json.dump, this raises a
+    TypeError for values without a JSON representation (e.g. dates or binary data)
+    and a ValueError for circular references (recursive aliases). With timestamps,
+    dates and timestamps are kept.
+    """
+    if value is None or isinstance(value, str | int | float):
+        return value
+    if timestamps and isinstance(value, date):
+        return value
+    if not isinstance(value, dict | list | tuple):
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    parents = set() if _parents is None else _parents
+    if id(value) in parents:
+        raise ValueError("Circular reference detected")
+    parents.add(id(value))
+    if isinstance(value, dict):
+        result: dict | list = {
+            json_key(key): normalize(item, timestamps, parents) for key, item in value.items()
+        }
+    else:
+        result = [normalize(item, timestamps, parents) for item in value]
+    parents.discard(id(value))
+    return result
+
+
+def convert_documents(  # noqa: PLR0913
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    parse_mode: str = PARSE_MODE.document,
+    workers: int = 0,
+    chunk_size: int = 16,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[str]:
+    """Lazily convert each document of a YAML stream to a JSON string.
+
+    Empty documents are skipped. With more than one worker, the documents are split
+    and converted in a process pool.
+    """
+    if workers > 1:
+        for documents in convert_texts(
+            split_documents(yaml_reader),
+            loader=loader,
+            parse_mode=parse_mode,
+            multi_document=True,
+            workers=workers,
+            chunk_size=chunk_size,
+            serializer=serializer,
+            expansion=expansion,
+            projection=projection,
+        ):
+            yield from documents
+        return
+    if parse_mode == PARSE_MODE.stream:
+        yield from stream_yaml2json_documents(
+            yaml_reader,
+            loader=loader,
+            serializer=serializer,
+            expansion=expansion,
+            projection=projection,
+        )
+        return
+    for document in load_documents(
+        yaml_reader, loader=loader, expansion=expansion, projection=projection
+    ):
+        yield serializer.dumps(document)
+
+
+def convert_text(  # noqa: PLR0913
+    yaml_code: str,
+    loader: str = LOADER.auto,
+    parse_mode: str = PARSE_MODE.document,
+    multi_document: bool = False,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[str]:
+    """Lazily convert YAML code to JSON strings (one per document)."""
+    with io.StringIO(yaml_code) as yaml_reader:
+        if multi_document:
+            yield from convert_documents(
+                yaml_reader,
+                loader=loader,
+                parse_mode=parse_mode,
+                serializer=serializer,
+                expansion=expansion,
+                projection=projection,
+            )
+            return
+        with io.StringIO() as json_writer:
+            convert_document(
+                yaml_reader,
+                json_writer,
+                loader=loader,
+                parse_mode=parse_mode,
+                serializer=serializer,
+                expansion=expansion,
+                projection=projection,
+            )
+            yield json_writer.getvalue()
+
+
+def _convert_text_to_list(  # noqa: PLR0913
+    yaml_code: str,
+    loader: str,
+    parse_mode: str,
+    multi_document: bool,
+    serializer: JsonSerializer,
+    expansion: ExpansionPolicy,
+    projection: Projection | None,
+) -> list[str]:
+    """Convert YAML code to a list of JSON strings (picklable pool task)"""
+    return list(
+        convert_text(
+            yaml_code,
+            loader=loader,
+            parse_mode=parse_mode,
+            multi_document=multi_document,
+            serializer=serializer,
+            expansion=expansion,
+            projection=projection,
+        )
+    )
+
+
+def convert_texts(  # noqa: PLR0913
+    texts: Iterable[str],
+    loader: str = LOADER.auto,
+    parse_mode: str = PARSE_MODE.document,
+    multi_document: bool = False,
+    workers: int = 0,
+    chunk_size: int = 16,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[list[str]]:
+    """Lazily convert many YAML texts to lists of JSON strings, keeping the order.
+
+    With more than one worker, the texts are converted in a process pool.
+    """
+    function = partial(
+        _convert_text_to_list,
+        loader=loader,
+        parse_mode=parse_mode,
+        multi_document=multi_document,
+        serializer=serializer,
+        expansion=expansion,
+        projection=projection,
+    )
+    return map_texts(function, texts, workers=workers, chunk_size=chunk_size)
+
+
+def _is_marker(line: str, marker: str) -> bool:
+    """Check if a line starts with a document marker"""
+    return line.startswith(marker) and (len(line) == len(marker) or line[len(marker)] in " \t\r\n")
+
+
+def split_documents(yaml_reader: Iterable[str]) -> Iterator[str]:
+    """Lazily split a YAML stream into the texts of its documents without parsing it.
+
+    Document markers and directives at the start of a line always separate documents,
+    since they are not allowed inside of document content.
+    """
+    lines: list[str] = []
+    has_content = False
+    for line in yaml_reader:
+        if line.startswith("%") or _is_marker(line, "---"):
+            if has_content:
+                yield "".join(lines)
+                lines = []
+            has_content = not line.startswith("%")
+        elif line.strip() and not line.lstrip().startswith("#"):
+            has_content = True
+        lines.append(line)
+    if has_content:
+        yield "".join(lines)
+
+
+def write_documents(
+    documents: Iterator[str],
+    json_writer: IO[str],
+    output_format: str = OUTPUT_FORMAT.json,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+) -> None:
+    """Write JSON documents as JSON array or as JSON Lines"""
+    if output_format == OUTPUT_FORMAT.jsonl:
+        for document in documents:
+            json_writer.write(document)
+            json_writer.write("\n")
+        return
+    json_writer.write("[")
+    for index, document in enumerate(documents):
+        if index:
+            json_writer.write(serializer.item_separator)
+        json_writer.write(document)
+    json_writer.write("]")
+
+
+def write_keyed_documents(
+    documents: Iterator[tuple[str, str]],
+    json_writer: IO[str],
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+) -> None:
+    """Write JSON documents as JSON object with the given keys"""
+    json_writer.write("{")
+    for index, (key, document) in enumerate(documents):
+        if index:
+            json_writer.write(serializer.item_separator)
+        json_writer.write(json.dumps(key))
+        json_writer.write(serializer.key_separator)
+        json_writer.write(document)
+    json_writer.write("}")
@@ -0,0 +1,93 @@
+"""Concurrent download of project file resources"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import PurePosixPath
+from types import TracebackType
+
+import requests
+from cmem.cmempy import config
+from cmem.cmempy.api import get_access_token
+from cmem.cmempy.workspace.projects.resources import get_resources
+from cmem.cmempy.workspace.projects.resources.resource import get_resource_uri
+from requests.adapters import HTTPAdapter
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def match_resources(project_id: str, pattern: str) -> list[str]:
+    """Get the sorted names of the project file resources, which match a glob pattern
+
+    Like in pathlib, `*` does not match across directories, but `**` does.
+    """
+    names = (str(resource["fullPath"]) for resource in get_resources(project_id))
+    return sorted(_ for _ in names if PurePosixPath(_).full_match(pattern))
+
+
+class ResourceDownloader:
+    """Downloads project file resources in a thread pool over pooled HTTP connections
+
+    Unlike single cmempy requests, all downloads share one session (with one
+    connection per worker) and one access token.
+    """
+
+    def __init__(self, project_id: str, workers: int = 4, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+        self.project_id = project_id
+        self.workers = max(workers, 1)
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.verify = config.get_ssl_verify()
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {get_access_token()!s}",
+                "User-Agent": config.get_cmem_user_agent(),
+                **config.get_custom_http_headers(),
+            }
+        )
+
+    def __enter__(self) -> "ResourceDownloader":
+        """Use the downloader as context manager, which closes the session on exit"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the pooled connections"""
+        self.session.close()
+
+    def download(self, name: str) -> bytes:
+        """Download a project file resource"""
+        uri = get_resource_uri(project_name=self.project_id, resource_name=name)
+        with self.session.get(uri, stream=True) as response:
+            response.raise_for_status()
+            return b"".join(response.iter_content(chunk_size=self.chunk_size))
+
+    def download_all(self, names: Iterable[str]) -> Iterator[tuple[str, bytes]]:
+        """Lazily download project file resources concurrently, in the order of the names
+
+        At most two downloads per worker are pending, so only a few files are held
+        in memory.
+        """
+        names = iter(names)
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="cmem-plugin-yaml-download"
+        )
+        pending: deque[tuple[str, Future[bytes]]] = deque()
+        try:
+            for name in islice(names, 2 * self.workers):
+                pending.append((name, executor.submit(self.download, name)))
+            while pending:
+                name, future = pending.popleft()
+                for upcoming in islice(names, 1):
+                    pending.append((upcoming, executor.submit(self.download, upcoming)))
+                yield name, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
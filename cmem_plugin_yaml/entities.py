@@ -0,0 +1,247 @@
+"""Lazy building of entities from parsed data"""
+
+import math
+from collections import deque
+from collections.abc import Callable, Iterator
+from datetime import date, datetime
+from typing import Any
+
+from cmem_plugin_base.dataintegration.entity import Entities, Entity, EntityPath, EntitySchema
+from ulid import ULID
+
+ROOT = "root"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+XSD_STRING = f"{XSD}string"
+
+VALUE_TYPES: dict[type, str] = {
+    bool: f"{XSD}boolean",
+    int: f"{XSD}integer",
+    float: f"{XSD}double",
+    datetime: f"{XSD}dateTime",
+    date: f"{XSD}date",
+}
+"""XSD datatypes of the scalar types inferred by YAML (all others are strings)"""
+
+
+class TypedEntityPath(EntityPath):
+    """A path in a schema with the XSD datatype of its values (empty for relations)
+
+    The datatype is only available to Python consumers of the schema: it is not part of
+    the comparison (paths are equal to EntityPaths) and not read by DataIntegration.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        is_relation: bool = False,
+        is_single_value: bool = False,
+        value_type: str = "",
+    ) -> None:
+        super().__init__(path=path, is_relation=is_relation, is_single_value=is_single_value)
+        self.value_type = value_type
+
+    def __repr__(self) -> str:
+        """Get a string representation"""
+        return f"{super().__repr__()[:-2]}, 'value_type': {self.value_type!r}}})"
+
+
+def _value_type(value: Any, value_type: str | None) -> str | None:  # noqa: ANN401
+    """Merge the datatype of a scalar (None is ignored) into the datatype seen so far"""
+    if value is None:
+        return value_type
+    this_type = VALUE_TYPES.get(type(value), XSD_STRING)
+    if value_type is None or value_type == this_type:
+        return this_type
+    if {value_type, this_type} == {VALUE_TYPES[int], VALUE_TYPES[float]}:
+        return VALUE_TYPES[float]
+    return XSD_STRING
+
+
+def _merge_value_types(kind: str, value: Any, value_type: str | None) -> str | None:  # noqa: ANN401
+    """Merge the datatypes of the scalars of a value (a scalar or a list of scalars)"""
+    if kind == "list":
+        for item in value:
+            value_type = _value_type(item, value_type)
+        return value_type
+    if kind in ("dict", "list_dict"):
+        return value_type
+    return _value_type(value, value_type)
+
+
+def _index(data: Any, path: str, index: dict[str, dict[str, list]], typed: bool) -> None:  # noqa: ANN401
+    """Add the keys of the data objects to the index of their path (see index_paths)"""
+    if isinstance(data, list):
+        for item in data:
+            _index(item, path, index, typed)
+        return
+    if not isinstance(data, dict):
+        return
+    keys = index.get(path)
+    is_new = keys is None
+    keys = {} if keys is None else keys
+    for key, value in data.items():
+        kind = _index_value(value, path, key, index, typed)
+        entry = keys.get(key)
+        if entry is None:
+            entry = keys[key] = [kind, None]
+        else:
+            entry[0] = kind
+        if typed:
+            entry[1] = _merge_value_types(kind, value, entry[1])
+    if is_new:
+        # after the sub paths, like in generate_paths_from_data
+        index[path] = keys
+
+
+def _index_value(
+    value: Any,  # noqa: ANN401
+    path: str,
+    key: str,
+    index: dict[str, dict[str, list]],
+    typed: bool,
+) -> str:
+    """Index the objects of a value (at the sub path of its key) and get its kind"""
+    kind = type(value).__name__
+    if kind == "dict":
+        _index(value, f"{path}/{key}", index, typed)
+    elif kind == "list":
+        for item in value:
+            if isinstance(item, dict):
+                kind = "list_dict"
+                _index(item, f"{path}/{key}", index, typed)
+    return kind
+
+
+def index_paths(data: dict | list, typed: bool = False) -> dict[str, dict[str, list]]:
+    """Get the keys of each path of the data with their kind (in a single pass)
+
+    Each key has the type name of its last value (or list_dict for lists of objects),
+    like in generate_paths_from_data (cmem-plugin-base). With typed, the XSD datatype of
+    all of its scalar values is merged as well (None if there are only nulls).
+    """
+    index: dict[str, dict[str, list]] = {}
+    _index(data, ROOT, index, typed)
+    return index
+
+
+def get_schemas(data: dict | list, typed: bool = False) -> dict[str, EntitySchema]:
+    """Get the entity schema for each path of the data (in a first pass over the data)
+
+    The schemas are the same as the ones of build_entities_from_data (cmem-plugin-base).
+    With typed, the paths are tagged with the XSD datatype of their values.
+    """
+    schemas = {}
+    for path, keys in index_paths(data, typed=typed).items():
+        paths = []
+        for key, (kind, value_type) in keys.items():
+            is_relation = kind in ("dict", "list_dict")
+            is_single_value = kind not in ("list", "list_dict")
+            if not typed:
+                paths.append(EntityPath(key, is_relation, is_single_value))
+                continue
+            datatype = "" if is_relation else value_type or XSD_STRING
+            paths.append(TypedEntityPath(key, is_relation, is_single_value, datatype))
+        schemas[path] = EntitySchema(type_uri="", paths=paths)
+    return schemas
+
+
+def typed_value(value: Any) -> str:  # noqa: ANN401
+    """Get the canonical lexical form of a scalar for its XSD datatype"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("INF" if value > 0 else "-INF")
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return str(value)
+
+
+Fields = dict[str, list[tuple[str, bool, bool, str]]]
+"""Precomputed paths of each schema (key, is relation, is single value, sub path)"""
+
+
+def get_fields(schemas: dict[str, EntitySchema]) -> Fields:
+    """Precompute the paths of the schemas, so they are not derived per entity"""
+    return {
+        path: [(_.path, _.is_relation, _.is_single_value, f"{path}/{_.path}") for _ in schema.paths]
+        for path, schema in schemas.items()
+    }
+
+
+def walk_entities(
+    data: dict, fields: Fields, path: str = ROOT, text: Callable[[Any], str] = str
+) -> Iterator[tuple[str, Entity]]:
+    """Lazily generate the entities of a data object with their paths
+
+    Sub entities are generated before the entity, which refers to them. Scalars are
+    converted to strings with text.
+    """
+    values = []
+    for key, is_relation, is_single_value, sub_path in fields[path]:
+        value = data.get(key)
+        if value is None:
+            values.append([""])
+        elif not is_relation:
+            values.append([text(value)] if is_single_value else [text(_) for _ in value])
+        else:
+            sub_entity_uris = []
+            for sub_data in [value] if is_single_value else value:
+                for sub_entity_path, sub_entity in walk_entities(sub_data, fields, sub_path, text):
+                    yield sub_entity_path, sub_entity
+                # the last entity of a walk is the sub entity itself
+                sub_entity_uris.append(sub_entity.uri)
+            values.append(sub_entity_uris)
+    yield path, Entity(uri=f"urn:x-ulid:{ULID()}", values=values)
+
+
+class EntityDispatcher:
+    """Distribute the entities of a single walk to one iterator per path
+
+    Entities of other paths are buffered until their iterator is consumed, so the
+    entities of the consumed path are generated while they are requested.
+    """
+
+    def __init__(self, walk: Iterator[tuple[str, Entity]], paths: list[str]):
+        self.walk = walk
+        self.buffers: dict[str, deque[Entity]] = {path: deque() for path in paths}
+
+    def entities(self, path: str) -> Iterator[Entity]:
+        """Lazily get the entities of a path"""
+        buffer = self.buffers[path]
+        while True:
+            if buffer:
+                yield buffer.popleft()
+                continue
+            try:
+                entity_path, entity = next(self.walk)
+            except StopIteration:
+                return
+            self.buffers[entity_path].append(entity)
+
+
+def build_entities(data: dict | list, typed: bool = False) -> Entities | None:
+    """Lazily build entities (and sub entities) from a data object
+
+    This produces the same entities as build_entities_from_data (cmem-plugin-base),
+    but entities are generated while they are consumed instead of all upfront.
+    With typed, the schema paths are TypedEntityPaths and scalars are written in the
+    canonical form of their datatype (e.g. true instead of True).
+    """
+    schemas = get_schemas(data, typed=typed) if data else {}
+    if ROOT not in schemas:
+        return None
+    fields = get_fields(schemas)
+    text = typed_value if typed else str
+    items = data if isinstance(data, list) else [data]
+    walk = (entity for item in items for entity in walk_entities(item, fields, text=text))
+    dispatcher = EntityDispatcher(walk, paths=list(schemas))
+    return Entities(
+        entities=dispatcher.entities(ROOT),
+        schema=schemas[ROOT],
+        sub_entities=[
+            Entities(entities=dispatcher.entities(path), schema=schema)
+            for path, schema in schemas.items()
+            if path != ROOT
+        ],
+    )
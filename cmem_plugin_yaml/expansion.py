@@ -0,0 +1,261 @@
+"""Limits for the expansion of YAML anchors and aliases
+
+An alias refers to an anchored node instead of repeating it. Loaded documents share
+these nodes, but JSON repeats them, so a few KB of nested aliases can expand to
+gigabytes of JSON. The expansion is measured on the composed node graph, before the
+document is constructed and serialized.
+"""
+
+from __future__ import annotations
+
+import json
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, cast
+
+from cmem_plugin_yaml.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    import yaml
+
+    from cmem_plugin_yaml.mapped import YamlInput
+else:
+    yaml = lazy_import("yaml")
+
+REFERENCE_KEY = "$ref"
+REFERENCE_SIZE = len('{"$ref": "#"}')
+TIME_CHECK_INTERVAL = 1024
+
+
+class ExpansionPolicy:
+    """Limits for expanded documents (0 means unlimited) and how aliases are expanded
+
+    Limits apply to all documents of a conversion. The size is estimated from the
+    scalar values, the depth counts nested collections and scalars. With references,
+    each repeated collection is written as a JSON reference ({"$ref": "#/pointer"})
+    to its first occurrence.
+    """
+
+    def __init__(
+        self,
+        nodes: int = 0,
+        size: int = 0,
+        depth: int = 0,
+        seconds: float = 0,
+        references: bool = False,
+    ):
+        self.nodes = nodes
+        self.size = size
+        self.depth = depth
+        self.seconds = seconds
+        self.references = references
+
+    def is_limited(self) -> bool:
+        """Check if the expanded nodes, size or depth are limited"""
+        return bool(self.nodes or self.size or self.depth)
+
+    def is_guarded(self) -> bool:
+        """Check if any limit is set (including the time limit)"""
+        return self.is_limited() or bool(self.seconds)
+
+
+DEFAULT_EXPANSION = ExpansionPolicy()
+"""Aliases are expanded without limits"""
+
+
+class ExpansionGuard:
+    """Accounts the expansion of a conversion and raises a ValueError on exceeded limits"""
+
+    def __init__(self, policy: ExpansionPolicy = DEFAULT_EXPANSION):
+        self.policy = policy
+        self.deadline = perf_counter() + policy.seconds if policy.seconds else None
+        self.nodes = 0
+        self.size = 0
+
+    def check_time(self) -> None:
+        """Raise an error if the conversion takes too long"""
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise ValueError(
+                f"YAML conversion took longer than {self.policy.seconds} s (parse time limit)."
+            )
+
+    def reader(self, yaml_reader: YamlInput) -> YamlInput:
+        """Get a reader of the YAML input, which checks the time on each read"""
+        if self.deadline is None:
+            return yaml_reader
+        # the loaders only read the input and get its name
+        return cast("YamlInput", TimedReader(yaml_reader, self))
+
+    def count(self, nodes: int = 0, size: int = 0, depth: int = 0) -> None:
+        """Account expanded nodes and bytes and check the limits"""
+        self.nodes += nodes
+        self.size += size
+        policy = self.policy
+        if policy.nodes and self.nodes > policy.nodes:
+            raise ValueError(
+                f"YAML expands to more than {policy.nodes} nodes (expanded node limit)."
+            )
+        if policy.size and self.size > policy.size:
+            raise ValueError(
+                f"YAML expands to more than {policy.size} bytes of JSON (expanded size limit)."
+            )
+        if policy.depth and depth > policy.depth:
+            raise ValueError(
+                f"YAML is nested deeper than {policy.depth} levels (nesting depth limit)."
+            )
+
+    def count_node(self, depth: int) -> None:
+        """Account a node of a streamed document and check the limits"""
+        self.count(nodes=1, depth=depth)
+        if self.nodes % TIME_CHECK_INTERVAL == 0:
+            self.check_time()
+
+    def check_node(self, root: yaml.Node) -> None:
+        """Measure the expansion of a composed document and check the limits"""
+        self.check_time()
+        if self.policy.is_limited():
+            self.count(*self._measure(root))
+
+    def _measure(self, root: yaml.Node) -> tuple[int, int, int]:
+        """Get the expanded nodes, estimated JSON size and depth of a node graph
+
+        Shared nodes (aliases) are measured once. Recursive aliases are not expanded.
+        """
+        measured: dict[int, tuple[int, int, int]] = {}
+        referenced: set[int] = set()
+        open_nodes: set[int] = set()
+        stack: list[tuple[yaml.Node, bool]] = [(root, False)]
+        while stack:
+            node, children_measured = stack.pop()
+            if id(node) in measured:
+                continue
+            children = _children(node)
+            if not children_measured:
+                open_nodes.add(id(node))
+                stack.append((node, True))
+                stack.extend(
+                    (_, False)
+                    for _ in children
+                    if id(_) not in measured and id(_) not in open_nodes
+                )
+                continue
+            open_nodes.discard(id(node))
+            nodes, size, depth = 1, _own_size(node, len(children)), 0
+            for child in children:
+                if id(child) not in measured or (
+                    self.policy.references and id(child) in referenced
+                ):
+                    # a recursive alias or a reference to an already written collection
+                    child_measure = (1, REFERENCE_SIZE, 1)
+                else:
+                    child_measure = measured[id(child)]
+                    if not isinstance(child, yaml.ScalarNode):
+                        referenced.add(id(child))
+                nodes += child_measure[0]
+                size += child_measure[1]
+                depth = max(depth, child_measure[2])
+            measured[id(node)] = (nodes, size, depth + 1)
+            if len(measured) % TIME_CHECK_INTERVAL == 0:
+                self.check_time()
+        return measured[id(root)]
+
+
+class TimedReader:
+    """Checks the time of a conversion, whenever the parser reads the next chunk
+
+    Documents are composed while they are read, so a slow parse is stopped before
+    the complete document is composed (also by the libyaml based loader).
+    """
+
+    def __init__(self, yaml_reader: YamlInput, guard: ExpansionGuard):
+        self.yaml_reader = yaml_reader
+        self.guard = guard
+        self.name = str(getattr(yaml_reader, "name", "<file>"))
+
+    def read(self, size: int = -1) -> str | bytes:
+        """Check the time and read the next chunk"""
+        self.guard.check_time()
+        return self.yaml_reader.read(size)
+
+
+def _children(node: yaml.Node) -> list[yaml.Node]:
+    """Get the child nodes of a node (keys and values of a mapping)"""
+    if isinstance(node, yaml.MappingNode):
+        return [_ for pair in node.value for _ in pair]
+    if isinstance(node, yaml.SequenceNode):
+        return list(node.value)
+    return []
+
+
+def _own_size(node: yaml.Node, children: int) -> int:
+    """Estimate the JSON size of a node without its children"""
+    if isinstance(node, yaml.ScalarNode):
+        return len(node.value) + 2
+    # brackets and separators
+    return 2 + 2 * children
+
+
+def load_data(
+    yaml_reader: YamlInput, loader_class: Callable[[YamlInput], Any], policy: ExpansionPolicy
+) -> Iterator[Any]:
+    """Lazily load each document of a YAML stream within the expansion limits
+
+    This does the same as yaml.load_all, but checks each composed document before it
+    is constructed.
+    """
+    guard = ExpansionGuard(policy)
+    loader = loader_class(guard.reader(yaml_reader))
+    try:
+        while loader.check_node():
+            node = loader.get_node()
+            guard.check_node(node)
+            data = loader.construct_document(node)
+            yield reference_aliases(data) if policy.references else data
+            guard.check_time()
+    finally:
+        loader.dispose()
+
+
+def load_single_data(
+    yaml_reader: YamlInput, loader_class: Callable[[YamlInput], Any], policy: ExpansionPolicy
+) -> Any:  # noqa: ANN401
+    """Load a single YAML document within the expansion limits (like yaml.load)"""
+    guard = ExpansionGuard(policy)
+    loader = loader_class(guard.reader(yaml_reader))
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None
+        guard.check_node(node)
+        data = loader.construct_document(node)
+    finally:
+        loader.dispose()
+    return reference_aliases(data) if policy.references else data
+
+
+def _escape(key: Any) -> str:  # noqa: ANN401
+    """Escape a key as JSON pointer segment (non-string keys as the json module writes them)"""
+    key = key if isinstance(key, str) else json.dumps(key)
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def reference_aliases(value: Any, pointer: str = "#", _seen: dict[int, str] | None = None) -> Any:  # noqa: ANN401
+    """Replace repeated collections of loaded YAML by JSON references
+
+    The first occurrence of a collection is kept, each repetition (an alias) is replaced
+    by {"$ref": pointer} with a JSON pointer to the first occurrence. This also resolves
+    recursive aliases.
+    """
+    if not isinstance(value, dict | list | tuple):
+        return value
+    seen = {} if _seen is None else _seen
+    if id(value) in seen:
+        return {REFERENCE_KEY: seen[id(value)]}
+    seen[id(value)] = pointer
+    if isinstance(value, dict):
+        return {
+            key: reference_aliases(item, f"{pointer}/{_escape(key)}", seen)
+            for key, item in value.items()
+        }
+    return [reference_aliases(item, f"{pointer}/{index}", seen) for index, item in enumerate(value)]
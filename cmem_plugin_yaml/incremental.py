@@ -0,0 +1,93 @@
+"""Incremental conversion of the top-level sections of YAML documents
+
+A section is a top-level key (with its value) of a block mapping or a top-level item
+of a block sequence. Sections are split on the text, without parsing it, so unchanged
+sections can be taken from the result cache and only changed sections are parsed.
+The JSON of each section is the part of the document JSON between its brackets, so
+splicing the sections results in the same JSON as converting the document.
+"""
+
+import json
+from collections.abc import Iterable
+from types import SimpleNamespace
+
+SECTION_KIND = SimpleNamespace()
+SECTION_KIND.mapping = "mapping"
+SECTION_KIND.sequence = "sequence"
+
+NOT_SPLITTABLE = tuple("?:,[]{}&*!|>%@`")
+"""Characters at the start of a top-level line, which are not supported"""
+
+MERGE_KEY = "<<"
+
+
+def _is_item(line: str) -> bool:
+    """Check if a line starts a block sequence item"""
+    return line.startswith("-") and (len(line) == 1 or line[1] in " \t\r\n")
+
+
+def _is_merge(line: str) -> bool:
+    """Check if a line starts with a merge key, which can add several keys to a section"""
+    return line.split(":", 1)[0].strip() == MERGE_KEY
+
+
+def split_sections(yaml_text: str) -> tuple[str, list[str]] | None:
+    """Split a single YAML document into its top-level sections
+
+    Comments and empty lines belong to the preceding section. Returns None for
+    documents which can not be split (e.g. flow collections, tags, anchors, merge keys
+    or directives at the top level, or multiple documents).
+    """
+    kind: str | None = None
+    sections: list[list[str]] = []
+    for line in yaml_text.splitlines(keepends=True):
+        if not line.strip() or line.startswith("#") or line[0] in " \t":
+            if sections:
+                sections[-1].append(line)
+            elif line.strip() and not line.lstrip().startswith("#"):
+                return None
+            continue
+        if line.startswith(("---", "...", *NOT_SPLITTABLE)) or _is_merge(line):
+            return None
+        if _is_item(line):
+            if kind == SECTION_KIND.mapping:
+                # a sequence on the level of its key is the value of this key
+                sections[-1].append(line)
+                continue
+            kind = SECTION_KIND.sequence
+        elif kind == SECTION_KIND.sequence:
+            return None
+        else:
+            kind = SECTION_KIND.mapping
+        sections.append([line])
+    if kind is None:
+        return None
+    return kind, ["".join(_) for _ in sections]
+
+
+def section_fragment(kind: str, json_text: str) -> str:
+    """Get the fragment of a converted section, which is spliced into the document JSON"""
+    expected = "{}" if kind == SECTION_KIND.mapping else "[]"
+    if json_text[:1] + json_text[-1:] != expected:
+        raise ValueError(f"Section is not a {kind}: {json_text[:40]}")
+    return json_text[1:-1]
+
+
+def check_keys(fragments: Iterable[str]) -> None:
+    """Raise a ValueError, if mapping section fragments have the same key
+
+    All keys of each fragment are checked (a section could have merged keys).
+    """
+    keys = set()
+    for fragment in fragments:
+        pairs = json.loads(f"{{{fragment}}}", object_pairs_hook=list)
+        for key, _ in pairs:
+            if key in keys:
+                raise ValueError(f"Duplicate top-level key: {key}")
+            keys.add(key)
+
+
+def splice(kind: str, fragments: list[str], item_separator: str) -> str:
+    """Splice section fragments to the JSON of a document"""
+    body = item_separator.join(_ for _ in fragments if _)
+    return f"{{{body}}}" if kind == SECTION_KIND.mapping else f"[{body}]"
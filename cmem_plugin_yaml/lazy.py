@@ -0,0 +1,23 @@
+"""Lazily imported modules"""
+
+import sys
+from importlib.util import LazyLoader, find_spec, module_from_spec
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Get a module, which is executed when one of its attributes is first accessed
+
+    Plugin discovery imports all modules of the package, so heavy dependencies (like
+    yaml) are only imported when a plugin actually converts something.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    spec.loader = LazyLoader(spec.loader)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
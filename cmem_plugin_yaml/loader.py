@@ -0,0 +1,50 @@
+"""YAML loader selection"""
+
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from cmem_plugin_yaml.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = lazy_import("yaml")
+
+LOADER = SimpleNamespace()
+LOADER.auto = "auto"
+LOADER.c = "c"
+LOADER.python = "python"
+LOADER.options = OrderedDict(
+    {
+        LOADER.auto: f"{LOADER.auto}: "
+        "Use the libyaml based C loader if available, otherwise the Python loader.",
+        LOADER.c: f"{LOADER.c}: Use the libyaml based C loader (fails if not available).",
+        LOADER.python: f"{LOADER.python}: Use the pure Python loader.",
+    }
+)
+
+
+def libyaml_available() -> bool:
+    """Check if PyYAML was built with libyaml support"""
+    return bool(getattr(yaml, "__with_libyaml__", False)) and hasattr(yaml, "CSafeLoader")
+
+
+def resolve_loader(name: str = LOADER.auto) -> str:
+    """Resolve a loader option to the loader which is actually used (c or python)"""
+    if name == LOADER.auto:
+        name = LOADER.c if libyaml_available() else LOADER.python
+    if name not in (LOADER.c, LOADER.python):
+        raise ValueError(f"Unknown YAML loader: {name}")
+    if name == LOADER.c and not libyaml_available():
+        raise ValueError(
+            f"YAML loader '{LOADER.c}' requested, but PyYAML was built without libyaml."
+        )
+    return name
+
+
+def get_loader_class(name: str = LOADER.auto) -> type:
+    """Get the safe loader class for a loader option"""
+    if resolve_loader(name) == LOADER.c:
+        return yaml.CSafeLoader
+    return yaml.SafeLoader
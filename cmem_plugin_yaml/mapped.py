@@ -0,0 +1,84 @@
+"""Memory-mapped YAML input for large files"""
+
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+
+MMAP_THRESHOLD = 0
+"""Files of at least this size (in bytes) are memory-mapped (0, the default, disables it)"""
+
+RELEASE_SIZE = 1024 * 1024
+"""Read pages of a map are released from the resident memory in steps of this size"""
+
+
+class MappedFile:
+    """Read-only memory map of a file, which the YAML loaders read like a binary stream
+
+    The loaders get UTF-8 encoded bytes, which the libyaml based parser decodes itself,
+    so the file is not decoded to strings in Python first. Lines are decoded, when the
+    file is split into documents.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        self.file = file
+        self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.name = str(getattr(file, "name", "<file>"))
+        self.released = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read (and copy) the next bytes of the map"""
+        data = self.map.read(size)
+        self._release()
+        return data
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate the decoded lines of the map"""
+        while line := self.map.readline():
+            self._release()
+            yield line.decode("utf-8")
+
+    def _release(self) -> None:
+        """Release the read pages, so they do not add up in the resident memory
+
+        The pages stay in the page cache, so they are not read from disk again.
+        """
+        end = self.map.tell() // RELEASE_SIZE * RELEASE_SIZE
+        if end > self.released and hasattr(mmap, "MADV_DONTNEED"):
+            self.map.madvise(mmap.MADV_DONTNEED, self.released, end - self.released)
+            self.released = end
+
+    def close(self) -> None:
+        """Close the map and the file"""
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "MappedFile":
+        """Use the map as context manager, which closes it (and the file) on exit"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the map and the file"""
+        self.close()
+
+
+YamlInput = IO[str] | MappedFile
+"""YAML text or a memory-mapped file"""
+
+
+def is_mapped(size: int, threshold: int = MMAP_THRESHOLD) -> bool:
+    """Check if a file of this size is memory-mapped"""
+    return 0 < threshold <= size
+
+
+def open_yaml_file(yaml_file: Path, threshold: int = MMAP_THRESHOLD) -> YamlInput:
+    """Open a YAML file as text, or memory-mapped if it is at least threshold bytes large"""
+    if is_mapped(yaml_file.stat().st_size, threshold):
+        return MappedFile(Path.open(yaml_file, "rb"))
+    return Path.open(yaml_file, encoding="utf-8")
@@ -0,0 +1,208 @@
+"""Per-phase metrics of an execution"""
+
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import cache
+from time import perf_counter
+from types import SimpleNamespace, TracebackType
+from typing import TYPE_CHECKING, TypeVar
+
+from cmem_plugin_base.dataintegration.plugins import PluginLogger
+
+from cmem_plugin_yaml.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import tracemalloc
+else:
+    tracemalloc = lazy_import("tracemalloc")
+
+T = TypeVar("T")
+
+PHASE = SimpleNamespace()
+PHASE.input = "input"
+PHASE.parse = "parse"
+PHASE.serialize = "serialize"
+PHASE.output = "output"
+PHASE.upload = "upload"
+
+METRICS_ENTRY_POINT_GROUP = "cmem_plugin_yaml.metrics"
+"""Entry point group of metrics hooks, which are loaded from installed packages"""
+
+METRICS_HOOKS: list[Callable[[list[dict]], None]] = []
+"""Metrics hooks, which get the phase records of each execution (see add_metrics_hook)"""
+
+
+def add_metrics_hook(hook: Callable[[list[dict]], None]) -> None:
+    """Register a hook for exporting metrics to an external collector
+
+    The hook gets one record (dict) per phase after each execution.
+    """
+    METRICS_HOOKS.append(hook)
+
+
+@cache
+def _entry_point_hooks() -> tuple[list[Callable[[list[dict]], None]], list[str]]:
+    """Load the hooks of the entry point group once (with the errors of broken ones)"""
+    from importlib.metadata import entry_points  # noqa: PLC0415
+
+    hooks = []
+    errors = []
+    for entry_point in entry_points(group=METRICS_ENTRY_POINT_GROUP):
+        try:
+            hooks.append(entry_point.load())
+        except Exception as error:  # noqa: BLE001
+            errors.append(f"Metrics hook {entry_point.name!r} could not be loaded: {error}")
+    return hooks, errors
+
+
+def export_metrics(records: list[dict], logger: PluginLogger) -> None:
+    """Log the records (one line per phase) and hand them over to the metrics hooks
+
+    Failing hooks (and hooks which can not be loaded) are logged, but do not fail the
+    execution.
+    """
+    for record in records:
+        line = " ".join(f"{key}={value}" for key, value in record.items())
+        logger.info(f"metrics {line}")
+    entry_point_hooks, errors = _entry_point_hooks()
+    for error in errors:
+        logger.warning(error)
+    for hook in [*METRICS_HOOKS, *entry_point_hooks]:
+        try:
+            hook(records)
+        except Exception as error:  # noqa: BLE001
+            logger.warning(f"Metrics hook {hook!r} failed: {error}")
+
+
+class PhaseMetrics:
+    """Wall time, bytes in and out and peak memory of a phase (summed over its runs)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.peak_bytes: int | None = None
+
+    def record(self) -> dict:
+        """Get the metrics as a record with JSON compatible values"""
+        return {
+            "phase": self.name,
+            "seconds": round(self.seconds, 6),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "peak_bytes": self.peak_bytes,
+        }
+
+    def describe(self) -> str:
+        """Get a short description of the metrics"""
+        parts = [f"{self.seconds:.3f} s"]
+        if self.bytes_in:
+            parts.append(f"{_format_bytes(self.bytes_in)} in")
+        if self.bytes_out:
+            parts.append(f"{_format_bytes(self.bytes_out)} out")
+        if self.peak_bytes is not None:
+            parts.append(f"{_format_bytes(self.peak_bytes)} peak memory")
+        return ", ".join(parts)
+
+
+def _format_bytes(size: int) -> str:
+    if size < 1024:  # noqa: PLR2004
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+class ExecutionMetrics:
+    """Measures the phases of an execution
+
+    Phases can be nested (also by iterators, see timed). The time of a nested phase
+    is not counted for the outer phase. Peak memory is measured with tracemalloc,
+    if trace_memory is enabled, which slows down the execution.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.phases: dict[str, PhaseMetrics] = {}
+        self._local = threading.local()
+        self._tracing = False
+
+    def __enter__(self) -> "ExecutionMetrics":
+        """Start tracing memory allocations (if enabled)"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop tracing memory allocations"""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _stack(self) -> list[list]:
+        """Get the stack of running phases of the current thread ([phase, start] items)"""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        stack: list[list] = self._local.stack
+        return stack
+
+    def _account(self, stack: list[list]) -> None:
+        """Account time (and memory) to the innermost running phase"""
+        if not stack:
+            return
+        now = perf_counter()
+        phase, start = stack[-1]
+        phase.seconds += now - start
+        stack[-1][1] = now
+        if self._tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            phase.peak_bytes = max(phase.peak_bytes or 0, peak)
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseMetrics]:
+        """Measure a phase"""
+        metrics = self.phases.setdefault(name, PhaseMetrics(name))
+        stack = self._stack()
+        self._account(stack)
+        stack.append([metrics, perf_counter()])
+        try:
+            yield metrics
+        finally:
+            self._account(stack)
+            stack.pop()
+            if stack:
+                stack[-1][1] = perf_counter()
+
+    def count(self, name: str, bytes_in: int = 0, bytes_out: int = 0) -> None:
+        """Add bytes to a phase (outside of a measured block)"""
+        metrics = self.phases.setdefault(name, PhaseMetrics(name))
+        metrics.bytes_in += bytes_in
+        metrics.bytes_out += bytes_out
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Lazily measure the time to produce each item of an iterable as a phase"""
+        iterator = iter(items)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def summary(self) -> list[tuple[str, str]]:
+        """Get the metrics as summary of an execution report"""
+        return [(f"Phase {_.name}", _.describe()) for _ in self.phases.values()]
+
+    def records(self) -> list[dict]:
+        """Get the metrics as records (one per phase)"""
+        return [_.record() for _ in self.phases.values()]
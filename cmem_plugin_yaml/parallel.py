@@ -0,0 +1,50 @@
+"""Parallel processing of YAML texts in a process pool"""
+
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+
+POOL_MIN_BYTES = 1024 * 1024
+"""Inputs smaller than this are processed in-process, since starting a pool costs more."""
+
+
+def map_texts(
+    function: Callable[[str], T],
+    texts: Iterable[str],
+    workers: int = 0,
+    chunk_size: int = 16,
+) -> Iterator[T]:
+    """Lazily apply a function to texts, in a process pool if this is worth it.
+
+    Results are returned in the order of the texts. Texts are submitted in windows of
+    `workers * chunk_size` texts, so only two windows are held in memory at a time.
+    Windows are processed in-process, until one has at least POOL_MIN_BYTES.
+    The function needs to be picklable (e.g. a module level function or a partial of it).
+    """
+    texts = iter(texts)
+    if workers < 2:  # noqa: PLR2004
+        yield from map(function, texts)
+        return
+    window_size = workers * chunk_size
+    while window := list(islice(texts, window_size)):
+        if sum(len(_) for _ in window) >= POOL_MIN_BYTES:
+            break
+        yield from map(function, window)
+    else:
+        return
+    # imported here, since most inputs are too small for a pool
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+    from multiprocessing import get_context  # noqa: PLC0415
+
+    # spawn instead of fork, since the plugin may run in a multi-threaded host process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        pending = executor.map(function, window, chunksize=chunk_size)
+        while True:
+            window = list(islice(texts, window_size))
+            upcoming = executor.map(function, window, chunksize=chunk_size) if window else None
+            yield from pending
+            if upcoming is None:
+                return
+            pending = upcoming
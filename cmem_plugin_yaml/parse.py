@@ -1,18 +1,24 @@
 """Load YAML to JSON dataset workflow plugin module"""
 
+import io
 import json
-from collections import OrderedDict
-from collections.abc import Sequence
+import os
+import shutil
+from collections import Counter, OrderedDict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from functools import partial
+from http import HTTPStatus
 from pathlib import Path
-from tempfile import mkdtemp
+from tempfile import mkstemp
+from time import perf_counter
 from types import SimpleNamespace
-from typing import BinaryIO
+from typing import IO, TYPE_CHECKING, BinaryIO, NoReturn
+from urllib.parse import quote
 
-import yaml
 from cmem.cmempy.workspace.projects.datasets.dataset import post_resource
 from cmem.cmempy.workspace.projects.resources.resource import (
+    get_resource_metadata,
     get_resource_response,
-    resource_exist,
 )
 from cmem_plugin_base.dataintegration.context import ExecutionContext, ExecutionReport
 from cmem_plugin_base.dataintegration.description import Icon, Plugin, PluginParameter
@@ -33,12 +39,51 @@ from cmem_plugin_base.dataintegration.ports import (
     UnknownSchemaPort,
 )
 from cmem_plugin_base.dataintegration.utils import setup_cmempy_user_access
-from cmem_plugin_base.dataintegration.utils.entity_builder import build_entities_from_data
+
+from cmem_plugin_yaml.cache import ResultCache, cache_key, content_hash
+from cmem_plugin_yaml.convert import (
+    OUTPUT_FORMAT,
+    PARSE_MODE,
+    convert_document,
+    convert_documents,
+    convert_records,
+    convert_texts,
+    load_document,
+    load_documents,
+    normalize,
+    write_documents,
+    write_keyed_documents,
+)
+from cmem_plugin_yaml.download import ResourceDownloader, match_resources
+from cmem_plugin_yaml.entities import build_entities
+from cmem_plugin_yaml.expansion import ExpansionPolicy
+from cmem_plugin_yaml.incremental import (
+    SECTION_KIND,
+    check_keys,
+    section_fragment,
+    splice,
+    split_sections,
+)
+from cmem_plugin_yaml.lazy import lazy_import
+from cmem_plugin_yaml.loader import LOADER, resolve_loader
+from cmem_plugin_yaml.mapped import MMAP_THRESHOLD, MappedFile, YamlInput, is_mapped, open_yaml_file
+from cmem_plugin_yaml.metrics import PHASE, ExecutionMetrics, export_metrics
+from cmem_plugin_yaml.prefetch import PREFETCH_CHUNKS, prefetch
+from cmem_plugin_yaml.projection import Projection
+from cmem_plugin_yaml.scratch import ScratchArea, ScratchFile
+from cmem_plugin_yaml.serialize import SERIALIZER, JsonSerializer, resolve_serializer
+from cmem_plugin_yaml.upload import upload_json
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = lazy_import("yaml")
 
 SOURCE = SimpleNamespace()
 SOURCE.entities = "entities"
 SOURCE.code = "code"
 SOURCE.file = "file"
+SOURCE.files = "files"
 SOURCE.options = OrderedDict(
     {
         SOURCE.entities: f"{SOURCE.entities}: "
@@ -46,6 +91,21 @@ SOURCE.options = OrderedDict(
         SOURCE.code: f"{SOURCE.code}: Content is parsed from the YAML code field below.",
         SOURCE.file: f"{SOURCE.file}: "
         "Content is parsed from an uploaded project file resource (see advanced options).",
+        SOURCE.files: f"{SOURCE.files}: "
+        "Content is parsed from all project file resources matching a pattern "
+        "(see advanced options).",
+    }
+)
+
+FILES_OUTPUT = SimpleNamespace()
+FILES_OUTPUT.array = "array"
+FILES_OUTPUT.object = "object"
+FILES_OUTPUT.options = OrderedDict(
+    {
+        FILES_OUTPUT.array: f"{FILES_OUTPUT.array}: "
+        "A JSON array with one item per file (one entity per file in target mode "
+        "'json_entities').",
+        FILES_OUTPUT.object: f"{FILES_OUTPUT.object}: A JSON object with the file names as keys.",
     }
 )
 
@@ -81,12 +141,21 @@ formats.
 - **entities**: Parse YAML from input port entities in a workflow
 - **code**: Parse YAML from directly entered source code
 - **file**: Parse YAML from uploaded project file resources
+- **files**: Parse YAML from all project file resources matching a pattern (e.g. `configs/*.yaml`)
 
 **Output Formats:**
 
 - **entities**: Convert parsed structure to entities for workflow processing
-- **json_entities**: Output as single JSON entity to the output port
-- **json_dataset**: Save parsed structure directly to a JSON dataset
+- **json_entities**: Output as JSON entity (or one entity per JSON Lines record) to the
+  output port
+- **json_dataset**: Save parsed structure directly to a JSON dataset (as JSON or JSON Lines)
+
+YAML streams with multiple documents (separated by `---`) can be parsed by enabling
+the *Multiple Documents* advanced option. Each document is then converted on its own.
+
+The *JSON Output Format* advanced option writes JSON Lines instead of a single JSON value:
+one record per document of multiple documents, otherwise one record per item of a root
+sequence.
 
 The plugin provides flexible YAML-to-JSON conversion with configurable input schema
 types and paths for entity-based processing. It includes comprehensive validation and
@@ -120,6 +189,48 @@ error handling for all supported modes.
             advanced=True,
             default_value="",
         ),
+        PluginParameter(
+            name="source_pattern",
+            label="YAML File Pattern (when using the *files* input)",
+            description="Which YAML files do you want to parse? The glob pattern (e.g. "
+            "'configs/*.yaml') is matched against the file resources of the current "
+            "project ('*' does not match across directories, '**' does).",
+            advanced=True,
+            default_value="",
+        ),
+        PluginParameter(
+            name="files_output",
+            label="Output of Multiple Files",
+            description=f"In case of source mode '{SOURCE.files}', you can specify how the "
+            "results of the files are merged.",
+            param_type=ChoiceParameterType(FILES_OUTPUT.options),
+            advanced=True,
+            default_value=FILES_OUTPUT.array,
+        ),
+        PluginParameter(
+            name="download_workers",
+            label="Download Workers",
+            description=f"In case of source mode '{SOURCE.files}', how many files do you "
+            "want to download concurrently (over pooled HTTP connections)?",
+            advanced=True,
+            default_value=4,
+        ),
+        PluginParameter(
+            name="download_chunk_size",
+            label="Download Chunk Size (KiB)",
+            description="In which chunks do you want to download project files?",
+            advanced=True,
+            default_value=1024,
+        ),
+        PluginParameter(
+            name="prefetch_input",
+            label="Prefetch Input File",
+            description=f"In case of source mode '{SOURCE.file}', do you want to parse the "
+            "file while it is downloaded? The download runs in a background thread and "
+            f"fills a buffer of up to {PREFETCH_CHUNKS} chunks, which is read by the parser. "
+            "This can not be combined with a result cache.",
+            advanced=True,
+        ),
         PluginParameter(
             name="target_dataset",
             label="Target Dataset",
@@ -143,6 +254,227 @@ error handling for all supported modes.
             "requested input path.",
             advanced=True,
         ),
+        PluginParameter(
+            name="yaml_loader",
+            label="YAML Loader",
+            description="Which YAML loader do you want to use? The libyaml based C loader "
+            "is much faster than the pure Python loader, but is only available if PyYAML "
+            "was built with libyaml.",
+            param_type=ChoiceParameterType(LOADER.options),
+            advanced=True,
+            default_value=LOADER.auto,
+        ),
+        PluginParameter(
+            name="parse_mode",
+            label="Parse Mode",
+            description="How do you want to convert the YAML document? "
+            "Use the stream mode for very large documents which do not fit into memory.",
+            param_type=ChoiceParameterType(PARSE_MODE.options),
+            advanced=True,
+            default_value=PARSE_MODE.document,
+        ),
+        PluginParameter(
+            name="multi_document",
+            label="Multiple Documents",
+            description="Do you want to parse a stream of multiple YAML documents "
+            "(separated by '---')? Each document is converted on its own and results in "
+            f"its own entity in target mode '{TARGET.json_entities}'.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="output_format",
+            label="JSON Output Format",
+            description=f"In case of target modes '{TARGET.json_dataset}' and "
+            f"'{TARGET.json_entities}', you can specify how the JSON is written. "
+            "JSON Lines have one line per document of multiple documents, otherwise one "
+            "line per item of a root sequence. In target mode "
+            f"'{TARGET.json_entities}', each line results in its own entity.",
+            param_type=ChoiceParameterType(OUTPUT_FORMAT.options),
+            advanced=True,
+            default_value=OUTPUT_FORMAT.json,
+        ),
+        PluginParameter(
+            name="typed_entities",
+            label="Typed Entities",
+            description=f"In case of target mode '{TARGET.entities}', you can keep the "
+            "scalar types inferred by YAML: each path of the output schemas is tagged with "
+            "the XSD datatype of its values (integer, double, boolean, date, dateTime or "
+            "string) and values are written in the canonical form of their datatype (e.g. "
+            "true instead of True). Dates and timestamps are only kept, if the YAML is "
+            "loaded directly (otherwise they can not be converted like in JSON). Note that "
+            "the datatypes are only available to Python plugins consuming the schema; "
+            "DataIntegration does not read them.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="batch_entities",
+            label="Process All Input Entities",
+            description=f"In case of source mode '{SOURCE.entities}', you can parse every "
+            "value of every input entity as its own YAML document (instead of the first "
+            f"value of the first entity only). In target mode '{TARGET.json_entities}', "
+            "each value results in its own JSON entity, which keeps the URI of the input "
+            "entity.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="parse_workers",
+            label="Parse Workers",
+            description="How many worker processes do you want to use for parsing multiple "
+            "documents or input entities in parallel? Use 0 or 1 to parse in the plugin "
+            "process. Small inputs are always parsed in the plugin process.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="parse_chunk_size",
+            label="Parse Chunk Size",
+            description="How many documents do you want to send to a parse worker at once?",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="spill_threshold",
+            label="In-Memory Buffer Size (MiB)",
+            description="Up to which size do you want to keep the YAML input and the JSON "
+            "output in memory? Larger content is written to temporary files. "
+            "Use 0 to always use temporary files.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="mmap_threshold",
+            label="Memory-Mapped Input Size (MiB)",
+            description="From which size on do you want to memory-map YAML input, which is "
+            "written to a temporary file? The parser reads it as UTF-8 bytes without "
+            "decoding it in Python first. Memory-mapping is disabled by default (0), since "
+            "it did not speed up the conversion in the benchmarks. This does not apply to "
+            "prefetched input, which is never written to a temporary file.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="scratch_dir",
+            label="Scratch Directory",
+            description="In which directory do you want to create temporary files? "
+            "A fast local disk or a tmpfs is recommended. Leave empty to use the default "
+            "temporary directory of the system. Temporary files are removed after each "
+            "execution.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="cache_dir",
+            label="Result Cache Directory",
+            description="In which directory do you want to cache conversion results? "
+            "Results are cached by a hash of the YAML content and the conversion options, "
+            "so unchanged YAML is not parsed again. Leave empty to disable the cache.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="cache_size",
+            label="Result Cache Size (MiB)",
+            description="How large can the result cache get? "
+            "The least recently used results are removed first.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="upload_changed_only",
+            label="Upload Only Changed JSON",
+            description="Do you want to skip the upload to the JSON dataset, if the JSON "
+            "did not change since the last upload? The hash of the last upload is recorded "
+            "in the result cache directory, which needs to be set for this option.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="incremental",
+            label="Incremental Conversion",
+            description=f"In case of source mode '{SOURCE.file}', do you want to convert "
+            "only the top-level keys or items of the YAML document, which changed since "
+            "the last run? The JSON of unchanged keys or items is taken from the result "
+            "cache directory, which needs to be set for this option. In target mode "
+            f"'{TARGET.entities}', only entities of new or changed keys or items are "
+            "provided. Documents which can not be split (e.g. because of aliases between "
+            "top-level keys) are converted completely.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="streamed_upload",
+            label="Streamed Upload",
+            description=f"In case of target mode '{TARGET.json_dataset}', do you want to "
+            "upload the JSON while it is converted? The upload starts with the first "
+            "converted chunk, and the JSON is not buffered. The result cache is not used.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="compact_json",
+            label="Compact JSON",
+            description="Do you want to write JSON without spaces after commas and colons? "
+            "This results in smaller JSON datasets and entities.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="json_serializer",
+            label="JSON Serializer",
+            description="Which JSON serializer do you want to use? "
+            "The faster orjson serializer (if installed) only writes compact JSON, in which "
+            "non-ASCII characters are not escaped and NaN and Infinity are written as null.",
+            param_type=ChoiceParameterType(SERIALIZER.options),
+            advanced=True,
+            default_value=SERIALIZER.auto,
+        ),
+        PluginParameter(
+            name="projection",
+            label="Projection",
+            description="Which parts of the YAML documents do you want to convert? Enter "
+            "dotted paths (comma separated or one per line), e.g. 'spec.template' or "
+            "\"$.paths['/users']\". Use '*' for any key or item and numbers for sequence "
+            "items. Keys are matched as they are written to JSON, e.g. 'true' for the YAML "
+            "1.1 key 'on'. Other parts are skipped while parsing, the selected parts keep "
+            "their position in the document. Leave empty to convert complete documents.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="expansion_node_limit",
+            label="Expanded Node Limit",
+            description="How many nodes can the YAML documents of a conversion have, after "
+            "all aliases are expanded? Conversions of larger documents are aborted, before "
+            "the JSON is written. Use 0 for no limit.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="expansion_size_limit",
+            label="Expanded Size Limit (MiB)",
+            description="How large can the JSON of a conversion get, after all aliases are "
+            "expanded? In document parse mode, the size is estimated before the JSON is "
+            "written. Use 0 for no limit.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="nesting_depth_limit",
+            label="Nesting Depth Limit",
+            description="How deep can the YAML documents be nested? Use 0 for no limit.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="parse_time_limit",
+            label="Parse Time Limit (s)",
+            description="How many seconds can the conversion of the YAML documents (of a "
+            "single input value in batch mode) take? The time is checked whenever the parser "
+            "reads the next chunk of the input and between parsing steps, so a conversion can "
+            "take a bit longer. Use 0 for no limit.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="alias_references",
+            label="Aliases as References",
+            description="Do you want to write aliased collections only once? Each repetition "
+            'is written as JSON reference (e.g. {"$ref": "#/defaults"}) to the first '
+            "occurrence, instead of a copy. This also allows recursive aliases.",
+            advanced=True,
+        ),
+        PluginParameter(
+            name="trace_memory",
+            label="Measure Peak Memory",
+            description="Do you want to measure the peak memory of each execution phase? "
+            "Time and bytes of each phase are always reported. Tracing the memory "
+            "allocations slows down the execution.",
+            advanced=True,
+        ),
     ],
 )
 class ParseYaml(WorkflowPlugin):
@@ -157,11 +489,44 @@ class ParseYaml(WorkflowPlugin):
     target_dataset: str
     input_schema_type: str
     input_schema_path: str
+    yaml_loader: str
+    parse_mode: str
+    multi_document: bool
+    output_format: str
+    typed_entities: bool
+    batch_entities: bool
+    parse_workers: int
+    parse_chunk_size: int
+    spill_threshold: int
+    mmap_threshold: int
+    scratch_dir: str
+    cache_dir: str
+    cache_size: int
+    upload_changed_only: bool
+    incremental: bool
+    streamed_upload: bool
+    compact_json: bool
+    json_serializer: str
+    projection: str
+    expansion_node_limit: int
+    expansion_size_limit: int
+    nesting_depth_limit: int
+    parse_time_limit: int
+    alias_references: bool
+    trace_memory: bool
+    serializer: JsonSerializer
+    expansion: ExpansionPolicy
+    projector: Projection | None
+    changed_json: str | None
+    sections_record: tuple[str, str] | None
 
     inputs: Sequence[Entities]
     execution_context: ExecutionContext
     project: str
-    temp_dir: str
+    scratch: ScratchArea
+    summary: list[tuple[str, str]]
+    metrics: ExecutionMetrics
+    report: ExecutionReport
 
     def __init__(  # noqa: PLR0913
         self,
@@ -169,22 +534,82 @@ class ParseYaml(WorkflowPlugin):
         target_mode: str = TARGET.entities,
         source_code: YamlCode = DEFAULT_YAML,
         source_file: str = "",
+        source_pattern: str = "",
+        files_output: str = FILES_OUTPUT.array,
+        download_workers: int = 4,
+        download_chunk_size: int = 1024,
+        prefetch_input: bool = False,
         target_dataset: str = "",
         input_schema_type: str = "urn:x-eccenca:yaml-document",
         input_schema_path: str = "text",
+        yaml_loader: str = LOADER.auto,
+        parse_mode: str = PARSE_MODE.document,
+        multi_document: bool = False,
+        output_format: str = OUTPUT_FORMAT.json,
+        typed_entities: bool = False,
+        batch_entities: bool = False,
+        parse_workers: int = 0,
+        parse_chunk_size: int = 16,
+        spill_threshold: int = 16,
+        mmap_threshold: int = MMAP_THRESHOLD // 1024 // 1024,
+        scratch_dir: str = "",
+        cache_dir: str = "",
+        cache_size: int = 256,
+        upload_changed_only: bool = False,
+        incremental: bool = False,
+        streamed_upload: bool = False,
+        compact_json: bool = False,
+        json_serializer: str = SERIALIZER.auto,
+        projection: str = "",
+        expansion_node_limit: int = 0,
+        expansion_size_limit: int = 0,
+        nesting_depth_limit: int = 0,
+        parse_time_limit: int = 0,
+        alias_references: bool = False,
+        trace_memory: bool = False,
     ) -> None:
         # pylint: disable=too-many-arguments
         self.source_mode = source_mode
         self.target_mode = target_mode
         self.source_code = str(source_code)
         self.source_file = source_file
+        self.source_pattern = source_pattern
+        self.files_output = files_output
+        self.download_workers = download_workers
+        self.download_chunk_size = download_chunk_size
+        self.prefetch_input = prefetch_input
         self.target_dataset = target_dataset
         self.input_schema_path = input_schema_path
         self.input_schema_type = input_schema_type
+        self.yaml_loader = yaml_loader
+        self.parse_mode = parse_mode
+        self.multi_document = multi_document
+        self.output_format = output_format
+        self.typed_entities = typed_entities
+        self.batch_entities = batch_entities
+        self.parse_workers = parse_workers
+        self.parse_chunk_size = parse_chunk_size
+        self.spill_threshold = spill_threshold
+        self.mmap_threshold = mmap_threshold
+        self.scratch_dir = scratch_dir
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.upload_changed_only = upload_changed_only
+        self.incremental = incremental
+        self.streamed_upload = streamed_upload
+        self.compact_json = compact_json
+        self.json_serializer = json_serializer
+        self.projection = projection
+        self.expansion_node_limit = expansion_node_limit
+        self.expansion_size_limit = expansion_size_limit
+        self.nesting_depth_limit = nesting_depth_limit
+        self.parse_time_limit = parse_time_limit
+        self.alias_references = alias_references
+        self.trace_memory = trace_memory
         self._validate_config()
         self._set_ports()
 
-    def _raise_error(self, message: str) -> None:
+    def _raise_error(self, message: str) -> NoReturn:
         """Send a report and raise an error"""
         if hasattr(self, "execution_context"):
             self.execution_context.report.update(
@@ -197,7 +622,7 @@ class ParseYaml(WorkflowPlugin):
     def _set_ports(self) -> None:
         """Define input/output ports based on the configuration"""
         match self.source_mode:
-            case SOURCE.file:
+            case SOURCE.file | SOURCE.files:
                 # no input port
                 self.input_ports = FixedNumberOfInputs([])
             case SOURCE.code:
@@ -239,25 +664,160 @@ class ParseYaml(WorkflowPlugin):
                 f"When using the source mode '{SOURCE.code}', "
                 "you need to enter or paste YAML Source Code in the code field."
             )
-        if self.source_mode == SOURCE.file:
-            if self.source_file == "":
-                self._raise_error(
-                    f"When using the source mode '{SOURCE.file}', you need to select a YAML file."
-                )
-            if hasattr(self, "execution_context") and not resource_exist(
-                self.project, self.source_file
-            ):
-                self._raise_error(f"The file '{self.source_file}' does not exist in the project.")
+        if self.source_mode == SOURCE.file and self.source_file == "":
+            self._raise_error(
+                f"When using the source mode '{SOURCE.file}', you need to select a YAML file."
+            )
         if self.target_mode == TARGET.json_dataset and self.target_dataset == "":
             self._raise_error(
                 f"When using the target mode '{TARGET.json_dataset}', "
                 "you need to select a JSON dataset."
             )
+        self._validate_advanced_options()
+        self._validate_files_options()
+
+    def _validate_files_options(self) -> None:
+        """Raise value errors on bad options for multiple files"""
+        if self.source_mode == SOURCE.files and not self.source_pattern.strip():
+            self._raise_error(
+                f"When using the source mode '{SOURCE.files}', you need to enter a file pattern."
+            )
+        if self.files_output not in FILES_OUTPUT.options:
+            self._raise_error(f"Unknown output of multiple files: {self.files_output}")
+        if self.download_workers < 1:
+            self._raise_error("The number of download workers needs to be at least 1.")
+        if self.download_chunk_size < 1:
+            self._raise_error("The download chunk size needs to be at least 1 KiB.")
+        if self.prefetch_input and self.cache_dir:
+            self._raise_error("Prefetching the input file can not be combined with a result cache.")
+        if self._is_files_object() and self._output_format() == OUTPUT_FORMAT.jsonl:
+            self._raise_error("A JSON object of multiple files can not be written as JSON Lines.")
+
+    def _validate_advanced_options(self) -> None:
+        """Raise value errors on bad advanced options"""
+        try:
+            resolve_loader(self.yaml_loader)
+        except ValueError as error:
+            self._raise_error(str(error))
+        if self.parse_mode not in PARSE_MODE.options:
+            self._raise_error(f"Unknown parse mode: {self.parse_mode}")
+        if self.output_format not in OUTPUT_FORMAT.options:
+            self._raise_error(f"Unknown output format: {self.output_format}")
+        if self.parse_workers < 0:
+            self._raise_error("The number of parse workers can not be negative.")
+        if self.parse_chunk_size < 1:
+            self._raise_error("The parse chunk size needs to be at least 1.")
+        if min(self.spill_threshold, self.mmap_threshold) < 0:
+            self._raise_error(
+                "The in-memory buffer and memory-mapped input sizes can not be negative."
+            )
+        try:
+            resolve_serializer(self.json_serializer, compact=self.compact_json)
+        except ValueError as error:
+            self._raise_error(str(error))
+        try:
+            Projection(self.projection)
+        except ValueError as error:
+            self._raise_error(str(error))
+        limits = (
+            self.expansion_node_limit,
+            self.expansion_size_limit,
+            self.nesting_depth_limit,
+            self.parse_time_limit,
+        )
+        if min(limits) < 0:
+            self._raise_error("Expansion, depth and time limits can not be negative.")
+        self._validate_output_options()
+
+    def _validate_output_options(self) -> None:
+        """Raise value errors on bad result cache and upload options"""
+        if self.cache_size < 0:
+            self._raise_error("The result cache size can not be negative.")
+        if self.upload_changed_only and not self.cache_dir:
+            self._raise_error(
+                "When uploading only changed JSON, you need to set a result cache directory."
+            )
+        if self.upload_changed_only and self.streamed_upload:
+            self._raise_error("A streamed upload can not be restricted to changed JSON.")
+        if self.incremental:
+            self._validate_incremental_options()
+
+    def _validate_incremental_options(self) -> None:
+        """Raise value errors on options which do not work with an incremental conversion"""
+        if self.source_mode != SOURCE.file:
+            self._raise_error(
+                f"Incremental conversion is only available in source mode '{SOURCE.file}'."
+            )
+        if not self.cache_dir:
+            self._raise_error(
+                "For an incremental conversion, you need to set a result cache directory."
+            )
+        if (
+            self.multi_document
+            or self.streamed_upload
+            or self.projection.strip()
+            or self._output_format() == OUTPUT_FORMAT.jsonl
+        ):
+            self._raise_error(
+                "Incremental conversion can not be combined with multiple documents, "
+                "streamed uploads, a projection or JSON Lines."
+            )
 
     def _get_input_file(self, writer: BinaryIO) -> None:
-        """Get input YAML file from project file."""
-        with get_resource_response(self.project, self.source_file) as response:
-            writer.writelines(response.iter_content(chunk_size=8192))
+        """Get input YAML file from project file.
+
+        With a result cache, the file is only downloaded if its metadata changed.
+        """
+        if not self.cache_dir:
+            self._download_file(writer)
+            return
+        try:
+            metadata = get_resource_metadata(self.project, self.source_file)
+        except OSError as error:  # HTTP errors of requests are OSErrors
+            self._raise_missing_file(error)
+        name = f"{self.project}/{self.source_file}"
+        version = [metadata.get("modified"), metadata.get("size")]
+        cache = self._cache()
+        cached = cache.get_source(name, version) if any(version) else None
+        self.summary.append(("Source cache", "hit" if cached else "miss"))
+        if cached:
+            with Path.open(cached, "rb") as reader:
+                shutil.copyfileobj(reader, writer)
+            return
+        self._download_file(writer)
+        if any(version):
+            writer.seek(0)
+            cache.put_source(name, version, writer)
+
+    def _download_file(self, writer: BinaryIO) -> None:
+        """Download the project file"""
+        writer.writelines(self._download_chunks())
+
+    def _download_chunks(self) -> Iterator[bytes]:
+        """Lazily download the chunks of the project file"""
+        try:
+            with get_resource_response(self.project, self.source_file) as response:
+                yield from response.iter_content(chunk_size=self.download_chunk_size * 1024)
+        except OSError as error:  # HTTP errors of requests are OSErrors
+            self._raise_missing_file(error)
+
+    def _prefetch_input_file(self) -> BinaryIO:
+        """Download the project file in a background thread, while it is read"""
+
+        def chunks() -> Iterator[bytes]:
+            for chunk in self.metrics.timed(PHASE.input, self._download_chunks()):
+                self.metrics.count(PHASE.input, bytes_out=len(chunk))
+                self.metrics.count(PHASE.parse, bytes_in=len(chunk))
+                yield chunk
+
+        return prefetch(chunks, max_chunks=PREFETCH_CHUNKS)
+
+    def _raise_missing_file(self, error: OSError) -> NoReturn:
+        """Raise a value error, if the project file does not exist (or re-raise)"""
+        response = getattr(error, "response", None)
+        if response is not None and response.status_code == HTTPStatus.NOT_FOUND:
+            self._raise_error(f"The file '{self.source_file}' does not exist in the project.")
+        raise error
 
     def _get_input_code(self, writer: BinaryIO) -> None:
         """Get input YAML file from direct YAML code"""
@@ -286,63 +846,275 @@ class ParseYaml(WorkflowPlugin):
             ) from error
         writer.write(first_value.encode("utf-8"))
 
-    def _get_input(self) -> Path:
-        """Depending on configuration, gets the YAML from different sources."""
-        file_yaml = Path(f"{self.temp_dir}/source.yaml")
+    def _get_input_entity_documents(self, loader: str) -> Iterator[tuple[str, str]]:
+        """Lazily get JSON documents from all values of all entities of the first input"""
+        try:
+            first_input: Entities = self.inputs[0]
+        except IndexError as error:
+            raise ValueError("Input port not connected.") from error
+        keys: deque[tuple[str, bool]] = deque()
+
+        def values() -> Iterator[str]:
+            """Provide all values and remember the entity URIs"""
+            for entity in first_input.entities:
+                entity_values = [value for path_values in entity.values for value in path_values]
+                numbered = len(entity_values) > 1 or self.multi_document
+                for value in entity_values:
+                    keys.append((entity.uri, numbered))
+                    size = len(value.encode("utf-8"))
+                    self.metrics.count(PHASE.input, bytes_out=size)
+                    self.metrics.count(PHASE.parse, bytes_in=size)
+                    yield value
+
+        entity_uri = None
+        document_count = 0
+        for documents in convert_texts(
+            self.metrics.timed(PHASE.input, values()),
+            loader=loader,
+            parse_mode=self.parse_mode,
+            multi_document=self.multi_document,
+            workers=self.parse_workers,
+            chunk_size=self.parse_chunk_size,
+            serializer=self.serializer,
+            expansion=self.expansion,
+            projection=self.projector,
+        ):
+            uri, numbered = keys.popleft()
+            if uri != entity_uri:
+                entity_uri = uri
+                document_count = 0
+            for document in documents:
+                document_count += 1
+                yield (f"{uri}-{document_count}" if numbered else uri), document
+        if entity_uri is None:
+            raise ValueError(
+                "No entity available on input port. "
+                "Maybe you can re-configure the Input Schema Type / Class in Advanced Options?"
+            )
+
+    def _get_input_files(self) -> Iterator[tuple[str, str]]:
+        """Lazily download the project files, which match the source pattern"""
+        names = match_resources(self.project, self.source_pattern.strip())
+        if not names:
+            self._raise_error(f"No project file matches the pattern '{self.source_pattern}'.")
+        self.summary.append(("Source files", str(len(names))))
+        downloader = ResourceDownloader(
+            self.project,
+            workers=self.download_workers,
+            chunk_size=self.download_chunk_size * 1024,
+        )
+        with downloader:
+            for name, content in downloader.download_all(names):
+                self.metrics.count(PHASE.input, bytes_out=len(content))
+                self.metrics.count(PHASE.parse, bytes_in=len(content))
+                yield name, content.decode("utf-8")
+
+    def _get_input_file_documents(self, loader: str) -> Iterator[tuple[str, list[str]]]:
+        """Lazily get the JSON documents of each project file matching the source pattern
+
+        Files are downloaded concurrently, while earlier files are converted.
+        """
+        names: deque[str] = deque()
+
+        def texts() -> Iterator[str]:
+            """Provide the texts of the files and remember their names"""
+            for name, text in self._get_input_files():
+                names.append(name)
+                yield text
+
+        converted = self._convert_texts(
+            self.metrics.timed(PHASE.input, texts()), loader, multi_document=self.multi_document
+        )
+        for documents in converted:
+            yield names.popleft(), documents
+
+    def _get_input_documents(self, loader: str) -> Iterator[tuple[str, str]]:
+        """Lazily get JSON documents (with URIs) from the configured source"""
+        if self._is_batch():
+            yield from self._get_input_entity_documents(loader)
+            return
+        if self.source_mode == SOURCE.files:
+            for name, file_documents in self._get_input_file_documents(loader):
+                uri = f"urn:x-json:file:{quote(name)}"
+                for count, document in enumerate(file_documents, start=1):
+                    yield (f"{uri}-{count}" if self.multi_document else uri), document
+            return
+        with self._get_input() as yaml_reader:
+            if self.multi_document:
+                documents = self._convert_documents(yaml_reader, loader)
+            else:
+                documents = self._convert_records(yaml_reader, loader)
+            for count, document in enumerate(documents, start=1):
+                yield f"urn:x-json:source-{count}", document
+
+    def _get_input_buffer(self) -> ScratchFile:
+        """Depending on configuration, gets the YAML from different sources.
+
+        The YAML is buffered in memory and only written to a temporary file, if it is
+        larger than the configured buffer size.
+        """
         try:
             # Select a _get_input_* function based on source_mode
             get_input = getattr(self, f"_get_input_{self.source_mode}")
         except AttributeError as error:
             raise ValueError(f"Source mode not implemented yet: '{self.source_mode}'") from error
-        with Path.open(file_yaml, "wb") as writer:
-            get_input(writer)
-        return file_yaml
+        buffer = self._buffer(mode="w+b")
+        with self.metrics.phase(PHASE.input) as metrics:
+            get_input(buffer)
+            metrics.bytes_out += buffer.tell()
+        self.metrics.count(PHASE.parse, bytes_in=buffer.tell())
+        buffer.seek(0)
+        return buffer
+
+    def _get_input(self) -> YamlInput:
+        """Depending on configuration, gets the YAML from different sources as text.
+
+        Large input in a temporary file is memory-mapped instead.
+        """
+        if self._is_prefetch():
+            return io.TextIOWrapper(self._prefetch_input_file(), encoding="utf-8")
+        return self._yaml_reader(self._get_input_buffer())
 
-    def _provide_output_json_entities(self, file_json: Path) -> Entities:
+    def _buffer(self, mode: str = "w+") -> ScratchFile:
+        """Create a buffer, which is written to the scratch area if it gets too large"""
+        return self.scratch.file(max_size=self.spill_threshold * 1024 * 1024, mode=mode)
+
+    def _update_report(
+        self, entity_count: int = 0, operation_desc: str = "YAML document parsed"
+    ) -> None:
+        """Send an execution report with the current summary"""
+        self.report = ExecutionReport(
+            entity_count=entity_count,
+            operation_desc=operation_desc,
+            summary=list(self.summary),
+        )
+        self.execution_context.report.update(self.report)
+
+    def _finish_report(self) -> None:
+        """Send the last execution report again, with scratch area and phase statistics"""
+        self.summary.append(("Scratch bytes written", str(self.scratch.bytes_written)))
+        self.summary.extend(self.metrics.summary())
+        self._update_report(self.report.entity_count, self.report.operation_desc)
+        export_metrics(self.metrics.records(), logger=self.log)
+
+    def _provide_output_json_entities(self, json_reader: IO[str]) -> Entities:
         """Output as a single JSON entity"""
-        with Path.open(file_json, encoding="utf-8") as reader:
-            json_code = reader.read()
         schema = EntitySchema(type_uri="urn:x-json:document", paths=[EntityPath(path="json-src")])
+        with self.metrics.phase(PHASE.output) as metrics, json_reader as reader:
+            json_code = reader.read()
+            metrics.bytes_in += len(json_code)
         entities = iter([Entity(uri="urn:x-json:source", values=[[json_code]])])
         self.log.info("JSON provided as single output entity.")
-        self.execution_context.report.update(
-            ExecutionReport(
-                entity_count=1,
-                operation_desc="JSON entity generated",
-            )
-        )
+        self._update_report(entity_count=1, operation_desc="JSON entity generated")
         return Entities(entities=entities, schema=schema)
 
-    def _provide_output_json_dataset(self, file_json: Path) -> None:
+    def _provide_json_document_entities(self, documents: Iterator[tuple[str, str]]) -> Entities:
+        """Output as one JSON entity per document"""
+        schema = EntitySchema(type_uri="urn:x-json:document", paths=[EntityPath(path="json-src")])
+        return Entities(entities=self._json_document_entities(documents), schema=schema)
+
+    def _json_document_entities(self, documents: Iterator[tuple[str, str]]) -> Iterator[Entity]:
+        """Lazily provide one JSON entity per document"""
+        count = 0
+        with self.scratch, self.metrics:
+            documents = self.metrics.timed(PHASE.parse, documents)
+            for count, (uri, document) in enumerate(documents, start=1):
+                yield Entity(uri=uri, values=[[document]])
+                self._update_report(entity_count=count, operation_desc="JSON entities generated")
+        self.log.info(f"JSON provided as {count} output entities.")
+        self._finish_report()
+
+    def _provide_output_json_dataset(self, json_reader: IO[str]) -> None:
         """Output as JSON to a dataset resource file"""
-        with Path.open(file_json, encoding="utf-8") as reader:
+        with self.metrics.phase(PHASE.upload) as metrics, json_reader as reader:
+            size = reader.seek(0, io.SEEK_END)
+            reader.seek(0)
+            # requests asks for a file descriptor, which would spill a buffer to disk
+            if size <= self.spill_threshold * 1024 * 1024:
+                json_bytes = reader.read().encode("utf-8")
+                json_file: IO = io.BytesIO(json_bytes)
+                size = len(json_bytes)
+            else:
+                json_file, size = reader, os.fstat(reader.fileno()).st_size
+            metrics.bytes_in += size
+            record = f"{self.project}/{self.target_dataset}"
+            digest = content_hash(json_file) if self.upload_changed_only else None
+            if digest is not None and self._cache().get_record(record) == digest:
+                json_file.close()
+                self.summary.append(("Bytes not sent", str(size)))
+                self._report_upload(bytes_sent=0, seconds=0)
+                self.log.info(f"JSON of dataset '{self.target_dataset}' is unchanged.")
+                self._update_report(entity_count=0, operation_desc="JSON dataset unchanged")
+                return
+            start = perf_counter()
             post_resource(
                 project_id=self.project,
                 dataset_id=self.target_dataset,
-                file_resource=reader,
+                file_resource=json_file,
             )
+            self._report_upload(bytes_sent=size, seconds=perf_counter() - start)
+            metrics.bytes_out += size
+            if digest is not None:
+                self._cache().put_record(record, digest)
         self.log.info(f"JSON uploaded to dataset '{self.target_dataset}'.")
-        self.execution_context.report.update(
-            ExecutionReport(
-                entity_count=1,
-                operation_desc="JSON dataset replaced",
+        self._update_report(entity_count=1, operation_desc="JSON dataset replaced")
+
+    def _stream_output_json_dataset(self, loader: str) -> None:
+        """Output as JSON to a dataset resource file, while it is converted"""
+        start = perf_counter()
+        with self.metrics.phase(PHASE.upload) as metrics:
+            stream = upload_json(
+                project_id=self.project,
+                dataset_id=self.target_dataset,
+                write_json=partial(self._write_json, loader=loader),
             )
-        )
+            metrics.bytes_in += stream.bytes_written
+            metrics.bytes_out += stream.bytes_sent
+        self.metrics.count(PHASE.serialize, bytes_out=stream.bytes_written)
+        self.summary.append(("JSON bytes", str(stream.bytes_written)))
+        self._report_upload(bytes_sent=stream.bytes_sent, seconds=perf_counter() - start)
+        self.log.info(f"JSON uploaded to dataset '{self.target_dataset}'.")
+        self._update_report(entity_count=1, operation_desc="JSON dataset replaced")
 
-    @staticmethod
-    def _provide_output_entities(file_json: Path) -> Entities | None:
+    def _report_upload(self, bytes_sent: int, seconds: float) -> None:
+        """Add the bytes sent and the throughput of an upload to the summary"""
+        self.summary.append(("Bytes sent", str(bytes_sent)))
+        if bytes_sent:
+            throughput = bytes_sent / 1024 / 1024 / seconds if seconds else 0
+            self.summary.append(("Upload throughput", f"{throughput:.1f} MiB/s"))
+
+    def _provide_output_entities(self, json_reader: IO[str]) -> Entities | None:
         """Output as entities"""
-        data = json.loads(Path.open(file_json, encoding="utf-8").read())
-        return build_entities_from_data(data=data)
+        with self.metrics.phase(PHASE.output) as metrics, json_reader as reader:
+            metrics.bytes_in += reader.seek(0, io.SEEK_END)
+            reader.seek(0)
+            if self.changed_json is not None:
+                return self._provide_data_entities(json.loads(self.changed_json))
+            return self._provide_data_entities(json.load(reader))
+
+    def _provide_data_entities(self, data: dict | list) -> Entities | None:
+        """Output parsed data as entities
+
+        Entities are built lazily, so the output phase only covers the schema inference.
+        """
+        with self.metrics.phase(PHASE.output):
+            if self._is_document_stream():
+                # each document provides its own root entities
+                data = [
+                    item
+                    for document in data
+                    for item in (document if isinstance(document, list) else [document])
+                ]
+            return build_entities(data=data, typed=self.typed_entities)
 
-    def _provide_output(self, file_json: Path) -> Entities | None:
+    def _provide_output(self, json_reader: IO[str]) -> Entities | None:
         """Depending on configuration, provides the parsed content for different outputs"""
         try:
             # Select a _provide_output_* function based on target_mode
             provide_output = getattr(self, f"_provide_output_{self.target_mode}")
         except AttributeError as error:
             raise ValueError(f"Target mode not implemented yet: '{self.target_mode}'") from error
-        return provide_output(file_json)
+        return provide_output(json_reader)
 
     def execute(self, inputs: Sequence[Entities], context: ExecutionContext) -> Entities | None:
         """Execute the workflow plugin on a given sequence of entities"""
@@ -352,21 +1124,480 @@ class ParseYaml(WorkflowPlugin):
         self.project = self.execution_context.task.project_id()
         self._validate_config()
         setup_cmempy_user_access(context.user)
-        self.temp_dir = mkdtemp()
-        file_yaml = self._get_input()
-        file_json = self.yaml2json(file_yaml, logger=self.log)
-        return self._provide_output(file_json)
+        self.scratch = ScratchArea(base_dir=self.scratch_dir)
+        self.summary = []
+        self.metrics = ExecutionMetrics(trace_memory=self.trace_memory)
+        loader = resolve_loader(self.yaml_loader)
+        self.summary.append(("YAML loader", loader))
+        self.summary.append(("Parse mode", self.parse_mode))
+        self.serializer = resolve_serializer(self.json_serializer, compact=self.compact_json)
+        self.summary.append(("JSON serializer", self.serializer.backend))
+        self.expansion = ExpansionPolicy(
+            nodes=self.expansion_node_limit,
+            size=self.expansion_size_limit * 1024 * 1024,
+            depth=self.nesting_depth_limit,
+            seconds=self.parse_time_limit,
+            references=self.alias_references,
+        )
+        self.projector = Projection(self.projection) if self.projection.strip() else None
+        self.changed_json = None
+        self.sections_record = None
+        if self.projector is not None:
+            self.summary.append(("Projection", self.projection.strip()))
+        self._update_report()
+        if self.target_mode == TARGET.json_entities and (
+            self._is_document_stream() or self._is_record_stream()
+        ):
+            # documents (or records) are parsed lazily, while the output entities are consumed,
+            # so the scratch area is removed after the last entity
+            return self._provide_json_document_entities(self._get_input_documents(loader))
+        with self.scratch, self.metrics:
+            output = self._provide(loader)
+        self._put_sections_record()
+        self._finish_report()
+        return output
+
+    def _provide(self, loader: str) -> Entities | None:
+        """Convert the configured source and provide the output"""
+        if self.streamed_upload and self.target_mode == TARGET.json_dataset:
+            self._stream_output_json_dataset(loader)
+            return None
+        if self.target_mode == TARGET.entities and self._is_direct_load():
+            return self._provide_data_entities(self._load(loader))
+        return self._provide_output(self._convert(loader))
+
+    def _load(self, loader: str) -> dict | list:
+        """Load the configured source to the same objects as parsed from converted JSON"""
+        with self._get_input() as yaml_reader, self.metrics.phase(PHASE.parse):
+            if self.multi_document:
+                data: dict | list = [
+                    normalize(_, timestamps=self.typed_entities)
+                    for _ in load_documents(
+                        yaml_reader, loader, expansion=self.expansion, projection=self.projector
+                    )
+                ]
+            else:
+                data = normalize(
+                    load_document(
+                        yaml_reader,
+                        loader=loader,
+                        expansion=self.expansion,
+                        projection=self.projector,
+                    ),
+                    timestamps=self.typed_entities,
+                )
+        self._update_report()
+        return data
+
+    def _is_direct_load(self) -> bool:
+        """Check if the YAML can be loaded without converting it to JSON
+
+        Streaming, batch mode, multiple files, parallel parsing and the result cache work
+        on JSON.
+        """
+        return (
+            self.parse_mode == PARSE_MODE.document
+            and not self._is_batch()
+            and self.source_mode != SOURCE.files
+            and self.parse_workers < 2  # noqa: PLR2004
+            and not self.cache_dir
+        )
+
+    def _convert(self, loader: str) -> IO[str]:
+        """Convert the configured source to a JSON buffer"""
+        if self._is_batch() or self.source_mode == SOURCE.files:
+            json_buffer: IO[str] = self._buffer()
+            self._write_json(json_buffer, loader)
+        else:
+            json_buffer = self._convert_input(loader)
+        json_buffer.seek(0)
+        self._update_report()
+        return json_buffer
+
+    def _convert_input(self, loader: str) -> IO[str]:
+        """Convert the YAML input to a JSON buffer (or get it from the result cache)"""
+        if self._is_prefetch():
+            return self._write_json_buffer(self._get_input(), loader)
+        yaml_buffer = self._get_input_buffer()
+        if self.incremental:
+            sections_buffer = self._convert_sections(yaml_buffer, loader)
+            if sections_buffer is not None:
+                yaml_buffer.close()
+                return sections_buffer
+        key = None
+        if self.cache_dir:
+            cache = self._cache()
+            key = cache_key(yaml_buffer, options=self._cache_options())
+            cached = cache.get(key)
+            self.summary.append(("Result cache", "hit" if cached else "miss"))
+            if cached:
+                yaml_buffer.close()
+                return Path.open(cached, encoding="utf-8")
+        return self._write_json_buffer(self._yaml_reader(yaml_buffer), loader, key)
+
+    def _yaml_reader(self, yaml_buffer: ScratchFile) -> YamlInput:
+        """Get a reader of the YAML input, which is memory-mapped if it is large enough"""
+        size = yaml_buffer.seek(0, io.SEEK_END)
+        yaml_buffer.seek(0)
+        if yaml_buffer.on_disk and is_mapped(size, self.mmap_threshold * 1024 * 1024):
+            yaml_buffer.flush()
+            self.summary.append(("Memory-mapped input", "yes"))
+            return MappedFile(yaml_buffer)
+        return io.TextIOWrapper(yaml_buffer, encoding="utf-8")
+
+    def _write_json_buffer(
+        self, yaml_reader: YamlInput, loader: str, key: str | None = None
+    ) -> IO[str]:
+        """Convert the YAML input to a JSON buffer (and put it into the result cache)"""
+        json_buffer = self._buffer()
+        with yaml_reader:
+            self._write_input_json(yaml_reader, json_buffer, loader)
+        self.metrics.count(PHASE.serialize, bytes_out=json_buffer.tell())
+        if key:
+            json_buffer.seek(0)
+            self._cache().put(key, json_buffer)
+        return json_buffer
+
+    def _convert_sections(self, yaml_buffer: ScratchFile, loader: str) -> IO[str] | None:
+        """Convert the changed top-level sections of the YAML input to a JSON buffer
+
+        Returns None, if the YAML can not be converted by sections.
+        """
+        sections = split_sections(yaml_buffer.read().decode("utf-8"))
+        yaml_buffer.seek(0)
+        if sections is None:
+            self._skip_sections("no top-level block mapping or sequence")
+            return None
+        kind, texts = sections
+        try:
+            fragments = self._section_fragments(kind, texts, loader)
+        except (yaml.YAMLError, TypeError, ValueError) as error:
+            self._skip_sections(str(error))
+            return None
+        cache = self._cache()
+        # each task (and target mode) has its own last run
+        task_id = self.execution_context.task.task_id()
+        record = f"sections/{self.project}/{task_id}/{self.target_mode}/{self.source_file}"
+        # keys are content hashes, so repeated sections are counted
+        previous = Counter(json.loads(cache.get_record(record) or "[]"))
+        # the record is only put after the output was provided
+        self.sections_record = (record, json.dumps([key for key, _ in fragments]))
+        changed = []
+        for key, fragment in fragments:
+            if previous[key]:
+                previous[key] -= 1
+            else:
+                changed.append(fragment)
+        self.changed_json = splice(kind, changed, self.serializer.item_separator)
+        self.summary.append(("Sections changed", f"{len(changed)} of {len(fragments)}"))
+        json_buffer = self._buffer()
+        with self.metrics.phase(PHASE.serialize) as metrics:
+            json_text = splice(kind, [_ for _, _ in fragments], self.serializer.item_separator)
+            json_buffer.write(json_text)
+            metrics.bytes_out += json_buffer.tell()
+        return json_buffer
+
+    def _put_sections_record(self) -> None:
+        """Record the sections of a provided output, so the next run only provides changes"""
+        if self.sections_record is not None:
+            self._cache().put_record(*self.sections_record)
+            self.sections_record = None
+
+    def _skip_sections(self, reason: str) -> None:
+        """Report that the YAML input can not be converted by sections"""
+        self.log.info(f"YAML can not be converted by sections: {reason}")
+        self.summary.append(("Incremental conversion", "not possible for this document"))
+
+    def _section_fragments(self, kind: str, texts: list[str], loader: str) -> list[tuple[str, str]]:
+        """Get the cache keys and JSON fragments of sections
+
+        Only sections which are not in the result cache are converted.
+        """
+        cache = self._cache()
+        options = {**self._cache_options(), "section": kind}
+        keys = [cache_key(io.BytesIO(_.encode("utf-8")), options=options) for _ in texts]
+        fragments: dict[str, str] = {}
+        for key in keys:
+            cached = cache.get(key)
+            if cached is not None:
+                fragments[key] = cached.read_text(encoding="utf-8")
+        missing = {key: text for key, text in zip(keys, texts, strict=True) if key not in fragments}
+        with self.metrics.phase(PHASE.parse):
+            converted = self._convert_texts(missing.values(), loader)
+            for key, documents in zip(missing, converted, strict=True):
+                fragments[key] = section_fragment(kind, documents[0])
+                cache.put(key, io.StringIO(fragments[key]))
+        self.summary.append(("Sections converted", f"{len(missing)} of {len(keys)}"))
+        if kind == SECTION_KIND.mapping:
+            check_keys(fragments[_] for _ in keys)
+        return [(key, fragments[key]) for key in keys]
+
+    def _convert_texts(
+        self, texts: Iterable[str], loader: str, multi_document: bool = False
+    ) -> Iterator[list[str]]:
+        """Lazily convert YAML texts to lists of JSON documents"""
+        return convert_texts(
+            texts,
+            loader=loader,
+            parse_mode=self.parse_mode,
+            multi_document=multi_document,
+            workers=self.parse_workers,
+            chunk_size=self.parse_chunk_size,
+            serializer=self.serializer,
+            expansion=self.expansion,
+            projection=self.projector,
+        )
+
+    def _write_json(self, json_writer: IO[str], loader: str) -> None:
+        """Convert the configured source to JSON (without result cache)"""
+        if self._is_files_object():
+            files = self._get_input_file_documents(loader)
+            with self.metrics.phase(PHASE.serialize):
+                write_keyed_documents(
+                    (
+                        (name, self._merge_documents(documents))
+                        for name, documents in self.metrics.timed(PHASE.parse, files)
+                    ),
+                    json_writer,
+                    serializer=self.serializer,
+                )
+            return
+        if self._is_batch() or self.source_mode == SOURCE.files:
+            documents = self._get_input_documents(loader)
+            with self.metrics.phase(PHASE.serialize):
+                write_documents(
+                    (document for _, document in self.metrics.timed(PHASE.parse, documents)),
+                    json_writer,
+                    output_format=self._output_format(),
+                    serializer=self.serializer,
+                )
+            return
+        with self._get_input() as yaml_reader:
+            self._write_input_json(yaml_reader, json_writer, loader)
+
+    def _write_input_json(self, yaml_reader: YamlInput, json_writer: IO[str], loader: str) -> None:
+        """Convert the YAML input to JSON
+
+        Documents of a stream are serialized while they are parsed, so parsing includes
+        the serialization in the stream mode and for multiple documents or records.
+        """
+        if self.multi_document:
+            documents = self._convert_documents(yaml_reader, loader)
+            with self.metrics.phase(PHASE.serialize):
+                write_documents(
+                    self.metrics.timed(PHASE.parse, documents),
+                    json_writer,
+                    output_format=self._output_format(),
+                    serializer=self.serializer,
+                )
+        elif self._is_record_stream():
+            records = self._convert_records(yaml_reader, loader)
+            with self.metrics.phase(PHASE.serialize):
+                write_documents(
+                    self.metrics.timed(PHASE.parse, records),
+                    json_writer,
+                    output_format=OUTPUT_FORMAT.jsonl,
+                )
+        elif self.parse_mode == PARSE_MODE.stream:
+            with self.metrics.phase(PHASE.parse):
+                convert_document(
+                    yaml_reader,
+                    json_writer,
+                    loader=loader,
+                    parse_mode=self.parse_mode,
+                    serializer=self.serializer,
+                    expansion=self.expansion,
+                    projection=self.projector,
+                )
+        else:
+            with self.metrics.phase(PHASE.parse):
+                data = load_document(
+                    yaml_reader, loader=loader, expansion=self.expansion, projection=self.projector
+                )
+            with self.metrics.phase(PHASE.serialize):
+                json_writer.write(self.serializer.dumps(data))
+
+    def _convert_documents(self, yaml_reader: YamlInput, loader: str) -> Iterator[str]:
+        """Lazily convert the documents of a YAML stream"""
+        return convert_documents(
+            yaml_reader,
+            loader=loader,
+            parse_mode=self.parse_mode,
+            workers=self.parse_workers,
+            chunk_size=self.parse_chunk_size,
+            serializer=self.serializer,
+            expansion=self.expansion,
+            projection=self.projector,
+        )
+
+    def _convert_records(self, yaml_reader: YamlInput, loader: str) -> Iterator[str]:
+        """Lazily convert a YAML document to JSON Lines records"""
+        return convert_records(
+            yaml_reader,
+            loader=loader,
+            parse_mode=self.parse_mode,
+            serializer=self.serializer,
+            expansion=self.expansion,
+            projection=self.projector,
+        )
+
+    def _cache(self) -> ResultCache:
+        """Get the configured result cache"""
+        return ResultCache(self.cache_dir, max_size=self.cache_size * 1024 * 1024)
+
+    def _cache_options(self) -> dict:
+        """Get the options which change the conversion result"""
+        return {
+            "parse_mode": self.parse_mode,
+            "multi_document": self.multi_document,
+            "output_format": self._output_format(),
+            "serializer": self.serializer.backend,
+            "compact": self.serializer.compact,
+            "alias_references": self.alias_references,
+            "projection": self.projection.strip(),
+            # a result within loose limits is not a result within tighter limits
+            "yaml_loader": resolve_loader(self.yaml_loader),
+            "expansion_node_limit": self.expansion_node_limit,
+            "expansion_size_limit": self.expansion_size_limit,
+            "nesting_depth_limit": self.nesting_depth_limit,
+            "parse_time_limit": self.parse_time_limit,
+        }
+
+    def _is_batch(self) -> bool:
+        """Check if all input entities are parsed"""
+        return self.batch_entities and self.source_mode == SOURCE.entities
+
+    def _is_prefetch(self) -> bool:
+        """Check if the input file is parsed while it is downloaded"""
+        return self.prefetch_input and self.source_mode == SOURCE.file
+
+    def _is_files_object(self) -> bool:
+        """Check if multiple files are merged to a JSON object"""
+        return bool(self.source_mode == SOURCE.files and self.files_output == FILES_OUTPUT.object)
+
+    def _is_document_stream(self) -> bool:
+        """Check if the configuration results in a stream of documents"""
+        if self._is_files_object():
+            return False
+        return self.multi_document or self._is_batch() or self.source_mode == SOURCE.files
+
+    def _merge_documents(self, documents: list[str]) -> str:
+        """Get the JSON of a file, which is an array in case of multiple documents"""
+        if not self.multi_document:
+            return documents[0]
+        return f"[{self.serializer.item_separator.join(documents)}]"
+
+    def _is_record_stream(self) -> bool:
+        """Check if a single document is written as JSON Lines records"""
+        return self._output_format() == OUTPUT_FORMAT.jsonl and not self._is_document_stream()
+
+    def _output_format(self) -> str:
+        """Get the output format of the JSON (only datasets and JSON entities have JSON Lines)"""
+        if self.target_mode in (TARGET.json_dataset, TARGET.json_entities):
+            return str(self.output_format)
+        return str(OUTPUT_FORMAT.json)
 
     @staticmethod
-    def yaml2json(yaml_file: Path, logger: PluginLogger = None) -> Path:
-        """Convert a YAML file to a JSON file."""
-        json_file = Path(f"{mkdtemp()}/{yaml_file.name}.json")
-        with Path.open(yaml_file, encoding="utf-8") as yaml_reader:
-            yaml_content = yaml.safe_load(yaml_reader)
-        if not isinstance(yaml_content, dict | list):
-            raise TypeError("YAML content could not be parsed to a dict or list.")
-        with Path.open(json_file, "w", encoding="utf-8") as json_writer:
-            json.dump(yaml_content, json_writer)
+    def yaml2json(  # noqa: PLR0913
+        yaml_file: Path,
+        logger: PluginLogger = None,
+        loader: str = LOADER.auto,
+        parse_mode: str = PARSE_MODE.document,
+        multi_document: bool = False,
+        output_format: str = OUTPUT_FORMAT.json,
+        workers: int = 0,
+        chunk_size: int = 16,
+        serializer: str = SERIALIZER.auto,
+        compact: bool = False,
+        projection: str = "",
+        mmap_threshold: int = MMAP_THRESHOLD,
+    ) -> Path:
+        """Convert a YAML file to a JSON file.
+
+        The JSON file is created in the temporary directory (and removed on errors), so
+        the caller removes it after use. Multiple documents are parsed in a process pool,
+        if more than one worker is given. With a projection, only the selected subtrees
+        are converted. JSON Lines of a single document have one line per item of a root
+        sequence. Files of at least mmap_threshold bytes are memory-mapped (0, the default,
+        disables memory-mapping).
+        """
+        json_serializer = resolve_serializer(serializer, compact=compact)
+        projector = Projection(projection) if projection.strip() else None
+        # no directory of its own, which would be left when the caller removes the file
+        json_fd, json_name = mkstemp(prefix=f"{yaml_file.name}-", suffix=".json")
+        json_file = Path(json_name)
+        try:
+            with (
+                os.fdopen(json_fd, "w", encoding="utf-8") as json_writer,
+                open_yaml_file(yaml_file, threshold=mmap_threshold) as yaml_reader,
+            ):
+                if multi_document:
+                    documents = convert_documents(
+                        yaml_reader,
+                        loader=loader,
+                        parse_mode=parse_mode,
+                        workers=workers,
+                        chunk_size=chunk_size,
+                        serializer=json_serializer,
+                        projection=projector,
+                    )
+                    write_documents(
+                        documents,
+                        json_writer,
+                        output_format=output_format,
+                        serializer=json_serializer,
+                    )
+                elif output_format == OUTPUT_FORMAT.jsonl:
+                    records = convert_records(
+                        yaml_reader,
+                        loader=loader,
+                        parse_mode=parse_mode,
+                        serializer=json_serializer,
+                        projection=projector,
+                    )
+                    write_documents(records, json_writer, output_format=output_format)
+                else:
+                    convert_document(
+                        yaml_reader,
+                        json_writer,
+                        loader=loader,
+                        parse_mode=parse_mode,
+                        serializer=json_serializer,
+                        projection=projector,
+                    )
+        except BaseException:
+            json_file.unlink(missing_ok=True)
+            raise
         if logger:
-            logger.info(f"JSON written to {json_file}")
+            logger.info(f"JSON written to {json_file} (YAML loader: {resolve_loader(loader)})")
         return json_file
+
+    @staticmethod
+    def yaml2json_documents(  # noqa: PLR0913
+        yaml_file: Path,
+        loader: str = LOADER.auto,
+        parse_mode: str = PARSE_MODE.document,
+        workers: int = 0,
+        chunk_size: int = 16,
+        serializer: str = SERIALIZER.auto,
+        compact: bool = False,
+        projection: str = "",
+        mmap_threshold: int = MMAP_THRESHOLD,
+    ) -> Iterator[str]:
+        """Lazily convert each document of a YAML file to a JSON string.
+
+        Empty documents are skipped. Documents are parsed in a process pool, if more than
+        one worker is given. Files of at least mmap_threshold bytes are memory-mapped.
+        """
+        json_serializer = resolve_serializer(serializer, compact=compact)
+        projector = Projection(projection) if projection.strip() else None
+        with open_yaml_file(yaml_file, threshold=mmap_threshold) as yaml_reader:
+            yield from convert_documents(
+                yaml_reader,
+                loader=loader,
+                parse_mode=parse_mode,
+                workers=workers,
+                chunk_size=chunk_size,
+                serializer=json_serializer,
+                projection=projector,
+            )
@@ -0,0 +1,95 @@
+"""Prefetched input, which is downloaded while it is parsed"""
+
+import io
+from collections.abc import Buffer, Callable, Iterable
+from contextlib import suppress
+from queue import Full, Queue
+from threading import Thread
+
+PREFETCH_CHUNKS = 8
+"""Number of downloaded chunks, which are buffered for the parser"""
+
+
+class PrefetchStream(io.RawIOBase):
+    """Binary stream, which is filled with chunks produced in another thread
+
+    At most `max_chunks` chunks are queued, so a slow reader slows down the producer.
+    """
+
+    def __init__(self, max_chunks: int = PREFETCH_CHUNKS):
+        super().__init__()
+        self._chunks: Queue[bytes | BaseException | None] = Queue(maxsize=max_chunks)
+        self._pending = memoryview(b"")
+        self._finished = False
+        self._stopped = False
+        self._producer: Thread | None = None
+
+    def readable(self) -> bool:
+        """Allow reading (only)"""
+        return True
+
+    def readinto(self, buffer: Buffer, /) -> int:
+        """Read from the queued chunks, waiting for the producer if needed"""
+        while not self._pending:
+            if self._finished:
+                return 0
+            chunk = self._chunks.get()
+            if chunk is None:
+                self._finished = True
+                return 0
+            if isinstance(chunk, BaseException):
+                self._finished = True
+                raise chunk
+            self._pending = memoryview(chunk)
+        target = memoryview(buffer).cast("B")
+        size = min(len(target), len(self._pending))
+        target[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        """Stop the producer and wait for it"""
+        self._stopped = True
+        if self._producer is not None:
+            self._producer.join()
+            self._producer = None
+        super().close()
+
+    def put(self, chunk: bytes | BaseException | None) -> None:
+        """Queue a chunk (or the error or end of the producer)"""
+        while not self._stopped:
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+            except Full:
+                continue
+            return
+        raise OSError("The prefetch was stopped.")
+
+    def start(self, chunks: Callable[[], Iterable[bytes]]) -> None:
+        """Start a thread, which queues the chunks of an iterable"""
+
+        def produce() -> None:
+            try:
+                for chunk in chunks():
+                    if chunk:
+                        self.put(chunk)
+                self.put(None)
+            except BaseException as error:  # noqa: BLE001
+                with suppress(OSError):
+                    self.put(error)
+
+        self._producer = Thread(target=produce, name="cmem-plugin-yaml-prefetch", daemon=True)
+        self._producer.start()
+
+
+def prefetch(
+    chunks: Callable[[], Iterable[bytes]], max_chunks: int = PREFETCH_CHUNKS
+) -> io.BufferedReader:
+    """Get a reader of the chunks of an iterable, which is consumed in a thread
+
+    The iterable is created and consumed in the thread (e.g. to download a file), so
+    the reader can be parsed while the chunks arrive.
+    """
+    stream = PrefetchStream(max_chunks=max_chunks)
+    stream.start(chunks)
+    return io.BufferedReader(stream)
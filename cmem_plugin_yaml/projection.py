@@ -0,0 +1,399 @@
+"""Projection of YAML documents to selected subtrees
+
+A projection is a list of dotted paths like `spec.template` or `$.paths['/users']`
+(`*` matches any key or item, numbers select sequence items). Parser events outside of
+the selected subtrees are skipped, so they are never composed to nodes or constructed
+to Python objects. The selected subtrees keep their position in the document.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from cmem_plugin_yaml.lazy import lazy_import
+from cmem_plugin_yaml.scalars import construct_scalar, json_key, scalar_tag
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import yaml
+
+    from cmem_plugin_yaml.mapped import YamlInput
+else:
+    yaml = lazy_import("yaml")
+
+WILDCARD = "*"
+MERGE_TAG = "tag:yaml.org,2002:merge"
+
+Selection = dict[str, "Selection | None"] | None
+"""Selected keys with their sub selection (None selects the complete subtree)"""
+
+_TOKEN = re.compile(
+    r"""[ \t\r]*(?:
+    \[\s*(?:'(?P<single>[^']*)'|"(?P<double>[^"]*)"|(?P<index>\d+|\*))\s*\]
+    |(?P<dot>\.)
+    |(?P<separator>[,\n])
+    |(?P<key>[^.\[\],\n]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+def parse_projection(text: str) -> list[list[str]]:
+    """Parse comma or line separated paths to lists of path segments"""
+    paths: list[list[str]] = []
+    segments: list[str] = []
+    has_path = False
+    position = 0
+    while position < len(text.rstrip()):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid projection at position {position}: {text!r}")
+        position = match.end()
+        if match["separator"] is not None:
+            if has_path:
+                paths.append(segments)
+            segments, has_path = [], False
+            continue
+        if match["dot"] is not None:
+            continue
+        segment = next(
+            _
+            for _ in (match["single"], match["double"], match["index"], match["key"])
+            if _ is not None
+        )
+        if match["key"] is not None:
+            segment = segment.strip()
+        if not (segment == "$" and not has_path):
+            segments.append(segment)
+        has_path = True
+    if has_path:
+        paths.append(segments)
+    return paths
+
+
+def _select(selection: dict[str, Selection], key: str) -> tuple[bool, Selection]:
+    """Check if a key is selected and get its sub selection"""
+    if key in selection:
+        return True, selection[key]
+    if WILDCARD in selection:
+        return True, selection[WILDCARD]
+    return False, None
+
+
+def selection_key(key: Any) -> str:  # noqa: ANN401
+    """Get the key of a constructed mapping key, which is matched with the selection
+
+    This is the JSON key (e.g. `true` for the YAML 1.1 key `on`), or the text of keys
+    which are no JSON keys (e.g. dates).
+    """
+    try:
+        return json_key(key)
+    except TypeError:
+        return str(key)
+
+
+def _is_merge(event: yaml.Event) -> bool:
+    """Check if a mapping key event is a merge key"""
+    return isinstance(event, yaml.ScalarEvent) and (
+        event.tag == MERGE_TAG or (event.tag is None and event.value == "<<" and event.implicit[0])
+    )
+
+
+class Projection:
+    """Selects subtrees of YAML documents by paths (picklable for parse workers)"""
+
+    def __init__(self, text: str):
+        self.text = text
+        paths = parse_projection(text)
+        self.selection: Selection = {} if paths else None
+        for segments in paths:
+            if not segments or self.selection is None:
+                self.selection = None  # a root path ($) selects the complete documents
+                break
+            self._add(self.selection, segments)
+
+    @staticmethod
+    def _add(selection: dict[str, Selection], segments: list[str]) -> None:
+        """Add the segments of a path to a selection"""
+        for segment in segments[:-1]:
+            sub_selection = selection.setdefault(segment, {})
+            if sub_selection is None:
+                return  # the complete subtree is already selected
+            selection = sub_selection
+        selection[segments[-1]] = None
+
+    def events(self, events: Iterator[yaml.Event], loader: Any) -> Iterator[yaml.Event]:  # noqa: ANN401
+        """Lazily project a stream of parser events
+
+        Mapping keys are resolved and constructed by the (safe) loader, so they are
+        selected by the same keys as the constructed data is pruned.
+        """
+        return _EventProjector(events, loader).project(self.selection)
+
+    def prune(self, value: Any, indexes: dict[int, list[int]] | None = None) -> Any:  # noqa: ANN401
+        """Prune constructed data to the selection (e.g. keys added by merge keys)
+
+        Indexes are the item numbers of projected sequences by the id of their lists.
+        Other lists (e.g. of merged content) still have all their items.
+        """
+        return _prune(value, self.selection, indexes or {})
+
+
+def _prune(value: Any, selection: Selection, indexes: dict[int, list[int]]) -> Any:  # noqa: ANN401
+    """Prune constructed data to a selection
+
+    Items of lists are selected by their item number in the document, which is not
+    their position in a projected list.
+    """
+    if selection is None:
+        return value
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            selected, sub_selection = _select(selection, selection_key(key))
+            if selected:
+                pruned[key] = _prune(item, sub_selection, indexes)
+        return pruned
+    if isinstance(value, list):
+        items = []
+        for index, item in zip(indexes.get(id(value), range(len(value))), value, strict=False):
+            selected, sub_selection = _select(selection, str(index))
+            if selected:
+                items.append(_prune(item, sub_selection, indexes))
+        return items
+    return value
+
+
+class _EventProjector:
+    """Projects the events of a YAML stream
+
+    Anchored nodes of skipped subtrees are captured, so they can be replayed for an
+    alias in a selected subtree.
+    """
+
+    def __init__(self, events: Iterator[yaml.Event], loader: Any):  # noqa: ANN401
+        self.events = events
+        self.loader = loader
+        self.captured: dict[str, list[yaml.Event]] = {}
+
+    def project(self, selection: Selection) -> Iterator[yaml.Event]:
+        """Project the events of all documents"""
+        for event in self.events:
+            if isinstance(event, yaml.DocumentStartEvent):
+                self.captured.clear()
+            if isinstance(event, yaml.NodeEvent):
+                yield from self._node(event, selection)
+            else:
+                yield event
+
+    def _node(self, event: yaml.Event, selection: Selection) -> Iterator[yaml.Event]:
+        """Project the events of a node"""
+        if isinstance(event, yaml.AliasEvent):
+            yield from self._alias(event)
+            return
+        self._define(event)
+        indexes: list[int] = []
+        if isinstance(event, yaml.SequenceStartEvent) and selection is not None:
+            event.indexes = indexes  # type: ignore[attr-defined]
+        yield event
+        if not isinstance(event, yaml.CollectionStartEvent):
+            return
+        if selection is None:
+            yield from self._copy()
+        elif isinstance(event, yaml.MappingStartEvent):
+            yield from self._mapping(selection)
+        else:
+            yield from self._sequence(selection, indexes)
+
+    def _mapping(self, selection: dict[str, Selection]) -> Iterator[yaml.Event]:
+        """Project the pairs of a mapping (after its start event)"""
+        for key in self.events:
+            if isinstance(key, yaml.MappingEndEvent):
+                yield key
+                return
+            if _is_merge(key):
+                # merged keys are pruned after construction
+                selected, sub_selection = True, None
+            elif isinstance(key, yaml.ScalarEvent):
+                selected, sub_selection = _select(selection, self._key(key))
+            else:
+                selected, sub_selection = False, None
+            if selected:
+                yield from self._node(key, None)
+                yield from self._node(next(self.events), sub_selection)
+            else:
+                self._skip(key)
+                self._skip(next(self.events))
+
+    def _key(self, event: yaml.ScalarEvent) -> str:
+        """Get the selection key of a mapping key event"""
+        key = construct_scalar(self.loader, event, scalar_tag(self.loader, event))
+        return selection_key(key)
+
+    def _sequence(
+        self, selection: dict[str, Selection], indexes: list[int]
+    ) -> Iterator[yaml.Event]:
+        """Project the items of a sequence (after its start event)
+
+        The item numbers of the selected items are added to the indexes.
+        """
+        for index, item in enumerate(self.events):
+            if isinstance(item, yaml.SequenceEndEvent):
+                yield item
+                return
+            selected, sub_selection = _select(selection, str(index))
+            if selected:
+                indexes.append(index)
+                yield from self._node(item, sub_selection)
+            else:
+                self._skip(item)
+
+    def _copy(self) -> Iterator[yaml.Event]:
+        """Copy the events of a collection (after its start event)"""
+        depth = 1
+        for event in self.events:
+            if isinstance(event, yaml.AliasEvent):
+                yield from self._alias(event)
+                continue
+            self._define(event)
+            yield event
+            if isinstance(event, yaml.CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth -= 1
+                if not depth:
+                    return
+
+    def _skip(self, event: yaml.Event) -> None:
+        """Skip the events of a node, capturing the events of anchored nodes"""
+        captures: list[tuple[int, list[yaml.Event]]] = []
+        depth = 0
+        while True:
+            if not isinstance(event, yaml.AliasEvent) and getattr(event, "anchor", None):
+                capture: list[yaml.Event] = []
+                self.captured[event.anchor] = capture  # type: ignore[attr-defined]
+                captures.append((depth, capture))
+            for _, capture in captures:
+                capture.append(event)
+            if isinstance(event, yaml.CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth -= 1
+            if not depth:
+                return
+            captures = [_ for _ in captures if _[0] < depth]
+            event = next(self.events)
+
+    def _define(self, event: yaml.Event) -> None:
+        """Forget a captured anchor, which is defined again in a selected subtree"""
+        anchor = getattr(event, "anchor", None)
+        if anchor is not None:
+            self.captured.pop(anchor, None)
+
+    def _alias(self, event: yaml.AliasEvent) -> Iterator[yaml.Event]:
+        """Replay a captured anchored node for its first alias"""
+        captured = self.captured.pop(str(event.anchor), None)
+        if captured is None:
+            yield event
+            return
+        for replayed in captured:
+            if isinstance(replayed, yaml.AliasEvent):
+                yield from self._alias(replayed)
+                continue
+            self._define(replayed)
+            yield replayed
+
+
+def parser_events(parser: Any) -> Iterator[yaml.Event]:  # noqa: ANN401
+    """Lazily get the events of a parser"""
+    while parser.check_event():
+        yield parser.get_event()
+
+
+class _ProjectedSequences:
+    """Prunes constructed documents, keeping track of the items of projected sequences
+
+    Mixed into the projected loader before the composer and constructor of yaml.
+    """
+
+    projection: Projection
+    node_indexes: dict[yaml.Node, list[int]]
+    indexes: dict[int, list[int]]
+
+    def compose_sequence_node(self, anchor: Any) -> yaml.SequenceNode:  # noqa: ANN401
+        """Compose a sequence node and remember the item numbers of a projected one"""
+        indexes = getattr(self.peek_event(), "indexes", None)  # type: ignore[attr-defined]
+        node: yaml.SequenceNode = super().compose_sequence_node(anchor)  # type: ignore[misc]
+        if indexes is not None:
+            self.node_indexes[node] = indexes
+        return node
+
+    def construct_object(self, node: yaml.Node, deep: bool = False) -> Any:  # noqa: ANN401
+        """Construct an object and remember the item numbers of projected lists"""
+        data = super().construct_object(node, deep=deep)  # type: ignore[misc]
+        if node in self.node_indexes:
+            self.indexes[id(data)] = self.node_indexes[node]
+        return data
+
+    def construct_document(self, node: yaml.Node) -> Any:  # noqa: ANN401
+        """Construct a document and prune it to the selection"""
+        try:
+            data = super().construct_document(node)  # type: ignore[misc]
+            return self.projection.prune(data, self.indexes)
+        finally:
+            self.node_indexes.clear()
+            self.indexes.clear()
+
+
+@cache
+def projected_loader_class() -> type:
+    """Get the loader class, which composes and constructs projected documents
+
+    The class derives from the composer and safe constructor of yaml, so it is only
+    created (and yaml imported) when a projection is loaded.
+    """
+    from yaml.composer import Composer  # noqa: PLC0415
+    from yaml.constructor import SafeConstructor  # noqa: PLC0415
+    from yaml.resolver import Resolver  # noqa: PLC0415
+
+    class ProjectedLoader(_ProjectedSequences, Composer, SafeConstructor, Resolver):
+        """Composes and constructs projected documents from the events of a safe loader"""
+
+        def __init__(self, loader_class: type, projection: Projection, stream: YamlInput):
+            self.parser = loader_class(stream)
+            self.projection = projection
+            self.projected = projection.events(parser_events(self.parser), self.parser)
+            self.event: yaml.Event | None = None
+            self.node_indexes = {}
+            self.indexes = {}
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+        def check_event(self, *choices: type) -> bool:
+            """Check the type of the next event"""
+            if self.event is None:
+                self.event = next(self.projected, None)
+            if self.event is None:
+                return False
+            return not choices or isinstance(self.event, choices)
+
+        def peek_event(self) -> yaml.Event | None:
+            """Get the next event without consuming it"""
+            self.check_event()
+            return self.event
+
+        def get_event(self) -> yaml.Event | None:
+            """Consume the next event"""
+            self.check_event()
+            event, self.event = self.event, None
+            return event
+
+        def dispose(self) -> None:
+            """Dispose the parser"""
+            self.parser.dispose()
+
+    return ProjectedLoader
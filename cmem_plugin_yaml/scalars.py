@@ -0,0 +1,53 @@
+"""Resolution and construction of scalar parser events
+
+Streaming and projection work on parser events instead of composed nodes, so they
+resolve and construct scalars (e.g. mapping keys) like the composer and constructor.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from cmem_plugin_yaml.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = lazy_import("yaml")
+
+
+def scalar_tag(loader: Any, event: yaml.ScalarEvent) -> str:  # noqa: ANN401
+    """Resolve the tag of a scalar event, as the composer would do"""
+    if event.tag is None or event.tag == "!":
+        return str(loader.resolve(yaml.ScalarNode, event.value, event.implicit))
+    return str(event.tag)
+
+
+def construct_scalar(loader: Any, event: yaml.ScalarEvent, tag: str) -> Any:  # noqa: ANN401
+    """Construct the python value of a scalar event, as the constructor would do"""
+    node = yaml.ScalarNode(
+        tag,
+        event.value,
+        event.start_mark,  # type: ignore[arg-type]
+        event.end_mark,  # type: ignore[arg-type]
+        event.style,
+    )
+    value = loader.construct_object(node, deep=True)
+    loader.constructed_objects.clear()
+    return value
+
+
+def json_key(key: Any) -> str:  # noqa: ANN401
+    """Convert a mapping key the same way the json module does"""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int | float):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
@@ -0,0 +1,88 @@
+"""Scratch area for the temporary files of a single execution"""
+
+import os
+import shutil
+from pathlib import Path
+from tempfile import SpooledTemporaryFile, mkdtemp
+from types import TracebackType
+
+
+class ScratchFile(SpooledTemporaryFile):
+    """Buffer which is written to the scratch area, if it gets larger than max_size
+
+    A max_size of 0 writes to the scratch area right away.
+    """
+
+    def __init__(self, scratch: "ScratchArea", max_size: int = 0, mode: str = "w+"):
+        super().__init__(
+            max_size=max_size,
+            mode=mode,
+            encoding=None if "b" in mode else "utf-8",
+            dir=scratch.path,
+        )
+        self.scratch = scratch
+        self.on_disk = False
+        if max_size == 0:
+            self.rollover()
+
+    def rollover(self) -> None:
+        """Write the buffer to a file in the scratch area"""
+        super().rollover()
+        self.on_disk = True
+
+    def close(self) -> None:
+        """Close the buffer and account the bytes written to disk"""
+        if self.on_disk and not self.closed:
+            self.flush()
+            self.scratch.bytes_written += os.fstat(self.fileno()).st_size
+        super().close()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the buffer (the base class would bypass close)"""
+        self.close()
+
+
+class ScratchArea:
+    """Temporary directory of a single execution, which is removed afterwards"""
+
+    def __init__(self, base_dir: str = ""):
+        self.base_dir = base_dir
+        self._path: str | None = None
+        self.bytes_written = 0
+
+    @property
+    def path(self) -> str:
+        """The directory of the scratch area (created on first use)"""
+        if self._path is None:
+            if self.base_dir:
+                Path(self.base_dir).mkdir(parents=True, exist_ok=True)
+            self._path = mkdtemp(prefix="cmem-plugin-yaml-", dir=self.base_dir or None)
+        return self._path
+
+    def file(self, max_size: int = 0, mode: str = "w+") -> ScratchFile:
+        """Create a buffer which is written to the scratch area if it gets too large"""
+        return ScratchFile(scratch=self, max_size=max_size, mode=mode)
+
+    def cleanup(self) -> None:
+        """Remove the scratch area incl. all files"""
+        if self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._path = None
+
+    def __enter__(self) -> "ScratchArea":
+        """Use the scratch area as context manager, which removes it on exit"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Remove the scratch area, regardless of errors"""
+        self.cleanup()
@@ -0,0 +1,73 @@
+"""JSON serializer selection"""
+
+import json
+from collections import OrderedDict
+from functools import cache
+from importlib import import_module
+from importlib.util import find_spec
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+SERIALIZER = SimpleNamespace()
+SERIALIZER.auto = "auto"
+SERIALIZER.json = "json"
+SERIALIZER.orjson = "orjson"
+SERIALIZER.options = OrderedDict(
+    {
+        SERIALIZER.auto: f"{SERIALIZER.auto}: "
+        "Use orjson for compact JSON if available, otherwise the json module.",
+        SERIALIZER.json: f"{SERIALIZER.json}: Use the json module of the standard library.",
+        SERIALIZER.orjson: f"{SERIALIZER.orjson}: "
+        "Use orjson (fails if not available, compact JSON only).",
+    }
+)
+
+
+def orjson_available() -> bool:
+    """Check if the optional orjson package is installed"""
+    return find_spec("orjson") is not None
+
+
+@cache
+def _orjson() -> ModuleType:
+    return import_module("orjson")
+
+
+class JsonSerializer:
+    """Serializes values to JSON text with the json module or orjson
+
+    Instances are picklable, so they can be passed to the workers of a process pool.
+    """
+
+    def __init__(self, backend: str = SERIALIZER.json, compact: bool = False):
+        self.backend = backend
+        self.compact = compact
+        self.item_separator = "," if compact else ", "
+        self.key_separator = ":" if compact else ": "
+
+    def dumps(self, value: Any) -> str:  # noqa: ANN401
+        """Serialize a value to JSON text"""
+        if self.backend == SERIALIZER.orjson:
+            orjson = _orjson()
+            try:
+                return str(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8"))
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers larger than 64 bit, which the json module supports
+        return json.dumps(value, separators=(self.item_separator, self.key_separator))
+
+
+DEFAULT_SERIALIZER = JsonSerializer()
+"""The json module with its default separators"""
+
+
+def resolve_serializer(name: str = SERIALIZER.auto, compact: bool = False) -> JsonSerializer:
+    """Resolve a serializer option to the serializer which is actually used"""
+    if name == SERIALIZER.auto:
+        name = SERIALIZER.orjson if compact and orjson_available() else SERIALIZER.json
+    if name not in (SERIALIZER.json, SERIALIZER.orjson):
+        raise ValueError(f"Unknown JSON serializer: {name}")
+    if name == SERIALIZER.orjson and not orjson_available():
+        raise ValueError(f"JSON serializer '{SERIALIZER.orjson}' requested, but not installed.")
+    if name == SERIALIZER.orjson and not compact:
+        raise ValueError(f"JSON serializer '{SERIALIZER.orjson}' only writes compact JSON.")
+    return JsonSerializer(backend=name, compact=compact)
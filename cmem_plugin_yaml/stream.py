@@ -0,0 +1,288 @@
+"""Event driven YAML to JSON conversion
+
+The conversion works on the YAML parser event stream and writes JSON tokens as soon as
+the events arrive. Only the stack of currently open collections is held in memory, so
+memory usage is bounded by the nesting depth and not by the size of the document.
+
+The output is identical to `json.dump(yaml.safe_load(...))` for documents without
+anchors, aliases, merge keys or duplicate keys.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import json
+from typing import IO, TYPE_CHECKING, Any
+
+from cmem_plugin_yaml.expansion import DEFAULT_EXPANSION, ExpansionGuard, ExpansionPolicy
+from cmem_plugin_yaml.lazy import lazy_import
+from cmem_plugin_yaml.loader import LOADER, get_loader_class
+from cmem_plugin_yaml.projection import Projection, parser_events
+from cmem_plugin_yaml.scalars import construct_scalar, json_key, scalar_tag
+from cmem_plugin_yaml.serialize import DEFAULT_SERIALIZER, JsonSerializer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    import yaml
+    import yaml.composer
+
+    from cmem_plugin_yaml.mapped import YamlInput
+else:
+    yaml = lazy_import("yaml")
+
+MAPPING_TAGS = (None, "!", "tag:yaml.org,2002:map")
+SEQUENCE_TAGS = (None, "!", "tag:yaml.org,2002:seq")
+MERGE_TAG = "tag:yaml.org,2002:merge"
+NULL_TAG = "tag:yaml.org,2002:null"
+
+
+class _Collection:
+    """State of an open mapping or sequence"""
+
+    __slots__ = ("count", "expect_key", "is_mapping")
+
+    def __init__(self, is_mapping: bool):
+        self.is_mapping = is_mapping
+        self.count = 0
+        self.expect_key = is_mapping
+
+
+def _is_null(loader: Any, event: yaml.Event) -> bool:  # noqa: ANN401
+    """Check if an event is a null scalar (e.g. the root of an empty document)"""
+    return isinstance(event, yaml.ScalarEvent) and scalar_tag(loader, event) == NULL_TAG
+
+
+def _unsupported(event: yaml.Event, feature: str) -> ValueError:
+    """Create an error for YAML features which are not supported while streaming"""
+    return ValueError(
+        f"{feature} are not supported in streaming mode ({event.start_mark}). "
+        "Please use the document parse mode for this YAML content."
+    )
+
+
+class JsonEventWriter:
+    """Write the node events of a single YAML document as JSON tokens
+
+    With a level above zero, the events of a node below the document root are written
+    (e.g. an item of a root sequence), which can also be a scalar.
+    """
+
+    def __init__(
+        self,
+        parser: Any,  # noqa: ANN401
+        json_writer: IO[str],
+        serializer: JsonSerializer = DEFAULT_SERIALIZER,
+        guard: ExpansionGuard | None = None,
+        level: int = 0,
+    ):
+        self.parser = parser
+        self.json_writer = json_writer
+        self.serializer = serializer
+        self.guard = guard
+        self.level = level
+        self._write: Callable[[str], object] = (
+            json_writer.write if guard is None else self._guarded_write
+        )
+        self.stack: list[_Collection] = []
+        self.root_seen = False
+
+    def _guarded_write(self, text: str) -> None:
+        """Write JSON tokens within the expanded size limit"""
+        if self.guard is not None:
+            self.guard.count(size=len(text))
+        self.json_writer.write(text)
+
+    def write_event(self, event: yaml.Event) -> None:
+        """Write a node or collection end event"""
+        if isinstance(event, yaml.AliasEvent):
+            raise _unsupported(event, "Aliases")
+        if self.guard is not None and isinstance(event, yaml.NodeEvent):
+            self.guard.count_node(depth=self.level + len(self.stack) + 1)
+        if not self.root_seen:
+            self.root_seen = True
+            if not self.level and not isinstance(event, yaml.CollectionStartEvent):
+                raise TypeError("YAML content could not be parsed to a dict or list.")
+        if isinstance(event, yaml.CollectionEndEvent):
+            closed = self.stack.pop()
+            self._write("}" if closed.is_mapping else "]")
+            if self.stack and self.stack[-1].is_mapping:
+                self.stack[-1].expect_key = True
+            return
+        parent = self.stack[-1] if self.stack else None
+        if parent is not None and parent.expect_key:
+            self._write_key(parent, event)
+            return
+        if parent is not None and not parent.is_mapping:
+            if parent.count:
+                self._write(self.serializer.item_separator)
+            parent.count += 1
+        self._write_value(parent, event)
+
+    def _write_value(self, parent: _Collection | None, event: yaml.Event) -> None:
+        """Write a scalar value or open a collection"""
+        if isinstance(event, yaml.ScalarEvent):
+            value = construct_scalar(self.parser, event, scalar_tag(self.parser, event))
+            self._write(json.dumps(value))
+            if parent is not None:
+                parent.expect_key = parent.is_mapping
+        elif isinstance(event, yaml.MappingStartEvent):
+            if event.tag not in MAPPING_TAGS:
+                raise _unsupported(event, f"Mapping tags like '{event.tag}'")
+            self._write("{")
+            self.stack.append(_Collection(is_mapping=True))
+        elif isinstance(event, yaml.SequenceStartEvent):
+            if event.tag not in SEQUENCE_TAGS:
+                raise _unsupported(event, f"Sequence tags like '{event.tag}'")
+            self._write("[")
+            self.stack.append(_Collection(is_mapping=False))
+
+    def _write_key(self, parent: _Collection, event: yaml.Event) -> None:
+        """Write a mapping key"""
+        if not isinstance(event, yaml.ScalarEvent):
+            raise _unsupported(event, "Complex mapping keys")
+        tag = scalar_tag(self.parser, event)
+        if tag == MERGE_TAG:
+            raise _unsupported(event, "Merge keys")
+        key = construct_scalar(self.parser, event, tag)
+        if parent.count:
+            self._write(self.serializer.item_separator)
+        parent.count += 1
+        parent.expect_key = False
+        self._write(json.dumps(json_key(key)))
+        self._write(self.serializer.key_separator)
+
+
+def _events(parser: Any, projection: Projection | None) -> Iterator[yaml.Event]:  # noqa: ANN401
+    """Lazily get the (projected) events of a parser"""
+    events = parser_events(parser)
+    return events if projection is None else projection.events(events, parser)
+
+
+def _single_document_events(
+    parser: Any,  # noqa: ANN401
+    projection: Projection | None,
+) -> Iterator[yaml.Event]:
+    """Lazily get the node and collection end events of a single document stream"""
+    documents = 0
+    for event in _events(parser, projection):
+        if isinstance(event, yaml.DocumentStartEvent):
+            if documents:
+                raise yaml.composer.ComposerError(
+                    "expected a single document in the stream",
+                    None,
+                    "but found another document",
+                    event.start_mark,  # type: ignore[arg-type]
+                )
+            documents += 1
+        elif isinstance(event, yaml.NodeEvent | yaml.CollectionEndEvent):
+            yield event
+
+
+def stream_yaml2json(  # noqa: PLR0913
+    yaml_reader: YamlInput,
+    json_writer: IO[str],
+    loader: str = LOADER.auto,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> None:
+    """Convert a single YAML document to JSON without building the document tree."""
+    parser = get_loader_class(loader)(yaml_reader)
+    event_writer = JsonEventWriter(
+        parser=parser,
+        json_writer=json_writer,
+        serializer=serializer,
+        guard=ExpansionGuard(expansion) if expansion.is_guarded() else None,
+    )
+    try:
+        for event in _single_document_events(parser, projection):
+            event_writer.write_event(event)
+    finally:
+        parser.dispose()
+    if not event_writer.root_seen:
+        raise TypeError("YAML content could not be parsed to a dict or list.")
+
+
+def stream_yaml2json_documents(
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[str]:
+    """Lazily convert each document of a YAML stream to JSON without building the trees.
+
+    Empty documents are skipped. Memory usage is bounded by the size of the largest
+    JSON document.
+    """
+    parser = get_loader_class(loader)(yaml_reader)
+    guard = ExpansionGuard(expansion) if expansion.is_guarded() else None
+    buffer = io.StringIO()
+    event_writer = JsonEventWriter(
+        parser=parser, json_writer=buffer, serializer=serializer, guard=guard
+    )
+    try:
+        for event in _events(parser, projection):
+            if isinstance(event, yaml.DocumentStartEvent):
+                buffer = io.StringIO()
+                event_writer = JsonEventWriter(
+                    parser=parser, json_writer=buffer, serializer=serializer, guard=guard
+                )
+            elif isinstance(event, yaml.DocumentEndEvent):
+                if event_writer.root_seen:
+                    yield buffer.getvalue()
+            elif isinstance(event, yaml.NodeEvent | yaml.CollectionEndEvent):
+                if not event_writer.root_seen and _is_null(parser, event):
+                    continue
+                event_writer.write_event(event)
+    finally:
+        parser.dispose()
+
+
+def stream_yaml2json_records(
+    yaml_reader: YamlInput,
+    loader: str = LOADER.auto,
+    serializer: JsonSerializer = DEFAULT_SERIALIZER,
+    expansion: ExpansionPolicy = DEFAULT_EXPANSION,
+    projection: Projection | None = None,
+) -> Iterator[str]:
+    """Lazily convert a single YAML document to JSON Lines records without building the tree.
+
+    Each item of a root sequence is a record, a root mapping is a single record. Memory
+    usage is bounded by the size of the largest record.
+    """
+    parser = get_loader_class(loader)(yaml_reader)
+    guard = ExpansionGuard(expansion) if expansion.is_guarded() else None
+    try:
+        events = _single_document_events(parser, projection)
+        root = next(events, None)
+        if not isinstance(root, yaml.SequenceStartEvent) or root.tag not in SEQUENCE_TAGS:
+            buffer = io.StringIO()
+            root_writer = JsonEventWriter(
+                parser=parser, json_writer=buffer, serializer=serializer, guard=guard
+            )
+            for event in events if root is None else itertools.chain([root], events):
+                root_writer.write_event(event)
+            if not root_writer.root_seen:
+                raise TypeError("YAML content could not be parsed to a dict or list.")
+            yield buffer.getvalue()
+            return
+        if guard is not None:
+            guard.count_node(depth=1)
+        item: JsonEventWriter | None = None
+        for event in events:
+            if item is None:
+                if isinstance(event, yaml.SequenceEndEvent):
+                    continue  # end of the root sequence
+                buffer = io.StringIO()
+                item = JsonEventWriter(
+                    parser=parser, json_writer=buffer, serializer=serializer, guard=guard, level=1
+                )
+            item.write_event(event)
+            if not item.stack:
+                yield buffer.getvalue()
+                item = None
+    finally:
+        parser.dispose()
@@ -0,0 +1,114 @@
+"""Streamed upload of JSON to a dataset resource, while the JSON is written"""
+
+import io
+from collections.abc import Buffer, Callable, Iterator
+from contextlib import suppress
+from queue import Full, Queue
+from threading import Thread
+from typing import IO
+
+from cmem.cmempy.api import request
+from cmem.cmempy.workspace.projects.datasets.dataset import get_dataset_file_uri
+
+CHUNK_SIZE = 1024 * 1024
+"""Size of the chunks, which are handed over from the writer to the upload"""
+
+
+class UploadStream(io.RawIOBase):
+    """Binary stream, which hands written chunks over to an upload in another thread
+
+    At most `max_chunks` chunks are queued, so a slow upload slows down the writer.
+    """
+
+    def __init__(self, max_chunks: int = 8):
+        super().__init__()
+        self._chunks: Queue[bytes | BaseException | None] = Queue(maxsize=max_chunks)
+        self._stopped = False
+        self.error: BaseException | None = None
+        self.bytes_written = 0
+        self.bytes_sent = 0
+
+    def writable(self) -> bool:
+        """Allow writing (only)"""
+        return True
+
+    def write(self, data: Buffer, /) -> int:
+        """Queue a chunk for the upload"""
+        chunk = bytes(data)
+        self.bytes_written += len(chunk)
+        self._put(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        """Queue the end of the upload"""
+        if not self.closed and not self._stopped:
+            self._put(None)
+        super().close()
+
+    def fail(self, error: BaseException) -> None:
+        """Fail the upload with an error of the writer"""
+        self.error = error
+        with suppress(OSError):
+            self._put(error)
+        self._stopped = True
+
+    def stop(self) -> None:
+        """Stop the writer (e.g. after the upload failed)"""
+        self._stopped = True
+
+    def _put(self, chunk: bytes | BaseException | None) -> None:
+        while not self._stopped:
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+            except Full:
+                continue
+            return
+        raise OSError("The upload was stopped.")
+
+    def chunks(self) -> Iterator[bytes]:
+        """Get the queued chunks until the end of the upload"""
+        while (chunk := self._chunks.get()) is not None:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if chunk:
+                self.bytes_sent += len(chunk)
+                yield chunk
+
+
+def upload_json(
+    project_id: str,
+    dataset_id: str,
+    write_json: Callable[[IO[str]], None],
+) -> UploadStream:
+    """Upload the JSON to a dataset resource, while write_json writes it (in a thread)
+
+    The upload uses chunked transfer encoding, so it starts with the first chunk.
+    """
+    stream = UploadStream()
+
+    def produce() -> None:
+        writer = io.TextIOWrapper(io.BufferedWriter(stream, CHUNK_SIZE), encoding="utf-8")
+        try:
+            write_json(writer)
+            writer.close()
+        except BaseException as error:  # noqa: BLE001
+            stream.fail(error)
+
+    producer = Thread(target=produce, name="cmem-plugin-yaml-upload", daemon=True)
+    producer.start()
+    try:
+        request(
+            get_dataset_file_uri().format(project_id, dataset_id),
+            method="PUT",
+            data=stream.chunks(),
+            stream=True,
+        )
+    except Exception:
+        if stream.error is None:
+            raise
+    finally:
+        stream.stop()
+        producer.join()
+    if stream.error is not None:
+        raise stream.error
+    return stream
@@ -0,0 +1,78 @@
+"""Measurements and baselines of benchmarks"""
+
+import json
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+
+TIME_TOLERANCE = 1.5
+"""Factor, by which a benchmark can be slower than its baseline"""
+
+TIME_SLACK = 0.05
+"""Seconds, by which a benchmark can be slower than its baseline (for short benchmarks)"""
+
+MEMORY_TOLERANCE = 1.25
+"""Factor, by which a benchmark can use more memory than its baseline"""
+
+MEMORY_SLACK = 1.0
+"""MiB, by which a benchmark can use more memory than its baseline"""
+
+
+@dataclass
+class Measurement:
+    """Wall clock time and peak of traced memory of a benchmark"""
+
+    seconds: float
+    peak_mib: float
+
+
+def measure(function: Callable[[], object]) -> Measurement:
+    """Measure a function (time and memory are measured in separate runs)
+
+    Memory is measured with tracemalloc, which slows down the run.
+    """
+    start = perf_counter()
+    function()
+    seconds = perf_counter() - start
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(seconds=round(seconds, 4), peak_mib=round(peak / 1024 / 1024, 2))
+
+
+class Baselines:
+    """Baseline measurements of benchmarks, stored as JSON file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.measurements: dict[str, dict] = {}
+        if path.exists():
+            self.measurements = json.loads(path.read_text(encoding="utf-8"))
+
+    def check(self, name: str, measurement: Measurement, update: bool = False) -> None:
+        """Compare a measurement with its baseline (or update the baseline)"""
+        if update:
+            self.measurements[name] = asdict(measurement)
+            return
+        if name not in self.measurements:
+            warnings.warn(f"No baseline for benchmark {name}", stacklevel=2)
+            return
+        baseline = Measurement(**self.measurements[name])
+        assert measurement.seconds <= baseline.seconds * TIME_TOLERANCE + TIME_SLACK, (
+            f"{name} is slower than its baseline: {measurement} > {baseline}"
+        )
+        assert measurement.peak_mib <= baseline.peak_mib * MEMORY_TOLERANCE + MEMORY_SLACK, (
+            f"{name} uses more memory than its baseline: {measurement} > {baseline}"
+        )
+
+    def save(self) -> None:
+        """Write the baselines to the JSON file"""
+        self.path.write_text(
+            json.dumps(self.measurements, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
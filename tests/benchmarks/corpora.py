@@ -0,0 +1,81 @@
+"""Synthetic YAML corpora for benchmarks"""
+
+import os
+from collections.abc import Callable
+
+SCALE = float(os.environ.get("BENCHMARK_SCALE", "1"))
+"""Scale factor for the size of the corpora (set BENCHMARK_SCALE to change it)"""
+
+
+def _scaled(count: int) -> int:
+    return max(1, int(count * SCALE))
+
+
+def deep_nesting() -> str:
+    """Generate deeply nested mappings (and sequences)"""
+    depth = 100
+    lines = []
+    for item in range(_scaled(20)):
+        lines.append(f"item{item}:")
+        for level in range(depth):
+            indent = "  " * (level + 1)
+            lines.append(f"{indent}name: level {level}")
+            lines.append(f"{indent}tags: [a, b, {level}]")
+            lines.append(f"{indent}child:")
+        lines.append(f"{'  ' * (depth + 1)}leaf: true")
+    return "\n".join(lines) + "\n"
+
+
+def wide_mappings() -> str:
+    """Generate mappings with many keys"""
+    lines = []
+    for item in range(_scaled(10)):
+        lines.append(f"mapping{item}:")
+        lines.extend(f"  key{key}: value {item}-{key}" for key in range(2000))
+    return "\n".join(lines) + "\n"
+
+
+def long_sequences() -> str:
+    """Generate a long sequence of small mappings (e.g. records)"""
+    lines = ["records:"]
+    for item in range(_scaled(5000)):
+        lines.append(f"  - id: {item}")
+        lines.append(f"    name: record {item}")
+        lines.append(f"    score: {item / 7:.3f}")
+        lines.append(f"    active: {str(item % 2 == 0).lower()}")
+    return "\n".join(lines) + "\n"
+
+
+def anchors_and_aliases() -> str:
+    """Generate many aliases to a few anchored mappings (incl. merge keys)"""
+    lines = ["definitions:"]
+    for anchor in range(50):
+        lines.append(f"  - &def{anchor}")
+        lines.extend(f"    field{field}: value {anchor}-{field}" for field in range(20))
+    lines.append("usages:")
+    for usage in range(_scaled(2000)):
+        lines.append(f"  - <<: *def{usage % 50}")
+        lines.append(f"    usage: {usage}")
+        lines.append(f"    reference: *def{(usage * 7) % 50}")
+    return "\n".join(lines) + "\n"
+
+
+def block_scalars() -> str:
+    """Generate a few large literal and folded block scalars"""
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod. "
+    lines = []
+    for item in range(_scaled(2)):
+        lines.append(f"literal{item}: |")
+        lines.extend(f"  {paragraph} {line}" for line in range(10000))
+        lines.append(f"folded{item}: >")
+        lines.extend(f"  {paragraph} {line}" for line in range(10000))
+    return "\n".join(lines) + "\n"
+
+
+CORPORA: dict[str, Callable[[], str]] = {
+    "deep": deep_nesting,
+    "wide": wide_mappings,
+    "long": long_sequences,
+    "anchors": anchors_and_aliases,
+    "block": block_scalars,
+}
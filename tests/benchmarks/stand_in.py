@@ -0,0 +1,65 @@
+"""Local stand-in for the resource and dataset APIs of cmempy"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO
+
+import pytest
+import requests
+
+from cmem_plugin_yaml import parse, upload
+
+
+class LocalResponse:
+    """Streamed response of a resource download"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        """Get the content in chunks"""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+class LocalCmem:
+    """Keeps project resources and dataset files in memory"""
+
+    def __init__(self) -> None:
+        self.resources: dict[str, bytes] = {}
+        self.datasets: dict[str, bytes] = {}
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Replace the cmempy functions used by the plugin"""
+        monkeypatch.setattr(parse, "get_resource_metadata", self.get_resource_metadata)
+        monkeypatch.setattr(parse, "get_resource_response", self.get_resource_response)
+        monkeypatch.setattr(parse, "post_resource", self.post_resource)
+        monkeypatch.setattr(upload, "request", self.request)
+
+    def _resource(self, name: str) -> bytes:
+        try:
+            return self.resources[name]
+        except KeyError:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.exceptions.HTTPError(response=response) from None
+
+    def get_resource_metadata(self, _: str, resource_name: str) -> dict:
+        """Get the metadata of a resource"""
+        content = self._resource(resource_name)
+        return {"name": resource_name, "size": len(content), "modified": str(hash(content))}
+
+    @contextmanager
+    def get_resource_response(self, _: str, resource_name: str) -> Iterator[LocalResponse]:
+        """Download a resource"""
+        yield LocalResponse(self._resource(resource_name))
+
+    def post_resource(self, project_id: str, dataset_id: str, file_resource: IO) -> None:  # noqa: ARG002
+        """Replace the file of a dataset"""
+        with file_resource as file:
+            content = file.read()
+        self.datasets[dataset_id] = content.encode("utf-8") if isinstance(content, str) else content
+
+    def request(self, uri: str, data: Iterator[bytes], **_: object) -> None:
+        """Replace the file of a dataset with a streamed upload"""
+        self.datasets[uri.split("/")[-2]] = b"".join(data)
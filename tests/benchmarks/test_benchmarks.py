@@ -0,0 +1,244 @@
+"""benchmarks of yaml2json, all source / target mode combinations and the plugin startup
+
+Large files are only converted (with and without memory-mapping), if their size is
+set, e.g. with `BENCHMARK_LARGE_MIB=100` (which takes minutes and has baselines).
+
+Run them with `pytest --benchmark tests/benchmarks` and update the baselines with
+`pytest --benchmark-update tests/benchmarks` (on the machine, which runs them).
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections.abc import Callable, Iterator
+from functools import cache
+from pathlib import Path
+
+import pytest
+from cmem_plugin_base.dataintegration.entity import Entities, Entity, EntityPath, EntitySchema
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests.benchmarks.baseline import Baselines, Measurement, measure
+from tests.benchmarks.corpora import CORPORA
+from tests.benchmarks.stand_in import LocalCmem
+from tests.utils import LocalExecutionContext
+
+pytestmark = pytest.mark.benchmark
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+TARGETS = {
+    "entities": {"target_mode": TARGET.entities},
+    "json_entities": {"target_mode": TARGET.json_entities},
+    "json_dataset": {"target_mode": TARGET.json_dataset},
+    "json_dataset_streamed": {"target_mode": TARGET.json_dataset, "streamed_upload": True},
+}
+
+
+STARTUP_RUNS = 5
+"""Number of fresh interpreters, of which the median startup time is taken"""
+
+STARTUP_CODE = """
+import importlib, json, sys, time, tracemalloc
+from cmem_plugin_base.dataintegration import context, description, entity, plugins, ports, utils
+from cmem_plugin_base.dataintegration.discovery import import_modules
+from cmem_plugin_base.dataintegration.parameter import choice, code, dataset, resource
+
+if sys.argv[2] == "memory":
+    tracemalloc.start()
+start = time.perf_counter()
+if sys.argv[1] == "discovery":
+    assert import_modules("cmem_plugin_yaml")
+else:
+    importlib.import_module("cmem_plugin_yaml.parse")
+    assert description.Plugin.plugins  # built by the plugin decorator
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "peak": tracemalloc.get_traced_memory()[1]}))
+"""
+"""Imports the plugin module (or discovers all plugins of the package like DataIntegration)
+
+The modules of cmem-plugin-base are imported before, so only the startup cost of this
+package (including the build of the plugin description) is measured.
+"""
+
+STARTUP_CASES = ["discovery", "import"]
+
+LARGE_MIB = int(os.environ.get("BENCHMARK_LARGE_MIB", "0"))
+"""Size of the large file (set BENCHMARK_LARGE_MIB to run the large file benchmarks)"""
+
+LARGE_CODE = """
+import json, resource, sys, time
+from pathlib import Path
+from cmem_plugin_yaml.parse import ParseYaml
+
+start = time.perf_counter()
+ParseYaml.yaml2json(Path(sys.argv[1]), multi_document=True, mmap_threshold=int(sys.argv[2]))
+seconds = time.perf_counter() - start
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+print(json.dumps({"seconds": seconds, "maxrss": maxrss}))
+"""
+"""Converts a YAML stream in a fresh interpreter, so its peak resident memory is measured"""
+
+LARGE_CASES = {"text": 0, "mapped": 1}
+"""Memory-mapping thresholds (in bytes) of the large file benchmarks"""
+
+
+@cache
+def corpus_text(name: str) -> str:
+    """Generate a corpus once per session"""
+    return CORPORA[name]()
+
+
+@pytest.fixture(scope="session")
+def baselines(request: pytest.FixtureRequest) -> Iterator[Baselines]:
+    """Load the baselines (and save them after the session, if they are updated)"""
+    loaded = Baselines(BASELINE_FILE)
+    yield loaded
+    if request.config.getoption("--benchmark-update"):
+        loaded.save()
+
+
+def consume(output: Entities | None) -> None:
+    """Consume all entities and sub entities of an output"""
+    if output is None:
+        return
+    for _ in output.entities:
+        pass
+    for sub_entities in output.sub_entities or []:
+        for _ in sub_entities.entities:
+            pass
+
+
+@pytest.mark.parametrize("corpus", list(CORPORA))
+def test_yaml2json(
+    corpus: str, tmp_path: Path, baselines: Baselines, request: pytest.FixtureRequest
+) -> None:
+    """Benchmark the conversion of YAML files to JSON files"""
+    yaml_file = tmp_path / "corpus.yml"
+    yaml_file.write_text(corpus_text(corpus), encoding="utf-8")
+    measurement = measure(lambda: ParseYaml.yaml2json(yaml_file))
+    baselines.check(
+        f"yaml2json[{corpus}]", measurement, update=request.config.getoption("--benchmark-update")
+    )
+
+
+@pytest.mark.parametrize("target", list(TARGETS))
+@pytest.mark.parametrize("source_mode", [SOURCE.code, SOURCE.file, SOURCE.entities])
+@pytest.mark.parametrize("corpus", list(CORPORA))
+def test_execute(  # noqa: PLR0913
+    corpus: str,
+    source_mode: str,
+    target: str,
+    local_context: LocalExecutionContext,
+    monkeypatch: pytest.MonkeyPatch,
+    baselines: Baselines,
+    request: pytest.FixtureRequest,
+) -> None:
+    """Benchmark the execution of the plugin with a local stand-in for CMEM"""
+    yaml_code = corpus_text(corpus)
+    cmem = LocalCmem()
+    cmem.install(monkeypatch)
+    cmem.resources["corpus.yml"] = yaml_code.encode("utf-8")
+    schema = EntitySchema(type_uri="urn:x-yaml:document", paths=[EntityPath(path="text")])
+
+    def execute() -> None:
+        plugin = ParseYaml(
+            source_mode=source_mode,
+            source_code=YamlCode(yaml_code),
+            source_file="corpus.yml",
+            target_dataset="json",
+            **TARGETS[target],
+        )
+        inputs = [
+            Entities(
+                entities=iter([Entity(uri="urn:x-yaml:1", values=[[yaml_code]])]), schema=schema
+            )
+        ]
+        consume(plugin.execute(inputs, local_context))
+
+    measurement = measure(execute)
+    if TARGETS[target]["target_mode"] == TARGET.json_dataset:
+        assert cmem.datasets["json"]
+    baselines.check(
+        f"execute[{corpus}-{source_mode}-{target}]",
+        measurement,
+        update=request.config.getoption("--benchmark-update"),
+    )
+
+
+def run_startup(case: str, kind: str, pycache: Path) -> dict:
+    """Run the startup code in a fresh interpreter (with cached bytecode, like installed)"""
+    env = {**os.environ, "PYTHONPYCACHEPREFIX": str(pycache)}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", STARTUP_CODE, case, kind],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    startup: dict = json.loads(result.stdout)
+    return startup
+
+
+@pytest.mark.parametrize("case", STARTUP_CASES)
+def test_startup(
+    case: str, tmp_path: Path, baselines: Baselines, request: pytest.FixtureRequest
+) -> None:
+    """Benchmark the import of the plugin (and the build of its description)"""
+    run_startup(case, "time", tmp_path)  # writes the bytecode
+    seconds = statistics.median(
+        run_startup(case, "time", tmp_path)["seconds"] for _ in range(STARTUP_RUNS)
+    )
+    peak = run_startup(case, "memory", tmp_path)["peak"]
+    measurement = Measurement(seconds=round(seconds, 4), peak_mib=round(peak / 1024 / 1024, 2))
+    baselines.check(
+        f"startup[{case}]", measurement, update=request.config.getoption("--benchmark-update")
+    )
+
+
+@pytest.fixture(scope="session")
+def large_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Write a YAML stream of LARGE_MIB MiB (of record documents) once per session"""
+    document = "---\n" + corpus_text("long")
+    yaml_file = tmp_path_factory.mktemp("large") / "large.yml"
+    with Path.open(yaml_file, "w", encoding="utf-8") as yaml_writer:
+        for _ in range(max(1, LARGE_MIB * 1024 * 1024 // len(document))):
+            yaml_writer.write(document)
+    return yaml_file
+
+
+@pytest.mark.skipif(not LARGE_MIB, reason="Needs BENCHMARK_LARGE_MIB")
+@pytest.mark.parametrize("case", list(LARGE_CASES))
+def test_large_file(
+    case: str,
+    large_file: Path,
+    baselines: Baselines,
+    record_property: Callable[[str, object], None],
+    request: pytest.FixtureRequest,
+) -> None:
+    """Benchmark the conversion of a large file with and without memory-mapping
+
+    The peak memory of this benchmark is the peak resident memory of the process
+    (including the touched pages of a memory-mapped file).
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", LARGE_CODE, str(large_file), str(LARGE_CASES[case])],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    large = json.loads(result.stdout)
+    size_mib = large_file.stat().st_size / 1024 / 1024
+    record_property("throughput_mib_s", round(size_mib / large["seconds"], 2))
+    measurement = Measurement(
+        seconds=round(large["seconds"], 4), peak_mib=round(large["maxrss"] / 1024, 2)
+    )
+    baselines.check(
+        f"large_file[{case}-{LARGE_MIB}]",
+        measurement,
+        update=request.config.getoption("--benchmark-update"),
+    )
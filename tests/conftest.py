@@ -0,0 +1,37 @@
+"""pytest fixtures"""
+
+import pytest
+
+from tests.utils import LocalExecutionContext
+
+
+@pytest.fixture
+def local_context(monkeypatch: pytest.MonkeyPatch) -> LocalExecutionContext:
+    """Provide an execution context which does not need a CMEM instance.
+
+    The environment variables written by setup_cmempy_user_access are restored afterwards.
+    """
+    monkeypatch.setenv("CMEM_BASE_URI", "http://localhost")
+    monkeypatch.setenv("OAUTH_GRANT_TYPE", "prefetched_token")
+    monkeypatch.setenv("OAUTH_ACCESS_TOKEN", "local-token")
+    return LocalExecutionContext()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add options to run the benchmarks"""
+    parser.addoption(
+        "--benchmark", action="store_true", help="Run benchmarks and compare them to baselines."
+    )
+    parser.addoption(
+        "--benchmark-update", action="store_true", help="Run benchmarks and update baselines."
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip the benchmarks, if they are not requested"""
+    if config.getoption("--benchmark") or config.getoption("--benchmark-update"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Needs --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
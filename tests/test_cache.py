@@ -0,0 +1,158 @@
+"""test result cache"""
+
+import io
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+import yaml
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml import parse
+from cmem_plugin_yaml.cache import ResultCache, cache_key
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_cache_key() -> None:
+    """Test that the key depends on content and options"""
+    source = io.BytesIO(b"a: 1")
+    key = cache_key(source, options={"parse_mode": "document"})
+    assert source.tell() == 0
+    assert key == cache_key(io.BytesIO(b"a: 1"), options={"parse_mode": "document"})
+    assert key != cache_key(io.BytesIO(b"a: 2"), options={"parse_mode": "document"})
+    assert key != cache_key(io.BytesIO(b"a: 1"), options={"parse_mode": "stream"})
+
+
+def test_result_cache_eviction(tmp_path: Path) -> None:
+    """Test that the least recently used results are evicted"""
+    cache = ResultCache(str(tmp_path), max_size=20)
+    cache.put("first", io.StringIO("1234567890"))
+    cache.put("second", io.StringIO("1234567890"))
+    os.utime(tmp_path / "first.json", (0, 0))
+    os.utime(tmp_path / "second.json", (1, 1))
+    assert cache.get("first") is not None
+    cache.put("third", io.StringIO("1234567890"))
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    cache.put("too-large", io.StringIO("1" * 21))
+    assert cache.get("too-large") is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_cached_execution(local_context: LocalExecutionContext, tmp_path: Path) -> None:
+    """Test that a second execution gets the result from the cache"""
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_text(encoding="utf-8")
+    outputs = []
+    for expected in ("miss", "hit"):
+        plugin = ParseYaml(
+            source_mode=SOURCE.code,
+            target_mode=TARGET.json_entities,
+            source_code=YamlCode(yaml_code),
+            cache_dir=str(tmp_path),
+        )
+        output = plugin.execute([], local_context)
+        assert output is not None
+        outputs.append(next(output.entities).values[0][0])
+        report = local_context.report.last
+        assert report is not None
+        assert ("Result cache", expected) in report.summary
+    assert outputs[0] == outputs[1]
+    assert json.loads(outputs[1]) == yaml.safe_load(yaml_code)
+    # a cached result does not bypass tighter expansion limits
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(yaml_code),
+        cache_dir=str(tmp_path),
+        expansion_node_limit=1,
+    )
+    with pytest.raises(ValueError, match="expanded node limit"):
+        plugin.execute([], local_context)
+
+
+def test_cached_file_source(
+    local_context: LocalExecutionContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that an unchanged project file is not downloaded again"""
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_bytes()
+    metadata: dict = {"size": len(yaml_code)}
+    downloads = []
+
+    @contextmanager
+    def get_resource_response(project: str, resource: str) -> Iterator[MagicMock]:
+        downloads.append((project, resource))
+        yield MagicMock(iter_content=lambda chunk_size: [yaml_code])  # noqa: ARG005
+
+    monkeypatch.setattr(parse, "get_resource_metadata", lambda *_: metadata)
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    outputs = []
+    for modified, source_cache in ((1, "miss"), (1, "hit"), (2, "miss")):
+        metadata["modified"] = f"2024-01-0{modified}T00:00:00Z"
+        plugin = ParseYaml(
+            source_mode=SOURCE.file,
+            target_mode=TARGET.json_entities,
+            source_file="test.yml",
+            cache_dir=str(tmp_path),
+        )
+        output = plugin.execute([], local_context)
+        assert output is not None
+        outputs.append(next(output.entities).values[0][0])
+        report = local_context.report.last
+        assert report is not None
+        assert ("Source cache", source_cache) in report.summary
+    assert len(downloads) == 2  # noqa: PLR2004
+    assert len(list(tmp_path.glob("*.yaml"))) == 1
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_missing_file_source(
+    local_context: LocalExecutionContext, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a missing project file is reported by the download itself"""
+    response = requests.Response()
+    response.status_code = 404
+
+    def get_resource_response(*_: str) -> None:
+        raise requests.exceptions.HTTPError(response=response)
+
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    plugin = ParseYaml(
+        source_mode=SOURCE.file, target_mode=TARGET.json_entities, source_file="missing.yml"
+    )
+    with pytest.raises(ValueError, match="does not exist"):
+        plugin.execute([], local_context)
+
+
+def test_upload_changed_only(
+    local_context: LocalExecutionContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that unchanged JSON is not uploaded again"""
+    uploads = []
+
+    def post_resource(project_id: str, dataset_id: str, file_resource: io.BytesIO) -> None:
+        with file_resource as file:
+            uploads.append((project_id, dataset_id, file.read()))
+
+    monkeypatch.setattr(parse, "post_resource", post_resource)
+    for yaml_code, bytes_sent in (("a: 1", "8"), ("a: 1", "0"), ("a: 2", "8")):
+        plugin = ParseYaml(
+            source_mode=SOURCE.code,
+            target_mode=TARGET.json_dataset,
+            source_code=YamlCode(yaml_code),
+            target_dataset="json",
+            cache_dir=str(tmp_path),
+            upload_changed_only=True,
+        )
+        plugin.execute([], local_context)
+        report = local_context.report.last
+        assert report is not None
+        assert ("Bytes sent", bytes_sent) in report.summary
+    assert [_[2] for _ in uploads] == [b'{"a": 1}', b'{"a": 2}']
@@ -0,0 +1,187 @@
+"""test lazy entity building"""
+
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+from cmem_plugin_base.dataintegration.entity import Entities, Entity
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+from cmem_plugin_base.dataintegration.utils.entity_builder import build_entities_from_data
+
+from cmem_plugin_yaml.convert import normalize
+from cmem_plugin_yaml.entities import XSD, TypedEntityPath, build_entities
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+SPECIAL_KEYS = """
+1: int key
+1.5: float key
+.inf: infinite key
+true: bool key
+null: null key
+"1": string key after int key
+values: [1, 1.0, 1e20, .nan, true, null, "text"]
+omap: !!omap [{a: 1}, {b: 2}]
+"""
+
+
+def resolve(entities: Entities) -> list[dict]:
+    """Resolve entities to nested dicts, replacing the (random) URIs of sub entities"""
+    sub_entities: dict[str, tuple[list[str], Entity]] = {}
+    for sub in entities.sub_entities or []:
+        paths = [_.path for _ in sub.schema.paths]
+        sub_entities |= {entity.uri: (paths, entity) for entity in sub.entities}
+
+    def _resolve(paths: list[str], entity: Entity) -> dict:
+        return {
+            path: [_resolve(*sub_entities[_]) if _ in sub_entities else _ for _ in values]
+            for path, values in zip(paths, entity.values, strict=True)
+        }
+
+    paths = [_.path for _ in entities.schema.paths]
+    return [_resolve(paths, entity) for entity in entities.entities]
+
+
+def test_same_entities() -> None:
+    """Test that lazy entities are the same as the ones of cmem-plugin-base"""
+    for fixture in ("test.yml", "no-anchors.yml"):
+        data = yaml.safe_load(Path(f"{FIXTURE_DIR}/{fixture}").read_text(encoding="utf-8"))
+        for item in (data, [data, data]):
+            expected = build_entities_from_data(item)
+            entities = build_entities(item)
+            assert expected is not None
+            assert entities is not None
+            assert entities.schema == expected.schema
+            assert resolve(entities) == resolve(expected)
+    # the same (sortable) URI scheme as cmem-plugin-base
+    entities = build_entities([{"a": {"b": 1}}])
+    assert entities is not None
+    assert entities.sub_entities is not None
+    uris = [_.uri for _ in entities.entities] + [_.uri for _ in entities.sub_entities[0].entities]
+    assert all(_.startswith("urn:x-ulid:") for _ in uris)
+    assert build_entities([1, 2, 3]) is None
+    assert build_entities({}) is None
+
+
+def test_lazy_entities() -> None:
+    """Test that root entities are generated while they are consumed"""
+    data = [{"name": f"item {_}", "tags": [{"tag": "a"}]} for _ in range(3)]
+    entities = build_entities(data)
+    assert entities is not None
+    assert next(entities.entities).values[0] == ["item 0"]
+    data.append({"name": "item 3", "tags": []})
+    assert [_.values[0] for _ in entities.entities] == [["item 1"], ["item 2"], ["item 3"]]
+    assert entities.sub_entities is not None
+    assert len(list(entities.sub_entities[0].entities)) == 3  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("fixture", ["test.yml", "no-anchors.yml"])
+def test_normalize(fixture: str) -> None:
+    """Test that normalized YAML is the same as YAML after a JSON round trip"""
+    for yaml_code in (Path(f"{FIXTURE_DIR}/{fixture}").read_text(encoding="utf-8"), SPECIAL_KEYS):
+        data = yaml.safe_load(yaml_code)
+        normalized = normalize(data)
+        # compare the JSON, since NaN is not equal to itself
+        assert json.dumps(normalized) == json.dumps(json.loads(json.dumps(data)))
+        assert list(normalized) == list(json.loads(json.dumps(data)))
+    with pytest.raises(TypeError, match="date is not JSON serializable"):
+        normalize(yaml.safe_load("a: 2024-01-01"))
+    assert normalize(yaml.safe_load("a: 2024-01-01"), timestamps=True) == {
+        "a": datetime.date(2024, 1, 1)
+    }
+    with pytest.raises(TypeError, match="bytes is not JSON serializable"):
+        normalize(yaml.safe_load("a: !!binary aGVsbG8="))
+    with pytest.raises(ValueError, match="Circular reference"):
+        normalize(yaml.safe_load("&a [*a]"))
+
+
+def test_direct_entities(local_context: LocalExecutionContext) -> None:
+    """Test that loading YAML directly provides the same entities as via JSON"""
+    for yaml_code in (Path(f"{FIXTURE_DIR}/test.yml").read_text(encoding="utf-8"), SPECIAL_KEYS):
+        outputs = []
+        for parse_workers in (0, 2):  # parallel parsing goes via JSON
+            plugin = ParseYaml(
+                source_mode=SOURCE.code,
+                target_mode=TARGET.entities,
+                source_code=YamlCode(yaml_code),
+                parse_workers=parse_workers,
+            )
+            assert plugin._is_direct_load() == (parse_workers == 0)  # noqa: SLF001
+            output = plugin.execute([], local_context)
+            assert output is not None
+            outputs.append(output)
+        assert outputs[0].schema == outputs[1].schema
+        assert resolve(outputs[0]) == resolve(outputs[1])
+
+
+TYPED = """
+- id: 1
+  price: 1.5
+  active: true
+  created: 2024-01-01 10:00:00
+  tags: [a, 1]
+  note: null
+  owner: {name: alice, age: 30}
+- id: 2
+  price: 2
+  active: false
+  created: 2024-01-02 10:00:00
+  tags: [b]
+  note: .inf
+  owner: {name: bob}
+"""
+
+
+def test_typed_entities(local_context: LocalExecutionContext) -> None:
+    """Test that typed entities keep the scalar types inferred by YAML"""
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.entities,
+        source_code=YamlCode(TYPED),
+        typed_entities=True,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    paths = output.schema.paths
+    assert all(isinstance(_, TypedEntityPath) for _ in paths)
+    assert {_.path: _.value_type for _ in paths} == {
+        "id": f"{XSD}integer",
+        "price": f"{XSD}double",
+        "active": f"{XSD}boolean",
+        "created": f"{XSD}dateTime",
+        "tags": f"{XSD}string",
+        "note": f"{XSD}double",
+        "owner": "",
+    }
+    owners = resolve(output)
+    assert [_["created"] for _ in owners] == [["2024-01-01T10:00:00"], ["2024-01-02T10:00:00"]]
+    assert [_["active"] for _ in owners] == [["true"], ["false"]]
+    assert [_["note"] for _ in owners] == [[""], ["INF"]]
+    assert owners[0]["owner"] == [{"name": ["alice"], "age": ["30"]}]
+    assert output.sub_entities is not None
+    sub_schema = output.sub_entities[0].schema
+    assert [(_.path, _.value_type) for _ in sub_schema.paths] == [  # type: ignore[attr-defined]
+        ("name", f"{XSD}string"),
+        ("age", f"{XSD}integer"),
+    ]
+
+    # the same schema (and values) are built from the data, untyped entities are unchanged
+    data = normalize(yaml.safe_load(TYPED), timestamps=True)
+    typed = build_entities(data, typed=True)
+    assert typed is not None
+    assert typed.schema == output.schema
+    assert [_.value_type for _ in typed.schema.paths] == [  # type: ignore[attr-defined]
+        _.value_type  # type: ignore[attr-defined]
+        for _ in paths
+    ]
+    untyped = build_entities(data)
+    assert untyped is not None
+    assert not any(isinstance(_, TypedEntityPath) for _ in untyped.schema.paths)
+    # typed paths compare (and hash) like the untyped ones, in both directions
+    assert untyped.schema.paths == paths
+    assert paths == untyped.schema.paths
+    assert {hash(_) for _ in untyped.schema.paths} == {hash(_) for _ in paths}
+    assert [_["active"] for _ in resolve(untyped)] == [["True"], ["False"]]
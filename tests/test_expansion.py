@@ -0,0 +1,117 @@
+"""test alias expansion limits and alias references"""
+
+import json
+from time import perf_counter
+
+import pytest
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml.convert import PARSE_MODE, convert_text
+from cmem_plugin_yaml.expansion import ExpansionPolicy
+from cmem_plugin_yaml.loader import LOADER
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests.utils import LocalExecutionContext
+
+LAUGHS = "\n".join(
+    [
+        'a: &a ["lol", "lol", "lol", "lol", "lol", "lol", "lol", "lol", "lol"]',
+        *(
+            f"{level}: &{level} [{', '.join([f'*{previous}'] * 9)}]"
+            for previous, level in zip("abcdefgh", "bcdefghi", strict=True)
+        ),
+    ]
+)
+"""a billion laughs: 3 KB of YAML expanding to 9^9 strings"""
+
+ALIASES = """
+defaults: &defaults {timeout: 10, retries: [1, 2]}
+first: *defaults
+second: {settings: *defaults, "a/b~c": &list [1, 2]}
+third: *list
+"""
+
+
+def convert(yaml_code: str, parse_mode: str = PARSE_MODE.document, **limits: float) -> str:
+    """Convert YAML with an expansion policy"""
+    expansion = ExpansionPolicy(**limits)  # type: ignore[arg-type]
+    return next(convert_text(yaml_code, parse_mode=parse_mode, expansion=expansion))
+
+
+@pytest.mark.parametrize(
+    ("limits", "message"),
+    [
+        ({"nodes": 1_000_000}, "more than 1000000 nodes"),
+        ({"size": 1024 * 1024}, "more than 1048576 bytes"),
+        ({"depth": 5}, "deeper than 5 levels"),
+    ],
+)
+def test_laughs(limits: dict, message: str) -> None:
+    """Test that expansion limits abort the conversion of a billion laughs"""
+    with pytest.raises(ValueError, match=message):
+        convert(LAUGHS, **limits)
+
+
+def test_limits() -> None:
+    """Test limits on documents within the limits and in the stream mode"""
+    yaml_code = "a: [1, [2, [3]]]\nb: text"
+    expected = json.dumps({"a": [1, [2, [3]]], "b": "text"})
+    for parse_mode in (PARSE_MODE.document, PARSE_MODE.stream):
+        assert convert(yaml_code, parse_mode, nodes=10, size=60, depth=5) == expected
+        with pytest.raises(ValueError, match="more than 9 nodes"):
+            convert(yaml_code, parse_mode, nodes=9)
+        with pytest.raises(ValueError, match="deeper than 4 levels"):
+            convert(yaml_code, parse_mode, depth=4)
+        with pytest.raises(ValueError, match="more than 20 bytes"):
+            convert(yaml_code, parse_mode, size=20)
+    with pytest.raises(ValueError, match="parse time limit"):
+        convert("[" + "1, " * 10_000 + "1]", PARSE_MODE.stream, seconds=1e-9)
+    with pytest.raises(ValueError, match="parse time limit"):
+        convert(LAUGHS, seconds=1e-9)
+
+
+@pytest.mark.parametrize("loader", [LOADER.auto, LOADER.python])
+def test_time_limit(loader: str) -> None:
+    """Test that a slow parse of a single document is aborted close to the time limit"""
+    yaml_code = "items:\n" + "  - {id: 1, name: item, tags: [a, b, c]}\n" * 100_000
+    start = perf_counter()
+    with pytest.raises(ValueError, match="parse time limit"):
+        next(convert_text(yaml_code, loader=loader, expansion=ExpansionPolicy(seconds=0.2)))
+    assert perf_counter() - start < 1
+
+
+def test_references() -> None:
+    """Test that aliased collections are written as JSON references"""
+    assert json.loads(convert(ALIASES, references=True)) == {
+        "defaults": {"timeout": 10, "retries": [1, 2]},
+        "first": {"$ref": "#/defaults"},
+        "second": {"settings": {"$ref": "#/defaults"}, "a/b~c": [1, 2]},
+        "third": {"$ref": "#/second/a~1b~0c"},
+    }
+    assert json.loads(convert("&a [1, *a]", references=True)) == [1, {"$ref": "#"}]
+    # with references, the laughs are small
+    laughs = json.loads(convert(LAUGHS, nodes=1000, references=True))
+    assert laughs["i"] == [{"$ref": "#/h"}] * 9
+
+
+def test_plugin_limits(local_context: LocalExecutionContext) -> None:
+    """Test expansion options of the plugin"""
+    with pytest.raises(ValueError, match="can not be negative"):
+        ParseYaml(nesting_depth_limit=-1)
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.entities,
+        source_code=YamlCode(LAUGHS),
+        expansion_node_limit=1_000_000,
+    )
+    with pytest.raises(ValueError, match="expanded node limit"):
+        plugin.execute([], local_context)
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(ALIASES),
+        alias_references=True,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    document = json.loads(next(output.entities).values[0][0])
+    assert document["first"] == {"$ref": "#/defaults"}
@@ -0,0 +1,140 @@
+"""test parsing multiple project files matching a pattern"""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from cmem_plugin_yaml import download
+from cmem_plugin_yaml.download import ResourceDownloader
+from cmem_plugin_yaml.parse import FILES_OUTPUT, OUTPUT_FORMAT, SOURCE, TARGET, ParseYaml
+from tests.utils import LocalExecutionContext
+
+FILES = {
+    "configs/a.yaml": "name: a\nitems: [1, 2]\n",
+    "configs/b.yaml": "name: b\n",
+    "configs/nested/c.yaml": "name: c\n",
+    "other/d.yaml": "name: d\n",
+}
+
+
+class FakeSession:
+    """Serve the project files and count concurrent requests"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def get(self, uri: str, **_: object) -> Iterator[MagicMock]:
+        """Get a project file after a short delay"""
+        name = parse_qs(urlparse(uri).query)["path"][0]
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        content = FILES[name].encode("utf-8")
+        yield MagicMock(iter_content=lambda chunk_size: [content])  # noqa: ARG005
+
+
+@pytest.fixture
+def fake_session(monkeypatch: pytest.MonkeyPatch) -> FakeSession:
+    """Serve the project files without a CMEM instance"""
+    session = FakeSession()
+    monkeypatch.setattr(requests.Session, "get", lambda _, uri, **__: session.get(uri))
+    monkeypatch.setattr(
+        download, "get_resources", lambda _: [{"fullPath": name} for name in reversed(FILES)]
+    )
+    return session
+
+
+def test_download_all(local_context: LocalExecutionContext, fake_session: FakeSession) -> None:
+    """Test that files are downloaded concurrently and provided in order"""
+    assert local_context is not None
+    names = [f"configs/{_}.yaml" for _ in "ab"] * 4
+    with ResourceDownloader("project", workers=4) as downloader:
+        assert downloader.session.headers["Authorization"] == "Bearer local-token"
+        downloaded = list(downloader.download_all(names))
+    assert [name for name, _ in downloaded] == names
+    assert downloaded[1][1] == b"name: b\n"
+    assert fake_session.max_active > 1
+    assert download.match_resources("project", "configs/*.yaml") == [
+        "configs/a.yaml",
+        "configs/b.yaml",
+    ]
+    assert len(download.match_resources("project", "**/*.yaml")) == len(FILES)
+
+
+def test_files(local_context: LocalExecutionContext, fake_session: FakeSession) -> None:
+    """Test the outputs of multiple files"""
+    assert fake_session is not None
+    plugin = ParseYaml(
+        source_mode=SOURCE.files,
+        target_mode=TARGET.json_entities,
+        source_pattern="configs/**/*.yaml",
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    entities = list(output.entities)
+    assert [_.uri for _ in entities] == [
+        "urn:x-json:file:configs/a.yaml",
+        "urn:x-json:file:configs/b.yaml",
+        "urn:x-json:file:configs/nested/c.yaml",
+    ]
+    assert json.loads(entities[0].values[0][0]) == {"name": "a", "items": [1, 2]}
+
+    plugin = ParseYaml(
+        source_mode=SOURCE.files,
+        target_mode=TARGET.json_entities,
+        source_pattern="configs/*.yaml",
+        files_output=FILES_OUTPUT.object,
+        multi_document=True,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    assert json.loads(next(output.entities).values[0][0]) == {
+        "configs/a.yaml": [{"name": "a", "items": [1, 2]}],
+        "configs/b.yaml": [{"name": "b"}],
+    }
+    report = local_context.report.last
+    assert report is not None
+    assert ("Source files", "2") in report.summary
+
+    plugin = ParseYaml(
+        source_mode=SOURCE.files,
+        target_mode=TARGET.entities,
+        source_pattern="*/*.yaml",
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    name = [_.path for _ in output.schema.paths].index("name")
+    assert [_.values[name] for _ in output.entities] == [["a"], ["b"], ["d"]]
+
+
+def test_files_errors(local_context: LocalExecutionContext, fake_session: FakeSession) -> None:
+    """Test bad options and patterns"""
+    assert fake_session is not None
+    with pytest.raises(ValueError, match="you need to enter a file pattern"):
+        ParseYaml(source_mode=SOURCE.files)
+    with pytest.raises(ValueError, match="can not be written as JSON Lines"):
+        ParseYaml(
+            source_mode=SOURCE.files,
+            target_mode=TARGET.json_entities,
+            source_pattern="*.yaml",
+            files_output=FILES_OUTPUT.object,
+            output_format=OUTPUT_FORMAT.jsonl,
+        )
+    plugin = ParseYaml(
+        source_mode=SOURCE.files, target_mode=TARGET.entities, source_pattern="*.json"
+    )
+    with pytest.raises(ValueError, match="No project file matches"):
+        plugin.execute([], local_context)
@@ -0,0 +1,147 @@
+"""test incremental conversion by top-level sections"""
+
+import itertools
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import yaml
+
+from cmem_plugin_yaml import parse
+from cmem_plugin_yaml.incremental import check_keys, split_sections
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_split_sections() -> None:
+    """Test splitting YAML into top-level sections"""
+    assert split_sections("# header\na: 1\n# about b\nb:\n- 1\n-   2\n\nc: {d: 1}\n") == (
+        "mapping",
+        ["a: 1\n# about b\n", "b:\n- 1\n-   2\n\n", "c: {d: 1}\n"],
+    )
+    assert split_sections("- a\n- b: 1\n  c: 2\n") == ("sequence", ["- a\n", "- b: 1\n  c: 2\n"])
+    for yaml_code in ("{a: 1}", "- a\nb: 1", "&a\nb: 1", "a: 1\n---\nb: 2", "  a: 1", ""):
+        assert split_sections(yaml_code) is None
+    # merge keys can override keys of other sections
+    assert split_sections("a: 1\n<<: {c: 3, a: 2}\n") is None
+    assert split_sections("a: 1\n<< : {c: 3}\n") is None
+    check_keys(['"a": 1', '"b": {"a": 2}'])
+    with pytest.raises(ValueError, match="Duplicate top-level key: a"):
+        check_keys(['"b": 1', '"c": 3, "a": 2', '"a": 1'])
+
+
+def test_incremental(
+    local_context: LocalExecutionContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that only changed sections are converted and provided as entities
+
+    Each task and target mode has its own last run, also with a shared cache directory.
+    """
+    versions = [
+        "- {name: a}\n- {name: b}\n",
+        "- {name: a}\n- {name: b}\n- {name: c}\n",
+        "- {name: a}\n- {name: B}\n- {name: c}\n",
+        "- {name: a}\n- {name: B}\n- {name: c}\n- {name: a}\n",  # a repeated section
+        "- &a {name: a}\n- *a\n",  # aliases between sections
+    ]
+    metadata: dict = {}
+
+    @contextmanager
+    def get_resource_response(*_: str) -> Iterator[MagicMock]:
+        yaml_code = versions[metadata["modified"]].encode("utf-8")
+        yield MagicMock(iter_content=lambda chunk_size: [yaml_code])  # noqa: ARG005
+
+    monkeypatch.setattr(parse, "get_resource_metadata", lambda *_: metadata)
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    expected = [
+        (["a", "b"], ("Sections changed", "2 of 2")),
+        (["c"], ("Sections changed", "1 of 3")),
+        (["B"], ("Sections changed", "1 of 3")),
+        (["a"], ("Sections changed", "1 of 4")),
+        (["a", "a"], ("Incremental conversion", "not possible for this document")),
+    ]
+    contexts = [local_context, LocalExecutionContext(task_id="otherTask")]
+    for version, (names, summary) in enumerate(expected):
+        metadata["modified"] = version
+        for context, target_mode in itertools.product(
+            contexts, (TARGET.entities, TARGET.json_entities)
+        ):
+            plugin = ParseYaml(
+                source_mode=SOURCE.file,
+                target_mode=target_mode,
+                source_file="items.yml",
+                cache_dir=str(tmp_path),
+                incremental=True,
+            )
+            output = plugin.execute([], context)
+            assert output is not None
+            report = context.report.last
+            assert report is not None
+            assert summary in report.summary
+            if target_mode == TARGET.entities:
+                assert [_.values[0][0] for _ in output.entities] == names
+            else:
+                json_code = next(output.entities).values[0][0]
+                assert json_code == json.dumps(yaml.safe_load(versions[version]))
+
+
+def test_incremental_failed_output(
+    local_context: LocalExecutionContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that sections are only recorded, after their output was provided"""
+
+    @contextmanager
+    def get_resource_response(*_: str) -> Iterator[MagicMock]:
+        yield MagicMock(iter_content=lambda chunk_size: [b"- {name: a}\n- {name: b}\n"])  # noqa: ARG005
+
+    monkeypatch.setattr(parse, "get_resource_metadata", lambda *_: {})
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    plugin = ParseYaml(
+        source_mode=SOURCE.file,
+        target_mode=TARGET.entities,
+        source_file="items.yml",
+        cache_dir=str(tmp_path),
+        incremental=True,
+    )
+    with monkeypatch.context() as failing:
+        failing.setattr(plugin, "_provide_data_entities", MagicMock(side_effect=OSError))
+        with pytest.raises(OSError):  # noqa: PT011
+            plugin.execute([], local_context)
+    assert plugin.execute([], local_context) is not None
+    assert local_context.report.last is not None
+    assert ("Sections changed", "2 of 2") in local_context.report.last.summary
+
+
+def test_incremental_same_json(
+    local_context: LocalExecutionContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that spliced sections result in the same JSON as the complete document"""
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_bytes()
+
+    @contextmanager
+    def get_resource_response(*_: str) -> Iterator[MagicMock]:
+        yield MagicMock(iter_content=lambda chunk_size: [yaml_code])  # noqa: ARG005
+
+    monkeypatch.setattr(parse, "get_resource_metadata", lambda *_: {})
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    outputs = []
+    for incremental, compact_json in ((False, False), (True, False), (True, True)):
+        plugin = ParseYaml(
+            source_mode=SOURCE.file,
+            target_mode=TARGET.json_entities,
+            source_file="test.yml",
+            cache_dir=str(tmp_path),
+            incremental=incremental,
+            compact_json=compact_json,
+        )
+        output = plugin.execute([], local_context)
+        assert output is not None
+        outputs.append(next(output.entities).values[0][0])
+    assert outputs[0] == outputs[1]
+    assert json.loads(outputs[2]) == json.loads(outputs[0])
+    with pytest.raises(ValueError, match="result cache directory"):
+        ParseYaml(source_mode=SOURCE.file, source_file="test.yml", incremental=True)
@@ -0,0 +1,46 @@
+"""test lazily imported modules"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from cmem_plugin_yaml.lazy import lazy_import
+
+HEAVY_MODULES = [
+    "cmem_plugin_base.dataintegration.utils.entity_builder",
+    "concurrent.futures.process",
+    "multiprocessing",
+    "yaml.composer",
+]
+
+DISCOVERY_CODE = f"""
+import json, sys
+from cmem_plugin_base.dataintegration.discovery import import_modules
+
+plugins = import_modules("cmem_plugin_yaml")
+print(json.dumps([len(plugins), [_ for _ in {HEAVY_MODULES!r} if _ in sys.modules]]))
+"""
+
+
+def test_lazy_import(capsys: pytest.CaptureFixture) -> None:
+    """Test that a lazy module is executed on the first attribute access"""
+    assert lazy_import("json") is json
+    sys.modules.pop("this", None)
+    this = lazy_import("this")  # prints the Zen of Python, when it is executed
+    assert not capsys.readouterr().out
+    assert this.s
+    assert "Beautiful is better than ugly." in capsys.readouterr().out
+    with pytest.raises(ModuleNotFoundError, match="no_such_module"):
+        lazy_import("no_such_module")
+
+
+def test_discovery_imports() -> None:
+    """Test that the plugin discovery does not import the heavy modules"""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", DISCOVERY_CODE], capture_output=True, check=True, text=True
+    )
+    plugins, imported = json.loads(result.stdout)
+    assert plugins == 1
+    assert imported == []
@@ -0,0 +1,34 @@
+"""test loader selection"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from cmem_plugin_yaml.loader import LOADER, libyaml_available, resolve_loader
+from cmem_plugin_yaml.parse import ParseYaml
+from tests import FIXTURE_DIR
+
+needs_libyaml = pytest.mark.skipif(not libyaml_available(), reason="Needs PyYAML with libyaml")
+
+
+def test_resolve_loader() -> None:
+    """Test resolving of loader options"""
+    assert resolve_loader(LOADER.python) == LOADER.python
+    expected = LOADER.c if libyaml_available() else LOADER.python
+    assert resolve_loader(LOADER.auto) == expected
+    with pytest.raises(ValueError, match="Unknown YAML loader"):
+        resolve_loader("not-there")
+    with pytest.raises(ValueError, match="Unknown YAML loader"):
+        ParseYaml(yaml_loader="not-there")
+
+
+@needs_libyaml
+def test_loaders_produce_same_json() -> None:
+    """Test that the C and the Python loader produce the same JSON"""
+    results = []
+    for loader in (LOADER.c, LOADER.python):
+        json_file = ParseYaml.yaml2json(Path(f"{FIXTURE_DIR}/test.yml"), loader=loader)
+        with Path.open(json_file, encoding="utf-8") as reader:
+            results.append(json.load(reader))
+    assert results[0] == results[1]
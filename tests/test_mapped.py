@@ -0,0 +1,62 @@
+"""test memory-mapped input"""
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml.convert import load_documents, split_documents
+from cmem_plugin_yaml.loader import LOADER
+from cmem_plugin_yaml.mapped import MappedFile, is_mapped, open_yaml_file
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_mapped_file(tmp_path: Path) -> None:
+    """Test that the loaders and the document splitter read a memory-mapped file"""
+    yaml_file = tmp_path / "documents.yml"
+    yaml_file.write_text("a: ä\n---\nb: [1, 2]\n", encoding="utf-8")
+    assert not is_mapped(yaml_file.stat().st_size, threshold=0)
+    for loader in (LOADER.c, LOADER.python):
+        with open_yaml_file(yaml_file, threshold=1) as yaml_reader:
+            assert isinstance(yaml_reader, MappedFile)
+            assert list(load_documents(yaml_reader, loader=loader)) == [{"a": "ä"}, {"b": [1, 2]}]
+    with open_yaml_file(yaml_file, threshold=1) as yaml_reader:
+        assert list(split_documents(yaml_reader)) == ["a: ä\n", "---\nb: [1, 2]\n"]
+
+
+@pytest.mark.parametrize("multi_document", [False, True])
+def test_yaml2json_mapped(multi_document: bool) -> None:
+    """Test that memory-mapped files are converted like text files"""
+    yaml_file = Path(f"{FIXTURE_DIR}/test.yml")
+    text_file = ParseYaml.yaml2json(yaml_file, multi_document=multi_document, mmap_threshold=0)
+    mapped_file = ParseYaml.yaml2json(yaml_file, multi_document=multi_document, mmap_threshold=1)
+    assert mapped_file.read_text(encoding="utf-8") == text_file.read_text(encoding="utf-8")
+
+
+def test_plugin_mapped(local_context: LocalExecutionContext, tmp_path: Path) -> None:
+    """Test that large input in a temporary file is memory-mapped"""
+    with pytest.raises(ValueError, match="can not be negative"):
+        ParseYaml(mmap_threshold=-1)
+    assert ParseYaml().mmap_threshold == 0, "memory-mapping is opt-in"
+    data = {"text": "ä" * 1024 * 1024}
+    yaml_code = yaml.safe_dump(data, allow_unicode=True)
+    assert len(yaml_code.encode()) > 1024 * 1024
+    for mmap_threshold, expected in ((1, [("Memory-mapped input", "yes")]), (0, [])):
+        plugin = ParseYaml(
+            source_mode=SOURCE.code,
+            target_mode=TARGET.json_entities,
+            source_code=YamlCode(yaml_code),
+            spill_threshold=0,
+            mmap_threshold=mmap_threshold,
+            scratch_dir=str(tmp_path),
+        )
+        output = plugin.execute([], local_context)
+        assert output is not None
+        assert json.loads(next(output.entities).values[0][0]) == data
+        report = local_context.report.last
+        assert report is not None
+        assert [_ for _ in report.summary if _[0] == "Memory-mapped input"] == expected
@@ -0,0 +1,87 @@
+"""test per-phase metrics"""
+
+import importlib.metadata
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml import metrics
+from cmem_plugin_yaml.metrics import ExecutionMetrics
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_nested_phases() -> None:
+    """Test that nested phases and timed iterators are not counted for the outer phase"""
+    execution_metrics = ExecutionMetrics(trace_memory=True)
+
+    def produce() -> Iterator[int]:
+        for item in (1, 2):
+            time.sleep(0.02)  # while the item is produced by the timed iterator
+            yield item
+
+    start = time.perf_counter()
+    with execution_metrics, execution_metrics.phase("outer") as outer:
+        outer.bytes_in += 10
+        time.sleep(0.1)
+        items = list(execution_metrics.timed("inner", produce()))
+        with execution_metrics.phase("inner"):
+            time.sleep(0.02)
+        execution_metrics.count("inner", bytes_out=5)
+    elapsed = time.perf_counter() - start
+    assert items == [1, 2]
+    phases = execution_metrics.phases
+    assert phases["outer"].seconds >= 0.1  # noqa: PLR2004
+    assert phases["inner"].seconds >= 0.06  # noqa: PLR2004
+    # each moment is accounted to one phase only
+    assert phases["outer"].seconds + phases["inner"].seconds <= elapsed
+    assert phases["outer"].peak_bytes is not None
+    assert [_["phase"] for _ in execution_metrics.records()] == ["outer", "inner"]
+    assert execution_metrics.summary()[0] == ("Phase outer", phases["outer"].describe())
+    assert "10 B in" in phases["outer"].describe()
+    assert "5 B out" in phases["inner"].describe()
+
+
+@pytest.mark.parametrize("trace_memory", [False, True])
+def test_metrics_report(
+    local_context: LocalExecutionContext, monkeypatch: pytest.MonkeyPatch, trace_memory: bool
+) -> None:
+    """Test that phases are reported and exported to the metrics hooks"""
+    monkeypatch.setattr(metrics, "METRICS_HOOKS", [])
+    broken = MagicMock()
+    broken.name = "broken"
+    broken.load.side_effect = ImportError("no module named collector")
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: [broken])  # noqa: ARG005
+    metrics._entry_point_hooks.cache_clear()  # noqa: SLF001
+    exported: list[list[dict]] = []
+    metrics.add_metrics_hook(exported.append)
+
+    def failing_hook(_: list[dict]) -> None:
+        raise RuntimeError("collector not available")
+
+    metrics.add_metrics_hook(failing_hook)  # a failing hook does not fail the execution
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_text(encoding="utf-8")
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(yaml_code),
+        trace_memory=trace_memory,
+    )
+    for _ in range(2):
+        plugin.execute([], local_context)
+    metrics._entry_point_hooks.cache_clear()  # noqa: SLF001
+    assert broken.load.call_count == 1  # entry points are loaded once
+    report = local_context.report.last
+    assert report is not None
+    summary = dict(report.summary)
+    assert ("peak memory" in summary["Phase parse"]) == trace_memory
+    records = {_["phase"]: _ for _ in exported[0]}
+    assert list(records) == ["input", "parse", "serialize", "output"]
+    assert records["input"]["bytes_out"] == len(yaml_code.encode("utf-8"))
+    assert records["parse"]["bytes_in"] == records["input"]["bytes_out"]
+    assert records["output"]["bytes_in"] == records["serialize"]["bytes_out"]
@@ -0,0 +1,65 @@
+"""test parallel parsing"""
+
+import concurrent.futures
+import io
+from pathlib import Path
+
+import pytest
+import yaml
+
+from cmem_plugin_yaml import parallel
+from cmem_plugin_yaml.convert import PARSE_MODE, convert_texts, split_documents
+from cmem_plugin_yaml.parse import ParseYaml
+from tests import FIXTURE_DIR
+
+SPLIT_YAML = """# leading comment
+a: 1
+---
+b: |
+  block scalar with a --- inside
+--- {c: 3}
+...
+%YAML 1.1
+---
+d: 4
+---
+"""
+
+
+def test_split_documents() -> None:
+    """Test splitting of YAML streams into document texts"""
+    texts = list(split_documents(io.StringIO(SPLIT_YAML)))
+    assert [yaml.safe_load(_) for _ in texts] == [
+        {"a": 1},
+        {"b": "block scalar with a --- inside\n"},
+        {"c": 3},
+        {"d": 4},
+        None,
+    ]
+
+
+@pytest.mark.parametrize("pool_min_bytes", [0, parallel.POOL_MIN_BYTES])
+def test_convert_texts(monkeypatch: pytest.MonkeyPatch, pool_min_bytes: int) -> None:
+    """Test that parallel conversion keeps the order (with and without a pool)"""
+    monkeypatch.setattr(parallel, "POOL_MIN_BYTES", pool_min_bytes)
+    texts = [f"number: {_}\nitems: [{_}, {_ + 1}]" for _ in range(50)]
+    expected = [[f'{{"number": {_}, "items": [{_}, {_ + 1}]}}'] for _ in range(50)]
+    results = convert_texts(texts, parse_mode=PARSE_MODE.stream, workers=2, chunk_size=4)
+    assert list(results) == expected
+
+
+def test_small_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that many small texts (which fill the windows) never start a pool"""
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", None)
+    texts = [f"a: {_}" for _ in range(64)]
+    results = convert_texts(texts, parse_mode=PARSE_MODE.stream, workers=2, chunk_size=4)
+    assert list(results) == [[f'{{"a": {_}}}'] for _ in range(64)]
+
+
+def test_parallel_multi_document(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test multi document files in a process pool"""
+    monkeypatch.setattr(parallel, "POOL_MIN_BYTES", 0)
+    yaml_file = Path(f"{FIXTURE_DIR}/multi-document.yml")
+    serial = ParseYaml.yaml2json(yaml_file, multi_document=True)
+    pooled = ParseYaml.yaml2json(yaml_file, multi_document=True, workers=2, chunk_size=1)
+    assert pooled.read_text(encoding="utf-8") == serial.read_text(encoding="utf-8")
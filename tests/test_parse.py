@@ -1,12 +1,18 @@
 """test parse plugin"""
 
 import json
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
+import yaml
+from cmem_plugin_base.dataintegration.entity import Entities, Entity, EntityPath, EntitySchema
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
 
-from cmem_plugin_yaml.parse import ParseYaml
+from cmem_plugin_yaml.parse import OUTPUT_FORMAT, PARSE_MODE, SOURCE, TARGET, ParseYaml
 from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
 
 
 def test_success() -> None:
@@ -19,9 +25,163 @@ def test_success() -> None:
     assert len(parsed_json["tasks"]) == number_of_tasks
 
 
-def test_fail() -> None:
-    """Test failing executions"""
+def test_fail(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test failing executions (which leave no files)"""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
     with pytest.raises(TypeError):
         ParseYaml.yaml2json(Path(f"{FIXTURE_DIR}/will-be-str.yml"))
     with pytest.raises(TypeError):
         ParseYaml.yaml2json(Path(f"{FIXTURE_DIR}/will-be-int.yml"))
+    assert list(tmp_path.iterdir()) == []
+    json_file = ParseYaml.yaml2json(Path(f"{FIXTURE_DIR}/test.yml"))
+    assert list(tmp_path.iterdir()) == [json_file]
+
+
+@pytest.mark.parametrize("parse_mode", [PARSE_MODE.document, PARSE_MODE.stream])
+def test_multi_document(parse_mode: str, tmp_path: Path) -> None:
+    """Test multi document streams"""
+    yaml_file = Path(f"{FIXTURE_DIR}/multi-document.yml")
+    with Path.open(yaml_file, encoding="utf-8") as reader:
+        expected = [_ for _ in yaml.safe_load_all(reader) if _ is not None]
+    json_file = ParseYaml.yaml2json(yaml_file, parse_mode=parse_mode, multi_document=True)
+    assert json_file.read_text(encoding="utf-8") == json.dumps(expected)
+    json_file.unlink()
+    jsonl_file = ParseYaml.yaml2json(
+        yaml_file,
+        parse_mode=parse_mode,
+        multi_document=True,
+        output_format=OUTPUT_FORMAT.jsonl,
+    )
+    lines = jsonl_file.read_text(encoding="utf-8").splitlines()
+    jsonl_file.unlink()
+    assert [json.loads(_) for _ in lines] == expected
+
+    # documents are converted lazily: the first one is available before the broken one
+    broken_file = tmp_path / "broken.yml"
+    broken_file.write_text("a: 1\n---\nb: [\n", encoding="utf-8")
+    documents = ParseYaml.yaml2json_documents(broken_file, parse_mode=parse_mode)
+    assert next(documents) == '{"a": 1}'
+    with pytest.raises(yaml.YAMLError):
+        next(documents)
+
+
+def test_multi_document_execution(local_context: LocalExecutionContext) -> None:
+    """Test multi document streams as JSON entities and as entities"""
+    yaml_code = Path(f"{FIXTURE_DIR}/multi-document.yml").read_text(encoding="utf-8")
+    number_of_documents = 3
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(yaml_code),
+        multi_document=True,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    entities = list(output.entities)
+    assert len(entities) == number_of_documents
+    assert json.loads(entities[1].values[0][0])["kind"] == "ConfigMap"
+    report = local_context.report.last
+    assert report is not None
+    assert report.entity_count == number_of_documents
+
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.entities,
+        source_code=YamlCode(yaml_code),
+        multi_document=True,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    assert len(list(output.entities)) == number_of_documents
+
+
+@pytest.mark.parametrize("parse_mode", [PARSE_MODE.document, PARSE_MODE.stream])
+def test_json_lines_records(
+    local_context: LocalExecutionContext, parse_mode: str, tmp_path: Path
+) -> None:
+    """Test JSON Lines with one record per item of a root sequence"""
+    yaml_file = tmp_path / "items.yml"
+    yaml_file.write_text("- a\n- {b: [1, 2]}\n- [c, {d: null}]\n", encoding="utf-8")
+    expected = ['"a"', '{"b": [1, 2]}', '["c", {"d": null}]']
+    jsonl_file = ParseYaml.yaml2json(
+        yaml_file, parse_mode=parse_mode, output_format=OUTPUT_FORMAT.jsonl
+    )
+    assert jsonl_file.read_text(encoding="utf-8").splitlines() == expected
+    jsonl_file.unlink()
+    yaml_file.write_text("a: [1, 2]\n", encoding="utf-8")
+    jsonl_file = ParseYaml.yaml2json(
+        yaml_file, parse_mode=parse_mode, output_format=OUTPUT_FORMAT.jsonl
+    )
+    assert jsonl_file.read_text(encoding="utf-8") == '{"a": [1, 2]}\n'
+    jsonl_file.unlink()
+
+    # streamed records are converted lazily: the first one is available before the broken one
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode("- a: 1\n- b: [\n"),
+        parse_mode=parse_mode,
+        output_format=OUTPUT_FORMAT.jsonl,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    if parse_mode == PARSE_MODE.stream:
+        first = next(output.entities)
+        assert (first.uri, first.values) == ("urn:x-json:source-1", [['{"a": 1}']])
+    with pytest.raises(yaml.YAMLError):
+        next(output.entities)
+
+
+def test_batch_entities(local_context: LocalExecutionContext) -> None:
+    """Test parsing all values of all input entities"""
+    schema = EntitySchema(type_uri="urn:x-yaml:document", paths=[EntityPath(path="text")])
+
+    def input_entities() -> Iterator[Entity]:
+        yield Entity(uri="urn:x-test:1", values=[["a: 1"]])
+        yield Entity(uri="urn:x-test:2", values=[["b: 2", "c: 3"]])
+        raise AssertionError("input entities are consumed lazily")
+
+    plugin = ParseYaml(
+        source_mode=SOURCE.entities,
+        target_mode=TARGET.json_entities,
+        batch_entities=True,
+    )
+    output = plugin.execute([Entities(entities=input_entities(), schema=schema)], local_context)
+    assert output is not None
+    entities = [next(output.entities) for _ in range(3)]
+    assert [_.uri for _ in entities] == ["urn:x-test:1", "urn:x-test:2-1", "urn:x-test:2-2"]
+    assert [_.values[0][0] for _ in entities] == ['{"a": 1}', '{"b": 2}', '{"c": 3}']
+
+    plugin = ParseYaml(
+        source_mode=SOURCE.entities,
+        target_mode=TARGET.entities,
+        batch_entities=True,
+    )
+    entities_input = Entities(
+        entities=iter([Entity(uri="urn:x-test:1", values=[["a: 1", "a: 2"]])]), schema=schema
+    )
+    output = plugin.execute([entities_input], local_context)
+    assert output is not None
+    assert [_.values[0][0] for _ in output.entities] == ["1", "2"]
+
+
+@pytest.mark.parametrize("spill_threshold", [0, 16])
+@pytest.mark.parametrize("target_mode", [TARGET.json_entities, TARGET.entities])
+def test_spill_threshold(
+    local_context: LocalExecutionContext, spill_threshold: int, target_mode: str
+) -> None:
+    """Test that in-memory buffers and temporary files produce the same output"""
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_text(encoding="utf-8")
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=target_mode,
+        source_code=YamlCode(yaml_code),
+        spill_threshold=spill_threshold,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    values = next(output.entities).values
+    if target_mode == TARGET.json_entities:
+        assert json.loads(values[0][0]) == yaml.safe_load(yaml_code)
+    else:
+        assert values[0][0] == "apps/v1"
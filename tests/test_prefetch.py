@@ -0,0 +1,84 @@
+"""test prefetched input"""
+
+import json
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import yaml
+
+from cmem_plugin_yaml import parse
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from cmem_plugin_yaml.prefetch import prefetch
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_prefetch() -> None:
+    """Test that chunks are read while they are produced"""
+    first_read = threading.Event()
+
+    def chunks() -> Iterator[bytes]:
+        yield b"first "
+        # without a pipeline, the first chunk would not be read before the last one
+        assert first_read.wait(timeout=5)
+        yield b"last"
+
+    with prefetch(chunks) as reader:
+        assert reader.read(6) == b"first "
+        first_read.set()
+        assert reader.read() == b"last"
+
+
+def test_prefetch_errors() -> None:
+    """Test that errors of the producer are raised by the reader"""
+
+    def broken() -> Iterator[bytes]:
+        yield b"a: 1\n"
+        raise OSError("connection lost")
+
+    with prefetch(broken) as reader, pytest.raises(OSError, match="connection lost"):
+        reader.read()
+
+    def endless() -> Iterator[bytes]:
+        while True:
+            yield b"x" * 1024
+
+    # closing the reader early stops the producer
+    with prefetch(endless, max_chunks=2) as reader:
+        assert reader.read(10) == b"x" * 10
+    assert not [_ for _ in threading.enumerate() if _.name == "cmem-plugin-yaml-prefetch"]
+
+
+def test_plugin_prefetch(
+    local_context: LocalExecutionContext, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test parsing a project file while it is downloaded"""
+    yaml_code = Path(f"{FIXTURE_DIR}/test.yml").read_bytes()
+
+    @contextmanager
+    def get_resource_response(*_: str) -> Iterator[MagicMock]:
+        def iter_content(chunk_size: int) -> Iterator[bytes]:
+            for start in range(0, len(yaml_code), chunk_size):
+                yield yaml_code[start : start + chunk_size]
+
+        yield MagicMock(iter_content=iter_content)
+
+    monkeypatch.setattr(parse, "get_resource_response", get_resource_response)
+    with pytest.raises(ValueError, match="can not be combined with a result cache"):
+        ParseYaml(source_mode=SOURCE.file, source_file="a.yml", prefetch_input=True, cache_dir=".")
+    plugin = ParseYaml(
+        source_mode=SOURCE.file,
+        target_mode=TARGET.json_entities,
+        source_file="test.yml",
+        prefetch_input=True,
+        download_chunk_size=1,
+    )
+    output = plugin.execute([], local_context)
+    assert output is not None
+    assert json.loads(next(output.entities).values[0][0]) == yaml.safe_load(yaml_code)
+    records = {_["phase"]: _ for _ in plugin.metrics.records()}
+    assert records["input"]["bytes_out"] == records["parse"]["bytes_in"] == len(yaml_code)
@@ -0,0 +1,106 @@
+"""test projection of YAML documents to selected subtrees"""
+
+import json
+
+import pytest
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml.convert import PARSE_MODE, convert_text
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from cmem_plugin_yaml.projection import Projection, parse_projection
+from tests.utils import LocalExecutionContext
+
+DOCUMENT = """
+created: 2024-01-01
+defaults: &defaults {timeout: 10, retries: 3}
+items: [{name: a, size: 1}, {name: b, size: 2}, {name: c, size: 3}]
+spec:
+  template: {settings: *defaults, name: x}
+  replicas: 2
+"""
+
+
+def project(paths: str, yaml_code: str = DOCUMENT, **options: str | bool) -> list:
+    """Convert YAML with a projection"""
+    projection = Projection(paths)
+    return [
+        json.loads(_)
+        for _ in convert_text(yaml_code, projection=projection, **options)  # type: ignore[arg-type]
+    ]
+
+
+def test_parse_projection() -> None:
+    """Test parsing projection paths"""
+    assert parse_projection("spec.template, $.paths['/users']\nitems[0].name") == [
+        ["spec", "template"],
+        ["paths", "/users"],
+        ["items", "0", "name"],
+    ]
+    assert parse_projection(' $ , a["b.c"].* ,') == [[], ["a", "b.c", "*"]]
+    assert Projection("").selection is None
+    assert Projection("a.b, a").selection == {"a": None}
+    with pytest.raises(ValueError, match="Invalid projection"):
+        Projection("a.b]")
+
+
+@pytest.mark.parametrize("parse_mode", [PARSE_MODE.document, PARSE_MODE.stream])
+def test_projection(parse_mode: str) -> None:
+    """Test that only selected subtrees are converted (skipped dates are not constructed)"""
+    assert project("spec.replicas", parse_mode=parse_mode) == [{"spec": {"replicas": 2}}]
+    assert project("items.1, items[2].name", parse_mode=parse_mode) == [
+        {"items": [{"name": "b", "size": 2}, {"name": "c"}]}
+    ]
+    assert project("items.*.size, unknown", parse_mode=parse_mode) == [
+        {"items": [{"size": 1}, {"size": 2}, {"size": 3}]}
+    ]
+    # the alias refers to an anchor outside of the selection
+    assert project("spec.template", parse_mode=parse_mode) == [
+        {"spec": {"template": {"settings": {"timeout": 10, "retries": 3}, "name": "x"}}}
+    ]
+    documents = "a: 1\nb: 2\n---\nb: 3\nc: 4\n"
+    assert project("b", documents, parse_mode=parse_mode, multi_document=True) == [
+        {"b": 2},
+        {"b": 3},
+    ]
+
+
+@pytest.mark.parametrize("parse_mode", [PARSE_MODE.document, PARSE_MODE.stream])
+def test_resolved_keys(parse_mode: str) -> None:
+    """Test that keys are selected by their JSON keys (like bool and int keys of YAML 1.1)"""
+    workflow = "on: push\nname: build\n"
+    assert project("true", workflow, parse_mode=parse_mode) == [{"true": "push"}]
+    assert project("yes, no", "yes: 1\nno: 2\nx: 3", parse_mode=parse_mode) == [{}]
+    assert project("true, false", "yes: 1\nno: 2\nx: 3", parse_mode=parse_mode) == [
+        {"true": 1, "false": 2}
+    ]
+    assert project("1, 16.a", "1: a\n0x10: {a: 1, b: 2}\nx: c", parse_mode=parse_mode) == [
+        {"1": "a", "16": {"a": 1}}
+    ]
+
+
+def test_merge_keys() -> None:
+    """Test that keys of merged mappings are projected"""
+    yaml_code = "base: &base {a: 1, b: 2}\nspec: {<<: *base, c: 3}"
+    assert project("spec.b, spec.c", yaml_code) == [{"spec": {"b": 2, "c": 3}}]
+    assert project("spec", yaml_code) == [{"spec": {"a": 1, "b": 2, "c": 3}}]
+    # items of merged (not projected) sequences are selected by their item number
+    yaml_code = "b: &b {x: [1, 2, 3]}\na: {<<: *b}"
+    assert project("a.x.1", yaml_code) == [{"a": {"x": [2]}}]
+    assert project("a.x.*, b.x.2", yaml_code) == [{"b": {"x": [3]}, "a": {"x": [3]}}]
+
+
+def test_plugin_projection(local_context: LocalExecutionContext) -> None:
+    """Test the projection option of the plugin"""
+    with pytest.raises(ValueError, match="Invalid projection"):
+        ParseYaml(projection="a[")
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.entities,
+        source_code=YamlCode(DOCUMENT),
+        projection="items.*.name",
+    )
+    entities = plugin.execute([], local_context)
+    assert entities is not None
+    assert [_.path for _ in entities.schema.paths] == ["items"]
+    assert entities.sub_entities is not None
+    assert [_.values for _ in entities.sub_entities[0].entities] == [[["a"]], [["b"]], [["c"]]]
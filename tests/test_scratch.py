@@ -0,0 +1,63 @@
+"""test scratch area"""
+
+from pathlib import Path
+
+import pytest
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml.parse import SOURCE, TARGET, ParseYaml
+from cmem_plugin_yaml.scratch import ScratchArea
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+def test_scratch_area(tmp_path: Path) -> None:
+    """Test bytes accounting and cleanup of a scratch area"""
+    base_dir = tmp_path / "scratch"
+    with ScratchArea(base_dir=str(base_dir)) as scratch:
+        with scratch.file(max_size=10) as in_memory:
+            in_memory.write("1234")
+        assert scratch.bytes_written == 0
+        with scratch.file(max_size=10) as spilled:
+            spilled.write("12345678901234567890")
+        with scratch.file(mode="w+b") as on_disk:
+            on_disk.write(b"12345")
+        assert scratch.bytes_written == 25  # noqa: PLR2004
+        assert Path(scratch.path).parent == base_dir
+    assert list(base_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("source_code", ["a: [1, 2", "just a string"])
+def test_scratch_cleanup_on_failure(
+    local_context: LocalExecutionContext, tmp_path: Path, source_code: str
+) -> None:
+    """Test that the scratch area is removed on failed executions"""
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(source_code),
+        spill_threshold=0,
+        scratch_dir=str(tmp_path),
+    )
+    with pytest.raises(Exception):  # noqa: B017, PT011
+        plugin.execute([], local_context)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_scratch_report(local_context: LocalExecutionContext, tmp_path: Path) -> None:
+    """Test that bytes written to the scratch area are reported"""
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_text(encoding="utf-8")
+    plugin = ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_entities,
+        source_code=YamlCode(yaml_code),
+        spill_threshold=0,
+        scratch_dir=str(tmp_path),
+    )
+    plugin.execute([], local_context)
+    report = local_context.report.last
+    assert report is not None
+    assert report.operation_desc == "JSON entity generated"
+    summary = dict(report.summary)
+    assert int(summary["Scratch bytes written"]) > len(yaml_code)
+    assert list(tmp_path.iterdir()) == []
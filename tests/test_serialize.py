@@ -0,0 +1,63 @@
+"""test JSON serializer selection"""
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from cmem_plugin_yaml.convert import OUTPUT_FORMAT, PARSE_MODE
+from cmem_plugin_yaml.parse import ParseYaml
+from cmem_plugin_yaml.serialize import SERIALIZER, orjson_available, resolve_serializer
+from tests import FIXTURE_DIR
+
+needs_orjson = pytest.mark.skipif(not orjson_available(), reason="Needs orjson")
+
+
+def test_resolve_serializer() -> None:
+    """Test serializer option resolution"""
+    assert resolve_serializer().backend == SERIALIZER.json
+    expected = SERIALIZER.orjson if orjson_available() else SERIALIZER.json
+    assert resolve_serializer(compact=True).backend == expected
+    with pytest.raises(ValueError, match="Unknown JSON serializer"):
+        resolve_serializer("ujson")
+    with pytest.raises(ValueError, match=r"only writes compact JSON|not installed"):
+        resolve_serializer(SERIALIZER.orjson)
+
+
+@pytest.mark.parametrize("parse_mode", list(PARSE_MODE.options))
+def test_default_output(parse_mode: str) -> None:
+    """Test that the default output is the one of json.dump"""
+    yaml_file = Path(f"{FIXTURE_DIR}/multi-document.yml")
+    documents = list(yaml.safe_load_all(yaml_file.read_text(encoding="utf-8")))
+    expected = json.dumps([_ for _ in documents if _ is not None])
+    json_file = ParseYaml.yaml2json(yaml_file, parse_mode=parse_mode, multi_document=True)
+    assert json_file.read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize("parse_mode", list(PARSE_MODE.options))
+def test_compact_output(parse_mode: str) -> None:
+    """Test that compact output has no spaces after separators"""
+    yaml_file = Path(f"{FIXTURE_DIR}/multi-document.yml")
+    documents = [
+        _ for _ in yaml.safe_load_all(yaml_file.read_text(encoding="utf-8")) if _ is not None
+    ]
+    json_file = ParseYaml.yaml2json(
+        yaml_file,
+        parse_mode=parse_mode,
+        multi_document=True,
+        output_format=OUTPUT_FORMAT.jsonl,
+        serializer=SERIALIZER.json,
+        compact=True,
+    )
+    lines = json_file.read_text(encoding="utf-8").splitlines()
+    assert lines == [json.dumps(_, separators=(",", ":")) for _ in documents]
+
+
+@needs_orjson
+def test_orjson_output() -> None:
+    """Test that orjson writes the same JSON values"""
+    yaml_file = Path(f"{FIXTURE_DIR}/test.yml")
+    json_file = ParseYaml.yaml2json(yaml_file, serializer=SERIALIZER.orjson, compact=True)
+    data = json.loads(json_file.read_text(encoding="utf-8"))
+    assert data == json.loads(json.dumps(yaml.safe_load(yaml_file.read_text(encoding="utf-8"))))
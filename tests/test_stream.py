@@ -0,0 +1,66 @@
+"""test streaming conversion"""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from cmem_plugin_yaml.loader import LOADER, libyaml_available
+from cmem_plugin_yaml.parse import PARSE_MODE, ParseYaml
+from cmem_plugin_yaml.stream import stream_yaml2json
+from tests import FIXTURE_DIR
+
+LOADERS = [LOADER.python, LOADER.c] if libyaml_available() else [LOADER.python]
+
+MIXED_YAML = """
+name: "Ümläut ✓"
+empty_map: {}
+empty_list: []
+numbers: [1, -2.5, .inf, 0x1F, 1_000]
+flags: {yes_no: yes, on: off, "null": ~}
+1: integer key
+2.5: float key
+false: bool key
+~: null key
+nested:
+  - a: [1, [2, [3, {}]]]
+  - "quoted \\"string\\""
+  - |
+    block
+    scalar
+"""
+
+
+def _stream(yaml_code: str, loader: str = LOADER.auto) -> str:
+    """Stream YAML code to JSON"""
+    with io.StringIO(yaml_code) as reader, io.StringIO() as writer:
+        stream_yaml2json(reader, writer, loader=loader)
+        return writer.getvalue()
+
+
+@pytest.mark.parametrize("loader", LOADERS)
+def test_identical_output(loader: str) -> None:
+    """Test that streaming produces the same JSON as the document parse mode"""
+    yaml_file = Path(f"{FIXTURE_DIR}/no-anchors.yml")
+    document_json = ParseYaml.yaml2json(yaml_file, loader=loader)
+    stream_json = ParseYaml.yaml2json(yaml_file, loader=loader, parse_mode=PARSE_MODE.stream)
+    assert stream_json.read_bytes() == document_json.read_bytes()
+    assert _stream(MIXED_YAML, loader=loader) == json.dumps(yaml.safe_load(MIXED_YAML))
+
+
+def test_unsupported() -> None:
+    """Test YAML content which can not be streamed"""
+    with pytest.raises(ValueError, match="Aliases are not supported"):
+        _stream("a: &anchor 1\nb: *anchor\n")
+    with pytest.raises(ValueError, match="Merge keys are not supported"):
+        _stream("a: {x: 1}\nb:\n  <<: {x: 2}\n")
+    with pytest.raises(TypeError, match="could not be parsed to a dict or list"):
+        _stream("just a string")
+    with pytest.raises(TypeError, match="could not be parsed to a dict or list"):
+        _stream("---")
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        _stream("date: 2024-01-01")
+    with pytest.raises(yaml.YAMLError, match="expected a single document"):
+        _stream("a: 1\n---\nb: 2\n")
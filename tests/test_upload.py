@@ -0,0 +1,96 @@
+"""test streamed upload"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+import pytest
+import yaml
+from cmem_plugin_base.dataintegration.parameter.code import YamlCode
+
+from cmem_plugin_yaml import upload
+from cmem_plugin_yaml.parse import OUTPUT_FORMAT, SOURCE, TARGET, ParseYaml
+from cmem_plugin_yaml.upload import upload_json
+from tests import FIXTURE_DIR
+from tests.utils import LocalExecutionContext
+
+
+class FakeRequest:
+    """Collect the body of an upload"""
+
+    def __init__(self) -> None:
+        self.body = b""
+
+    def __call__(self, uri: str, data: Iterator[bytes], **_: object) -> None:
+        """Consume the chunks of the body"""
+        assert uri.endswith("/json/file")
+        for chunk in data:
+            self.body += chunk
+
+
+def test_streamed_upload(
+    local_context: LocalExecutionContext, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a streamed upload sends the JSON"""
+    fake_request = FakeRequest()
+    monkeypatch.setattr(upload, "request", fake_request)
+    yaml_code = Path(f"{FIXTURE_DIR}/no-anchors.yml").read_text(encoding="utf-8")
+    ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_dataset,
+        source_code=YamlCode(yaml_code),
+        target_dataset="json",
+        streamed_upload=True,
+    ).execute([], local_context)
+    assert json.loads(fake_request.body) == yaml.safe_load(yaml_code)
+    report = local_context.report.last
+    assert report is not None
+    assert ("Bytes sent", str(len(fake_request.body))) in report.summary
+    assert "Upload throughput" in dict(report.summary)
+
+
+def test_streamed_json_lines(
+    local_context: LocalExecutionContext, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the items of a root sequence are uploaded as JSON Lines"""
+    fake_request = FakeRequest()
+    monkeypatch.setattr(upload, "request", fake_request)
+    ParseYaml(
+        source_mode=SOURCE.code,
+        target_mode=TARGET.json_dataset,
+        source_code=YamlCode("- {a: 1}\n- {a: 2}\n"),
+        target_dataset="json",
+        output_format=OUTPUT_FORMAT.jsonl,
+        streamed_upload=True,
+    ).execute([], local_context)
+    assert fake_request.body == b'{"a": 1}\n{"a": 2}\n'
+
+
+def test_failed_writer(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an error of the writer fails the upload"""
+    fake_request = FakeRequest()
+    monkeypatch.setattr(upload, "request", fake_request)
+
+    def write_json(json_writer: IO[str]) -> None:
+        json_writer.write("[1, ")
+        raise TypeError("no JSON")
+
+    with pytest.raises(TypeError, match="no JSON"):
+        upload_json(project_id="project", dataset_id="json", write_json=write_json)
+
+
+def test_failed_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a failed upload stops the writer"""
+
+    def request(data: Iterator[bytes], **_: object) -> None:
+        next(data)
+        raise ConnectionError("upload failed")
+
+    def write_json(json_writer: IO[str]) -> None:
+        for _ in range(100):
+            json_writer.write("x" * 1024 * 1024)
+
+    monkeypatch.setattr(upload, "request", lambda uri, **kwargs: request(**kwargs))  # noqa: ARG005
+    with pytest.raises(ConnectionError, match="upload failed"):
+        upload_json(project_id="project", dataset_id="json", write_json=write_json)
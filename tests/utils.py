@@ -13,6 +13,7 @@ from cmem.cmempy.api import get_token
 from cmem.cmempy.config import get_oauth_default_credentials
 from cmem_plugin_base.dataintegration.context import (
     ExecutionContext,
+    ExecutionReport,
     PluginContext,
     ReportContext,
     TaskContext,
@@ -75,3 +76,36 @@ class TestExecutionContext(ExecutionContext):
         self.report = ReportContext()
         self.task = TestTaskContext(project_id=project_id, task_id=task_id)
         self.user = TestUserContext()
+
+
+class LocalUserContext(UserContext):
+    """dummy user context with a static token, for tests without a CMEM instance"""
+
+    __test__ = False
+
+    def __init__(self):
+        self.token = lambda: "local-token"
+
+
+class LocalExecutionContext(ExecutionContext):
+    """dummy execution context for tests without a CMEM instance"""
+
+    __test__ = False
+
+    def __init__(self, project_id: str = PROJECT_NAME, task_id: str = "dummyTask"):
+        self.report: LocalReportContext = LocalReportContext()
+        self.task = TestTaskContext(project_id=project_id, task_id=task_id)
+        self.user = LocalUserContext()
+
+
+class LocalReportContext(ReportContext):
+    """report context which remembers the last execution report"""
+
+    __test__ = False
+
+    def __init__(self):
+        self.last: ExecutionReport | None = None
+
+    def update(self, report: ExecutionReport) -> None:
+        """Remember the report"""
+        self.last = report